@@ -37,8 +37,8 @@ function App() {
       const currentTaskId = processResponse.task_id;
       setTaskId(currentTaskId);
 
-      // 2. Poll for status updates
-      await api.pollTaskStatus(
+      // 2. Subscribe to status/progress events
+      await api.watchTaskStatus(
         currentTaskId,
         (taskStatus) => {
           // Update UI based on task status
@@ -58,8 +58,7 @@ function App() {
             setStatus(ProcessStatus.RENDERING);
             updateStepStatus('render', 'active');
           }
-        },
-        2000 // Poll every 2 seconds
+        }
       );
 
       // 3. Get final result
@@ -0,0 +1,151 @@
+"""
+API 시작 시간(import 시간) 프로파일
+
+새로 띄운 인터프리터에서 `python -X importtime -c "import main"`을 실행해
+모듈별 import 시간을 집계하고, 누적 시간이 큰 모듈과 API 계층이 가져오면 안 되는
+무거운 오디오/ML 라이브러리(HEAVY_MODULES)를 누가 가져왔는지 출력한다.
+무거운 모듈이 섞였거나 전체 시간이 예산을 넘으면 종료 코드 1로 실패한다.
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.import_profile                  # main 모듈
+    python -m benchmarks.import_profile --modules main worker --top 30
+    python -m benchmarks.import_profile --budget 0.8 --output benchmarks/results/imports.json
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Sequence
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# API 계층(main, worker 진입점)이 시작 시 가져오면 안 되는 모듈 (최상위 패키지 이름)
+HEAVY_MODULES = (
+    "numpy", "scipy", "librosa", "soundfile", "music21", "yt_dlp",
+    "torch", "torchaudio", "demucs", "tensorflow", "basic_pitch",
+)
+
+# 기본 시작 시간 예산 (초, 측정 대상 모듈의 누적 import 시간)
+DEFAULT_BUDGET_SECONDS = 1.0
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def profile_imports(module: str, repeat: int = 3) -> List[Dict]:
+    """
+    새 인터프리터에서 모듈을 가져오며 import 시간 측정 (가장 빠른 실행 기준)
+
+    Args:
+        module: 측정할 모듈 이름 (backend 디렉토리 기준)
+        repeat: 반복 횟수
+
+    Returns:
+        import 순서대로 [{name, self_us, cumulative_us, depth}] (자식이 부모보다 먼저 나옴)
+    """
+    best: Optional[List[Dict]] = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{module} import 실패:\n{proc.stderr[-2000:]}")
+
+        rows = []
+        for line in proc.stderr.splitlines():
+            match = _LINE.match(line)
+            if match:
+                rows.append({
+                    "name": match.group(4),
+                    "self_us": int(match.group(1)),
+                    "cumulative_us": int(match.group(2)),
+                    "depth": len(match.group(3)) // 2,
+                })
+        total = sum(row["self_us"] for row in rows)
+        if best is None or total < sum(row["self_us"] for row in best):
+            best = rows
+    return best
+
+
+def import_chain(rows: List[Dict], index: int) -> List[str]:
+    """rows[index] 모듈을 가져온 부모 모듈 경로 (최상위부터)"""
+    chain = [rows[index]["name"]]
+    depth = rows[index]["depth"]
+    for row in rows[index + 1:]:
+        if row["depth"] < depth:
+            chain.append(row["name"])
+            depth = row["depth"]
+    return chain[::-1]
+
+
+def summarize(module: str, rows: List[Dict], top: int) -> Dict:
+    """
+    측정 결과 요약
+
+    Returns:
+        {total_seconds, top: [(모듈, 누적 초)], heavy: {무거운 모듈: 가져온 경로}}
+    """
+    target = next((row for row in rows if row["name"] == module), None)
+    total_us = target["cumulative_us"] if target else sum(row["self_us"] for row in rows)
+
+    heavy: Dict[str, List[str]] = {}
+    for package in HEAVY_MODULES:
+        indices = [i for i, row in enumerate(rows) if row["name"].split(".")[0] == package]
+        if indices:
+            # 패키지에서 가장 바깥쪽(처음 가져온) 모듈 기준
+            heavy[package] = import_chain(rows, min(indices, key=lambda i: rows[i]["depth"]))
+
+    ranked = sorted(
+        (row for row in rows if row["name"] != module), key=lambda row: row["cumulative_us"], reverse=True
+    )
+    return {
+        "total_seconds": round(total_us / 1e6, 3),
+        "top": [(row["name"], round(row["cumulative_us"] / 1e6, 3)) for row in ranked[:top]],
+        "heavy": heavy,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="API 시작(import) 시간 프로파일")
+    parser.add_argument("--modules", nargs="*", default=["main"], help="측정할 모듈 (기본: main)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 느린 모듈 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 실행 사용)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="모듈별 시작 시간 예산 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failures = []
+    for module in args.modules:
+        summary = summarize(module, profile_imports(module, args.repeat), args.top)
+        results[module] = summary
+
+        print(f"{module}: {summary['total_seconds']:.3f}s")
+        for name, seconds in summary["top"]:
+            print(f"  {seconds:>7.3f}s  {name}")
+        for package, chain in summary["heavy"].items():
+            print(f"  ⚠️ {package}: {' → '.join(chain)}")
+            failures.append(f"{module}: {package} 로드 ({' → '.join(chain)})")
+        if summary["total_seconds"] > args.budget:
+            failures.append(f"{module}: {summary['total_seconds']:.3f}s > 예산 {args.budget:.3f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if failures:
+        print(f"❌ 시작 시간 회귀 {len(failures)}건")
+        for line in failures:
+            print(f"  - {line}")
+        return 1
+
+    print("✅ 무거운 모듈 없이 예산 안에서 시작")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
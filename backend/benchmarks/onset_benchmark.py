@@ -0,0 +1,103 @@
+"""
+온셋 검출 벤치마크
+
+기존 재시도 방식 피크 검출(adaptive_pick, distance=sr/16 샘플 단위 버그 포함),
+간격 단위만 고친 재시도 방식, 온셋 엔진(onset_service)을 같은 특징(대역별 에너지/플럭스)에 대해 비교한다.
+
+- 합성 드럼(정답 타격 시각을 아는 신호)으로 악기별 정밀도/재현율/F1 측정
+- 실제 분리 스템은 정답이 없으므로 검출 수와 검출 시간만 비교
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.onset_benchmark
+    python -m benchmarks.onset_benchmark --stems temp/tasks/<task_id>/separate/drums.wav
+"""
+import argparse
+import time
+from typing import Dict, Sequence
+
+import numpy as np
+import librosa
+from scipy.signal import find_peaks
+
+from benchmarks.synth import SAMPLE_RATE, f_measure, synth_drums
+from services.onset_service import pick_onsets
+from services.spectral_service import DEFAULT_BANDS, HOP_LENGTH, compute_band_envelopes
+
+
+def legacy_pick(env: np.ndarray, distance: float, min_notes: int = 20) -> np.ndarray:
+    """기존 transcribe_drums의 adaptive_pick (비교용, 임계값을 낮춰 가며 재시도)"""
+    for th in (0.15, 0.10, 0.05, 0.02):
+        peaks, _ = find_peaks(env, height=th, distance=distance)
+        if len(peaks) >= min_notes:
+            return peaks
+    return peaks
+
+
+def detect(y: np.ndarray, sr: int, repeat: int = 5) -> Dict[str, Dict[str, object]]:
+    """
+    같은 특징에서 각 검출기를 실행하여 결과와 평균 검출 시간(ms) 반환
+
+    특징 추출(HPSS/STFT)은 모든 방식이 같으므로 시간 비교에서 제외한다.
+    """
+    _, y_percussive = librosa.effects.hpss(librosa.util.normalize(y))
+    envelopes, flux, _ = compute_band_envelopes(y_percussive, sr, DEFAULT_BANDS)
+
+    # legacy: 기존 그대로 (distance=sr/16, 샘플 단위를 프레임에 적용)
+    # legacy-f: 같은 재시도 방식에서 간격만 프레임 단위(62.5ms)로 고친 것
+    frame_distance = max(1, round(sr / 16 / HOP_LENGTH))
+    results: Dict[str, Dict[str, object]] = {}
+    for name, run in (
+        ("legacy", lambda i: legacy_pick(envelopes[i], sr / 16, DEFAULT_BANDS[i].onset.min_notes)),
+        ("legacy-f", lambda i: legacy_pick(envelopes[i], frame_distance, DEFAULT_BANDS[i].onset.min_notes)),
+        ("engine", lambda i: pick_onsets(flux[i], DEFAULT_BANDS[i].onset, sr, HOP_LENGTH)[0]),
+    ):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            frames = [run(i) for i in range(len(DEFAULT_BANDS))]
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        results[name] = {
+            "ms": elapsed,
+            "times": {
+                band.name: librosa.frames_to_time(f, sr=sr, hop_length=HOP_LENGTH)
+                for band, f in zip(DEFAULT_BANDS, frames)
+            },
+        }
+    return results
+
+
+def run_synthetic(seeds: Sequence[int], bpms: Sequence[float]):
+    print(f"{'case':<14}{'method':<10}{'ms':>8}  " + "  ".join(f"{b.name:>18}" for b in DEFAULT_BANDS))
+    for seed in seeds:
+        for bpm in bpms:
+            y, truth = synth_drums(bpm=bpm, seed=seed)
+            for method, result in detect(y, SAMPLE_RATE).items():
+                cells = []
+                for band in DEFAULT_BANDS:
+                    p, r, f = f_measure(truth[band.name], result["times"][band.name])
+                    cells.append(f"P{p:.2f} R{r:.2f} F{f:.2f}")
+                print(f"{f'seed{seed}@{bpm:.0f}':<14}{method:<10}{result['ms']:>8.2f}  " + "  ".join(f"{c:>18}" for c in cells))
+
+
+def run_stems(paths: Sequence[str]):
+    for path in paths:
+        y, sr = librosa.load(path, sr=SAMPLE_RATE)
+        print(f"{path} ({len(y) / sr:.0f}s)")
+        for method, result in detect(y, sr).items():
+            counts = ", ".join(f"{k}={len(v)}" for k, v in result["times"].items())
+            print(f"  {method:<10}{result['ms']:>8.2f} ms  {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="온셋 검출 벤치마크")
+    parser.add_argument("--stems", nargs="*", default=[], help="검출 수/시간을 비교할 드럼 스템")
+    parser.add_argument("--seeds", type=int, nargs="*", default=[0, 1, 2])
+    parser.add_argument("--bpms", type=float, nargs="*", default=[90, 120, 160])
+    args = parser.parse_args()
+
+    run_synthetic(args.seeds, args.bpms)
+    if args.stems:
+        run_stems(args.stems)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+파이프라인 회귀/성능 벤치마크
+
+정답(템포, 타격 시각, 드럼 스템)을 아는 합성 곡을 로컬에서 만들어 각 단계를 따로,
+그리고 처음부터 끝까지 실행하고 단계별 실행 시간, 최대 메모리, 온셋 정밀도/재현율/F1,
+BPM 오차, 분리 SDR을 JSON으로 기록한다. 기준 결과(baseline)가 있으면 비교하여
+느려지거나 부정확해진 지표가 있을 때 종료 코드 1로 실패한다.
+
+각 측정은 새로 띄운 프로세스에서 metrics.measure_call로 실행되므로,
+앞선 단계가 남긴 메모리/캐시가 다음 단계 측정에 섞이지 않는다.
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.pipeline_benchmark                    # 실행 후 baseline과 비교
+    python -m benchmarks.pipeline_benchmark --save-baseline    # 현재 결과를 baseline으로 저장
+    python -m benchmarks.pipeline_benchmark --tier quality --stages separate pipeline
+    python -m benchmarks.pipeline_benchmark --profiles full fast --stages transcribe
+
+트랜스크립션/파이프라인 단계는 분석 프로필마다 따로 측정하며, full 이외의 프로필은
+"transcribe-fast"처럼 단계 이름 뒤에 프로필 이름을 붙여 기록한다.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synth import (
+    SAMPLE_RATE, score_events, signal_to_distortion, synth_accompaniment, synth_drums,
+    write_audio
+)
+from services.analysis_profiles import ANALYSIS_PROFILES
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# 합성 곡: 이름 → (BPM, 마디 수, 시드)
+CASES: Dict[str, Tuple[float, int, int]] = {
+    "groove-90": (90.0, 16, 0),
+    "groove-120": (120.0, 16, 1),
+    "groove-160": (160.0, 24, 2),
+}
+
+STAGES = ("decode", "separate", "transcribe", "render", "pipeline")
+
+# 믹스에서 드럼과 반주의 비율
+DRUM_GAIN = 0.7
+ACCOMPANIMENT_GAIN = 0.4
+
+# 지표별 회귀 판정: (나빠지는 방향, 허용 범위 종류, 기본 허용 범위)
+# 실행 시간은 짧은 단계의 측정 잡음을 고려해 TIME_SLACK_SECONDS 이하의 차이는 무시한다.
+REGRESSION_RULES = {
+    "wall_seconds": ("higher", "relative", 0.25),
+    "peak_rss_mb": ("higher", "relative", 0.20),
+    "f1": ("lower", "absolute", 0.02),
+    "bpm_error": ("higher", "absolute", 1.0),
+    "sdr_db": ("lower", "absolute", 0.5),
+}
+TIME_SLACK_SECONDS = 0.2
+
+
+# ---------------------------------------------------------------------------
+# 단계 함수 (측정용 하위 프로세스에서 실행, pickle 가능)
+# ---------------------------------------------------------------------------
+
+def _decode(src_path: str, dest_path: str) -> str:
+    from services.audio_service import decode_audio
+    return decode_audio(src_path, dest_path)
+
+
+def _separate(audio_path: str, task_id: str, tier: str) -> str:
+    from services.separation_service import separate_drums
+    return separate_drums(audio_path, task_id, tier)
+
+
+def _transcribe(audio_path: str, output_dir: str, backend: str, profile: str = "full") -> Tuple[str, dict]:
+    from services.transcription_backends import run_transcription
+    _, events_path, metadata = run_transcription(audio_path, output_dir, backend, profile=profile)
+    if events_path is None:
+        raise Exception("드럼 트랜스크립션 실패")
+    return events_path, metadata
+
+
+def _render(events_path: str, task_id: str, bpm: float) -> str:
+    from services.conversion_service import render_musicxml
+    return render_musicxml(events_path, task_id, bpm)
+
+
+def _pipeline(
+    src_path: str,
+    task_id: str,
+    tier: str,
+    backend: str,
+    profile: str = "full"
+) -> Tuple[str, str, dict]:
+    """다운로드 이후 전체 파이프라인 (디코딩 → 분리 → 트랜스크립션 → 렌더링)"""
+    from services.storage_service import task_dir
+
+    audio_path = _decode(src_path, os.path.join(task_dir(task_id, "download"), "audio.wav"))
+    drum_path = _separate(audio_path, task_id, tier)
+    events_path, metadata = _transcribe(drum_path, task_dir(task_id, "transcribe"), backend, profile)
+    _render(events_path, task_id, metadata["bpm"])
+    return drum_path, events_path, metadata
+
+
+def _measure(func: Callable[..., Any], args: Sequence[Any], repeat: int) -> Tuple[Any, Dict[str, float]]:
+    """
+    새 프로세스에서 함수를 repeat번 실행하여 (마지막 결과, 최소 실행 시간/최대 메모리) 반환
+    """
+    from services.metrics import measure_call
+
+    walls, cpus, peaks = [], [], []
+    result = None
+    for _ in range(max(1, repeat)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result, measured = pool.submit(measure_call, func, tuple(args)).result()
+        walls.append(measured["wall_seconds"])
+        cpus.append(measured["cpu_seconds"])
+        peaks.append(measured["peak_rss_bytes"])
+
+    return result, {
+        "wall_seconds": round(min(walls), 3),
+        "cpu_seconds": round(min(cpus), 3),
+        "peak_rss_mb": round(max(peaks) / 2 ** 20, 1),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+def prepare_case(name: str, workdir: str) -> Dict[str, Any]:
+    """
+    합성 곡 생성 (믹스 FLAC, 정답 드럼 스템 WAV, 정답 타격/템포)
+
+    Returns:
+        {"mix", "drums", "truth", "bpm", "duration"}
+    """
+    bpm, bars, seed = CASES[name]
+    drums, truth = synth_drums(bpm=bpm, bars=bars, seed=seed)
+    accompaniment = synth_accompaniment(bpm, len(drums), seed=seed)
+
+    mix = DRUM_GAIN * drums + ACCOMPANIMENT_GAIN * accompaniment
+    scale = 0.9 / np.abs(mix).max()
+
+    case_dir = os.path.join(workdir, "inputs", name)
+    os.makedirs(case_dir, exist_ok=True)
+    drum_path = os.path.join(case_dir, "drums.wav")
+    sf.write(drum_path, np.stack([drums, drums], axis=1) * DRUM_GAIN * scale, SAMPLE_RATE, subtype="FLOAT")
+
+    return {
+        "mix": write_audio(os.path.join(case_dir, "mix.flac"), mix * scale),
+        "drums": drum_path,
+        "truth": truth,
+        "bpm": bpm,
+        "duration": len(mix) / SAMPLE_RATE,
+    }
+
+
+def _accuracy(events_path: str, metadata: dict, case: Dict[str, Any]) -> Dict[str, float]:
+    scores = score_events(np.load(events_path), case["truth"])
+    scores["bpm_error"] = abs(metadata["bpm"] - case["bpm"])
+    return scores
+
+
+def _sdr(drum_path: str, case: Dict[str, Any]) -> float:
+    estimate, _ = sf.read(drum_path, dtype="float32", always_2d=True)
+    reference, _ = sf.read(case["drums"], dtype="float32", always_2d=True)
+    return round(signal_to_distortion(reference.mean(axis=1), estimate.mean(axis=1)), 2)
+
+
+def _stage_name(stage: str, profile: str) -> str:
+    """분석 프로필별 단계 이름 (full은 기존 이름 유지)"""
+    return stage if profile == "full" else f"{stage}-{profile}"
+
+
+def run_case(
+    name: str,
+    workdir: str,
+    stages: Sequence[str],
+    tier: str,
+    backend: str,
+    repeat: int,
+    profiles: Sequence[str] = ("full",)
+) -> Dict[str, Dict[str, float]]:
+    """
+    한 합성 곡에 대해 요청한 단계를 각각 따로 측정
+
+    단독 트랜스크립션은 정답 드럼 스템을, 단독 분리/렌더링은 앞 단계 결과를 입력으로 사용한다.
+    트랜스크립션/파이프라인은 분석 프로필마다, 렌더링은 첫 프로필 결과로 한 번 측정한다.
+    """
+    from services.storage_service import task_dir
+
+    case = prepare_case(name, workdir)
+    results: Dict[str, Dict[str, float]] = {}
+
+    decoded = os.path.join(task_dir(name, "download"), "audio.wav")
+    if "decode" in stages or "separate" in stages:
+        _, results["decode"] = _measure(_decode, (case["mix"], decoded), repeat)
+
+    if "separate" in stages:
+        drum_path, results["separate"] = _measure(_separate, (decoded, name, tier), repeat)
+        if tier != "none":
+            results["separate"]["sdr_db"] = _sdr(drum_path, case)
+
+    if "transcribe" in stages or "render" in stages:
+        rendered = None
+        for profile in profiles if "transcribe" in stages else profiles[:1]:
+            stage = _stage_name("transcribe", profile)
+            (events_path, metadata), results[stage] = _measure(
+                _transcribe, (case["drums"], task_dir(name, stage), backend, profile), repeat
+            )
+            results[stage].update(_accuracy(events_path, metadata, case))
+            rendered = rendered or (events_path, metadata["bpm"])
+
+        if "render" in stages:
+            _, results["render"] = _measure(_render, (rendered[0], name, rendered[1]), repeat)
+
+    if "pipeline" in stages:
+        for profile in profiles:
+            stage = _stage_name("pipeline", profile)
+            (drum_path, events_path, metadata), results[stage] = _measure(
+                _pipeline, (case["mix"], f"{name}-{stage}", tier, backend, profile), repeat
+            )
+            results[stage].update(_accuracy(events_path, metadata, case))
+            if tier != "none":
+                results[stage]["sdr_db"] = _sdr(drum_path, case)
+
+    order = [_stage_name(stage, profile) for stage in STAGES for profile in profiles]
+    return {stage: results[stage] for stage in dict.fromkeys(order) if stage in results}
+
+
+def run(
+    cases: Sequence[str],
+    stages: Sequence[str],
+    tier: str,
+    backend: str,
+    repeat: int = 1,
+    keep: bool = False,
+    profiles: Sequence[str] = ("full",)
+) -> Dict[str, Any]:
+    """
+    벤치마크 실행
+
+    Returns:
+        {"meta": 실행 환경/설정, "cases": 곡 → 단계 → 지표}
+    """
+    workdir = tempfile.mkdtemp(prefix="drum-bench-")
+    # 측정용 하위 프로세스도 같은 산출물 루트를 사용하도록 가져오기 전에 지정
+    os.environ["ARTIFACT_ROOT"] = workdir
+
+    try:
+        results = {}
+        for name in cases:
+            print(f"▶ {name}", flush=True)
+            results[name] = run_case(name, workdir, stages, tier, backend, repeat, profiles)
+            print_case(name, results[name])
+    finally:
+        if keep:
+            print(f"작업 디렉토리: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "tier": tier,
+            "backend": backend,
+            "profiles": list(profiles),
+            "repeat": repeat,
+        },
+        "cases": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 기준 결과 비교
+# ---------------------------------------------------------------------------
+
+def _rule(metric: str) -> Optional[Tuple[str, str, float]]:
+    if metric in REGRESSION_RULES:
+        return REGRESSION_RULES[metric]
+    if metric.endswith(" f1"):
+        return REGRESSION_RULES["f1"]
+    return None
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerances: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """
+    현재 결과를 기준 결과와 비교하여 회귀 목록 반환
+
+    기준 결과에 있는 (곡, 단계, 지표)만 비교하며, 설정(분리 등급, 백엔드)이 다르면 비교할 수 없다.
+
+    Args:
+        current: run() 결과
+        baseline: 기준 결과
+        tolerances: 지표별 허용 범위 재지정
+
+    Returns:
+        회귀 설명 문자열 목록 (없으면 빈 목록)
+    """
+    for key in ("tier", "backend"):
+        if current["meta"].get(key) != baseline["meta"].get(key):
+            raise ValueError(
+                f"기준 결과와 설정이 다릅니다: {key}={baseline['meta'].get(key)} "
+                f"(현재 {current['meta'].get(key)})"
+            )
+
+    tolerances = tolerances or {}
+    regressions = []
+    for case, stages in baseline["cases"].items():
+        for stage, metrics in stages.items():
+            measured = current["cases"].get(case, {}).get(stage)
+            if measured is None:
+                continue
+            for metric, expected in metrics.items():
+                rule = _rule(metric)
+                if rule is None or metric not in measured:
+                    continue
+                direction, kind, tolerance = rule
+                tolerance = tolerances.get(metric.split()[-1], tolerance)
+                value = measured[metric]
+
+                delta = value - expected if direction == "higher" else expected - value
+                limit = tolerance * abs(expected) if kind == "relative" else tolerance
+                if metric == "wall_seconds":
+                    limit = max(limit, TIME_SLACK_SECONDS)
+                if delta > limit:
+                    regressions.append(f"{case}/{stage} {metric}: {expected} → {value}")
+    return regressions
+
+
+def print_case(name: str, stages: Dict[str, Dict[str, float]]):
+    for stage, metrics in stages.items():
+        cells = [f"{metric}={value}" for metric, value in metrics.items() if metric != "cpu_seconds"]
+        print(f"  {stage:<16}" + "  ".join(cells))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="파이프라인 회귀/성능 벤치마크")
+    parser.add_argument("--cases", nargs="*", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--stages", nargs="*", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--tier", default="none", help="분리 등급 (기본 none: 모델 가중치 없이 실행 가능)")
+    parser.add_argument("--backend", default="spectral", help="트랜스크립션 백엔드")
+    parser.add_argument(
+        "--profiles", nargs="*", default=list(ANALYSIS_PROFILES), choices=list(ANALYSIS_PROFILES),
+        help="측정할 분석 프로필 (기본: 전체)"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="단계별 반복 횟수 (최소 실행 시간 사용)")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 baseline으로 저장 (비교하지 않음)")
+    parser.add_argument("--time-tolerance", type=float, help="실행 시간 허용 증가율 (기본 0.25)")
+    parser.add_argument("--memory-tolerance", type=float, help="최대 메모리 허용 증가율 (기본 0.2)")
+    parser.add_argument("--keep", action="store_true", help="작업 디렉토리 보존")
+    args = parser.parse_args(argv)
+
+    current = run(
+        args.cases, args.stages, args.tier, args.backend, args.repeat, args.keep, args.profiles
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(args.output, args.baseline)
+        print(f"기준 결과 저장: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("기준 결과가 없어 비교하지 않습니다 (--save-baseline으로 생성)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    tolerances = {}
+    if args.time_tolerance is not None:
+        tolerances["wall_seconds"] = args.time_tolerance
+    if args.memory_tolerance is not None:
+        tolerances["peak_rss_mb"] = args.memory_tolerance
+
+    try:
+        regressions = compare(current, baseline, tolerances)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    if regressions:
+        print(f"❌ 기준 대비 회귀 {len(regressions)}건")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("✅ 기준 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
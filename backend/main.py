@@ -2,20 +2,51 @@
 GrooveExtract AI - Backend API Server
 YouTube 드럼 악보 자동 생성 시스템
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 import uvicorn
 import os
+import time
+import asyncio
 import uuid
 import logging
 
-from services.youtube_service import download_youtube_audio
-from services.separation_service import separate_drums
-from services.transcription_service import transcribe_drums
-from services.conversion_service import midi_to_musicxml
+from services.youtube_service import download_youtube_audio, get_video_info
+from services.separation_service import (
+    separate_drums, separation_params, preload_separator, profile_source, resolve_tier,
+    shutdown_chunk_pool, SEPARATION_TIERS, DEFAULT_SEPARATION_TIER
+)
+from services.transcription_backends import (
+    get_backend, preload_transcriber, run_transcription, transcription_params
+)
+from services.analysis_profiles import ANALYSIS_PROFILES, DEFAULT_ANALYSIS_PROFILE
+from services.worker_pool import (
+    LazyFunction, run_in_stage, shutdown_pools, get_progress_channel, prefer_stage_pool, warm_pools,
+    STAGE_DOWNLOAD, STAGE_SEPARATE, STAGE_TRANSCRIBE, STAGE_RENDER, WARM_POOLS
+)
+from services.cache_service import ArtifactCache, extract_video_id, stage_key
+from services.storage_service import (
+    ArtifactStorage, task_dir, tempo_map_path, touch_task, remove_intermediate,
+    GC_INTERVAL_SECONDS
+)
+from services.scheduler import JobScheduler
+from services.delivery_service import (
+    STREAM_FORMAT, STREAM_FORMATS, file_response, precompress, restore_stream_copies, share_stream_copy,
+    stream_cache_name, stream_path, transcode_for_streaming
+)
+from services.progress import ProgressBroker, ProgressReporter, encode_event, start_relay
+from services.metrics import (
+    measure_call, observe_stage, render_metrics,
+    STAGE_FAILURES, CACHE_HITS, TRANSCRIBED_NOTES
+)
+from services.task_store import create_task_store, WORKER_ID, LEASE_SECONDS
+from services.job_queue import (
+    create_job_queue, StageJob, JOB_FAILED, JOB_PENDING, JOB_ORPHAN_TIMEOUT, JOB_POLL_INTERVAL
+)
+from services.upload_service import UploadRejected, decode_upload, receive_upload, UPLOAD_MAX_BYTES
 from models.task import Task, TaskStatus
 
 # 로깅 설정
@@ -37,12 +68,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 작업 상태 저장소 (프로덕션에서는 Redis 등 사용)
-tasks = {}
+# 작업 상태 저장소 (기본: SQLite WAL, 여러 워커/프로세스에서 공유)
+task_store = create_task_store()
+
+# 단계 산출물 캐시 (영상 ID 기준)
+artifact_cache = ArtifactCache()
+
+# 작업별 산출물 디렉토리 (보관 기간/용량 관리)
+artifact_storage = ArtifactStorage()
+
+# 렌더링 단계 함수 (numpy/music21은 렌더링 워커에서 처음 호출할 때 로드)
+render_musicxml = LazyFunction("services.conversion_service:render_musicxml")
+
+# 트랜스크립션 백엔드 (상주 모델을 공유하는 백엔드는 작업 간 배치를 위해 스레드 풀에서 실행)
+transcriber = get_backend()
+if transcriber.shared_model:
+    prefer_stage_pool(STAGE_TRANSCRIBE, "thread", transcriber.concurrency)
+
+# 파이프라인 스케줄러 (전역 허용량 + 단계별 동시 실행 제한)
+scheduler = JobScheduler()
+
+# 단계 작업 큐 (None이면 이 프로세스의 워커 풀에서 실행, 있으면 worker.py 프로세스가 처리)
+job_queue = create_job_queue()
+
+# 작업별 진행률 이벤트 브로커 (SSE 구독자에게 전달)
+progress_broker = ProgressBroker()
+
+# 단계별 전체 진행률 구간 (시작, 끝)
+STAGE_PROGRESS = {
+    STAGE_DOWNLOAD: (10, 25),
+    STAGE_SEPARATE: (30, 55),
+    STAGE_TRANSCRIBE: (60, 85),
+    STAGE_RENDER: (90, 100),
+}
+
+# 단계 내부 진행률을 저장소에 반영하는 최소 간격 (초, 폴링 클라이언트용)
+PROGRESS_SAVE_INTERVAL = float(os.getenv("PROGRESS_SAVE_INTERVAL", "5"))
+
+# SSE 연결 유지/저장소 재확인 간격 (초)
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# 분리 등급별 실시간 배율 이동 평균 가중치 (auto 등급 선택에 사용)
+SEPARATION_RTF_SMOOTHING = 0.3
+
+# 최대 일괄 처리 URL 수
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "50"))
+
+# 실행 중인 백그라운드 코루틴 참조 (GC 방지)
+_background_jobs = set()
+
+# 이 프로세스에서 실행 중인 작업 (단계 내부 진행률 반영 대상)
+_running_tasks: Dict[str, Task] = {}
+
+# 재생용 사본 생성 작업 (WAV 경로 → 백그라운드 작업, 같은 파일을 두 번 변환하지 않음)
+_stream_jobs: Dict[str, asyncio.Task] = {}
+_progress_saved_at: Dict[str, float] = {}
+
+# 분리 등급별 실측 실시간 배율 (분리 시간 / 곡 길이)
+_separation_rtf: Dict[str, float] = {}
 
 
 class ProcessRequest(BaseModel):
     youtube_url: str
+    priority: int = 0
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    separation_tier: Optional[str] = None
+    analysis_profile: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    youtube_urls: List[str]
+    priority: int = 0
+    separation_tier: Optional[str] = None
+    analysis_profile: Optional[str] = None
 
 
 class TaskResponse(BaseModel):
@@ -51,6 +150,86 @@ class TaskResponse(BaseModel):
     message: str
 
 
+class BatchResponse(BaseModel):
+    tasks: List[TaskResponse]
+
+
+def _spawn(coro):
+    """백그라운드 코루틴 실행 및 참조 유지"""
+    job = asyncio.create_task(coro)
+    _background_jobs.add(job)
+    job.add_done_callback(_background_jobs.discard)
+    return job
+
+
+async def _lease_heartbeat():
+    """이 워커가 처리 중인 작업의 lease를 주기적으로 연장"""
+    while True:
+        await asyncio.sleep(LEASE_SECONDS / 3)
+        try:
+            task_store.renew(WORKER_ID)
+        except Exception as e:
+            logger.warning(f"Lease renewal failed: {str(e)}")
+
+
+def _is_task_active(task_id: str) -> bool:
+    """산출물을 지우면 안 되는 작업인지 확인 (진행 중이거나 대기 중)"""
+    if task_id in _running_tasks:
+        return True
+    task = task_store.get(task_id)
+    return task is not None and not task.is_finished
+
+
+def _expire_tasks(task_ids: List[str]):
+    """산출물이 삭제된 완료 작업을 만료로 표시 (결과 조회가 삭제된 파일 URL을 돌려주지 않도록)"""
+    for task_id in task_ids:
+        task = task_store.get(task_id)
+        if task is not None and task.is_finished and not task.expired:
+            task.expired = True
+            task_store.save(task)
+
+
+async def _storage_gc():
+    """완료된 작업 산출물을 주기적으로 정리 (요청 처리와 분리된 스레드에서 실행)"""
+    while True:
+        try:
+            result = await asyncio.to_thread(artifact_storage.collect_garbage, _is_task_active)
+            if result.removed:
+                await asyncio.to_thread(_expire_tasks, result.removed)
+        except Exception as e:
+            logger.warning(f"Artifact GC failed: {str(e)}")
+        await asyncio.sleep(GC_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+async def on_startup():
+    """스케줄러/lease 하트비트/진행률 전달 시작, 단계 풀 워밍업 및 중단된 작업 재개"""
+    _background_jobs.add(scheduler.start(process_pipeline))
+    start_relay(get_progress_channel(), asyncio.get_running_loop(), _on_stage_progress)
+    _spawn(_lease_heartbeat())
+    _spawn(_storage_gc())
+    if job_queue is None:
+        if WARM_POOLS:
+            # 워커 프로세스 생성과 모듈 로드는 이벤트 루프 밖에서 (헬스 체크가 바로 응답하도록)
+            _spawn(asyncio.to_thread(warm_pools))
+        _spawn(run_in_stage(STAGE_SEPARATE, preload_separator))
+        if transcriber.shared_model:
+            _spawn(run_in_stage(STAGE_TRANSCRIBE, preload_transcriber, transcriber.name))
+
+    for task in task_store.list_resumable():
+        if task_store.claim(task.task_id, WORKER_ID):
+            logger.info(f"[{task.task_id}] Resuming from status {task.status.value}")
+            scheduler.submit(task.task_id)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """단계별 워커 풀 및 진행률 전달 스레드 정리"""
+    shutdown_pools(wait=False)
+    shutdown_chunk_pool(wait=False)
+    get_progress_channel().put(None)
+
+
 @app.get("/")
 async def root():
     """API 상태 확인"""
@@ -61,213 +240,869 @@ async def root():
     }
 
 
-@app.post("/api/process", response_model=TaskResponse)
-async def start_processing(
-    request: ProcessRequest,
-    background_tasks: BackgroundTasks
-):
-    """
-    YouTube URL을 받아 드럼 악보 생성 프로세스 시작
-    """
+def _validate_range(start_time: Optional[float], end_time: Optional[float]):
+    """처리 구간 검증 (잘못되면 400)"""
+    if start_time is not None and start_time < 0:
+        raise HTTPException(status_code=400, detail="시작 시각은 0 이상이어야 합니다.")
+    if end_time is not None and end_time <= (start_time or 0):
+        raise HTTPException(status_code=400, detail="끝 시각은 시작 시각보다 커야 합니다.")
+
+
+def _validate_tier(separation_tier: Optional[str]) -> str:
+    """분리 등급 검증 (없으면 기본 등급, 알 수 없으면 400)"""
+    tier = separation_tier or DEFAULT_SEPARATION_TIER
+    if tier != "auto" and tier not in SEPARATION_TIERS:
+        choices = ", ".join(["auto", *SEPARATION_TIERS])
+        raise HTTPException(status_code=400, detail=f"분리 등급은 {choices} 중 하나여야 합니다.")
+    return tier
+
+
+def _validate_profile(analysis_profile: Optional[str]) -> str:
+    """분석 프로필 검증 (없으면 기본 프로필, 알 수 없으면 400)"""
+    profile = analysis_profile or DEFAULT_ANALYSIS_PROFILE
+    if profile not in ANALYSIS_PROFILES:
+        choices = ", ".join(ANALYSIS_PROFILES)
+        raise HTTPException(status_code=400, detail=f"분석 프로필은 {choices} 중 하나여야 합니다.")
+    return profile
+
+
+def _create_task(
+    youtube_url: str,
+    priority: int,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    separation_tier: str = "quality",
+    analysis_profile: str = "full"
+) -> TaskResponse:
+    """작업을 생성하여 저장소에 등록하고 스케줄러 대기열에 추가"""
     task_id = str(uuid.uuid4())
 
     # 초기 작업 상태 생성
     task = Task(
         task_id=task_id,
-        youtube_url=request.youtube_url,
+        youtube_url=youtube_url,
         status=TaskStatus.PENDING,
-        current_step="초기화 중",
-        progress=0
+        current_step="대기 중",
+        progress=0,
+        start_time=start_time,
+        end_time=end_time,
+        separation_tier=separation_tier,
+        analysis_profile=analysis_profile
     )
-    tasks[task_id] = task
+    return _submit_task(task, priority)
 
-    # 백그라운드에서 처리 시작
-    background_tasks.add_task(process_pipeline, task_id)
+
+def _submit_task(task: Task, priority: int) -> TaskResponse:
+    """작업을 저장소에 등록하고 스케줄러 대기열에 추가"""
+    task_store.create(task, owner=WORKER_ID)
+    scheduler.submit(task.task_id, priority)
 
     return TaskResponse(
-        task_id=task_id,
-        status=TaskStatus.PENDING,
+        task_id=task.task_id,
+        status=task.status,
         message="처리가 시작되었습니다."
     )
 
 
+@app.post("/api/process", response_model=TaskResponse)
+async def start_processing(request: ProcessRequest):
+    """
+    YouTube URL을 받아 드럼 악보 생성 프로세스 시작
+    (start_time/end_time을 지정하면 해당 구간만 받아 처리,
+    separation_tier로 분리 품질 등급, analysis_profile로 트랜스크립션 분석 프로필 선택)
+    """
+    _validate_range(request.start_time, request.end_time)
+    tier = _validate_tier(request.separation_tier)
+    profile = _validate_profile(request.analysis_profile)
+    return _create_task(
+        request.youtube_url, request.priority, request.start_time, request.end_time, tier, profile
+    )
+
+
+async def _ingest_upload(task: Task, request: Request) -> str:
+    """
+    업로드 본문을 작업의 다운로드 디렉토리에 받아 한 번 디코딩 (같은 내용이면 캐시에서 복원)
+
+    Returns:
+        디코딩된 오디오 파일 경로
+    """
+    try:
+        upload = await receive_upload(
+            request.stream(), request.headers.get("content-type"), task_dir(task.task_id, STAGE_DOWNLOAD)
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # 내용 해시가 캐시 식별자이므로 같은 녹음을 다시 올리면 모든 단계가 캐시에서 복원됨
+    task.source_key = f"upload:{upload.sha256}"
+    cached = await _cache_lookup(task, STAGE_DOWNLOAD)
+    if cached:
+        await asyncio.to_thread(remove_intermediate, upload.path)
+        return cached[0]["audio"]
+
+    logger.info(f"[{task.task_id}] Decoding upload ({upload.extension}, {upload.size} bytes)")
+    try:
+        audio_path = await _run_stage(
+            task, STAGE_DOWNLOAD, decode_upload, upload.path, task.task_id, upload.codec,
+            start_time=task.start_time, end_time=task.end_time, report_progress=False
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await _cache_store(task, STAGE_DOWNLOAD, {"audio": audio_path})
+    return audio_path
+
+
+@app.post("/api/process/upload", response_model=TaskResponse)
+async def start_upload_processing(
+    request: Request,
+    priority: int = 0,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    separation_tier: Optional[str] = None,
+    analysis_profile: Optional[str] = None
+):
+    """
+    오디오 파일을 업로드받아 드럼 악보 생성 프로세스 시작 (YouTube를 거치지 않는 로컬 녹음 등)
+
+    본문은 원시 오디오 바이트 또는 multipart/form-data의 파일 필드이며, 옵션은 쿼리 파라미터로
+    받는다 (/api/process와 같은 의미). 본문을 청크 단위로 디스크에 기록하며 sha256을 계산하고,
+    한 번 디코딩한 뒤 분리 단계부터 파이프라인에 넣는다.
+    """
+    _validate_range(start_time, end_time)
+    tier = _validate_tier(separation_tier)
+    profile = _validate_profile(analysis_profile)
+
+    length = request.headers.get("content-length", "")
+    content_type = request.headers.get("content-type", "")
+    if length.isdigit() and int(length) > UPLOAD_MAX_BYTES and not content_type.startswith("multipart/"):
+        raise HTTPException(
+            status_code=413, detail=f"파일이 너무 큽니다 (최대 {UPLOAD_MAX_BYTES // (1024 ** 2)}MB)."
+        )
+
+    task = Task(
+        task_id=str(uuid.uuid4()),
+        youtube_url="",
+        status=TaskStatus.DOWNLOADING,
+        current_step="업로드 수신 중",
+        progress=0,
+        start_time=start_time,
+        end_time=end_time,
+        separation_tier=tier,
+        analysis_profile=profile
+    )
+
+    # 저장소 등록 전이므로 실행 중 작업으로 표시해 산출물 GC 대상에서 제외
+    _running_tasks[task.task_id] = task
+    try:
+        audio_path = await _ingest_upload(task, request)
+    except BaseException:
+        await asyncio.to_thread(artifact_storage.remove, task.task_id)
+        raise
+    finally:
+        _running_tasks.pop(task.task_id, None)
+
+    task.audio_path = audio_path
+    task.status = TaskStatus.PENDING
+    task.current_step = "대기 중"
+    task.progress = STAGE_PROGRESS[STAGE_DOWNLOAD][1]
+    response = _submit_task(task, priority)
+    _prepare_stream(task, STAGE_DOWNLOAD, "audio", audio_path)
+    return response
+
+
+@app.post("/api/batch", response_model=BatchResponse)
+async def start_batch(request: BatchRequest):
+    """
+    여러 YouTube URL을 한 번에 등록 (스케줄러가 동시 실행 수를 제한)
+    """
+    if not request.youtube_urls:
+        raise HTTPException(status_code=400, detail="URL 목록이 비어 있습니다.")
+    if len(request.youtube_urls) > BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {BATCH_MAX_URLS}개의 URL만 처리할 수 있습니다."
+        )
+
+    tier = _validate_tier(request.separation_tier)
+    profile = _validate_profile(request.analysis_profile)
+    return BatchResponse(
+        tasks=[
+            _create_task(url, request.priority, separation_tier=tier, analysis_profile=profile)
+            for url in request.youtube_urls
+        ]
+    )
+
+
+def _status_payload(task: Task, **extra) -> dict:
+    """상태 조회/SSE 이벤트 공통 응답 본문"""
+    return {
+        "task_id": task.task_id,
+        "status": task.status.value,
+        "current_step": task.current_step,
+        "progress": task.progress,
+        "queue_position": scheduler.position(task.task_id),
+        "separation_tier": task.separation_tier,
+        "analysis_profile": task.analysis_profile,
+        "metadata": task.metadata,
+        "stage_metrics": task.stage_metrics,
+        "error_message": task.error_message,
+        "expired": task.expired,
+        **extra
+    }
+
+
+def _update_task(task: Task, **changes):
+    """작업 필드를 갱신하고 저장소에 체크포인트 저장 후 구독자에게 알림"""
+    for key, value in changes.items():
+        setattr(task, key, value)
+    task_store.save(task)
+    progress_broker.publish(task.task_id, _status_payload(task), final=task.is_finished)
+
+
+def _on_stage_progress(task_id: str, stage: str, fraction: float, detail: Optional[str]):
+    """
+    워커가 보고한 단계 내부 진행률을 전체 진행률로 환산하여 구독자에게 전달
+
+    저장소에는 PROGRESS_SAVE_INTERVAL 간격으로만 반영한다.
+    """
+    task = _running_tasks.get(task_id)
+    if task is None or task.is_finished:
+        return
+
+    start, end = STAGE_PROGRESS[stage]
+    task.progress = max(task.progress, int(start + (end - start) * fraction))
+
+    now = time.monotonic()
+    if now - _progress_saved_at.get(task_id, 0.0) >= PROGRESS_SAVE_INTERVAL:
+        _progress_saved_at[task_id] = now
+        task_store.save(task)
+
+    progress_broker.publish(
+        task_id,
+        _status_payload(task, stage=stage, stage_progress=round(fraction, 3), detail=detail)
+    )
+
+
+async def _run_stage(
+    task: Task,
+    stage: str,
+    func,
+    *args,
+    input_audio: Optional[str] = None,
+    report_progress: bool = True,
+    **kwargs
+):
+    """
+    단계별 동시 실행 상한을 지키며 워커 풀에서 단계 실행
+
+    워커 안에서 측정한 자원 사용량을 task.stage_metrics에 기록하고 히스토그램에 반영한다.
+    report_progress이면 단계 함수에 progress 콜백을 넘겨 단계 내부 진행률을 받는다.
+    작업 큐가 설정되어 있으면 단계 실행을 큐에 넘긴다 (_run_queued_stage).
+    """
+    try:
+        if job_queue is not None:
+            result, measured = await _run_queued_stage(
+                task, stage, func, args, input_audio, report_progress, kwargs
+            )
+        else:
+            if report_progress:
+                kwargs["progress"] = ProgressReporter(task.task_id, stage)
+            async with scheduler.stage_slot(stage):
+                result, measured = await run_in_stage(
+                    stage, measure_call, func, args, input_audio, kwargs
+                )
+    except Exception:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+
+    task.stage_metrics[stage] = measured
+    observe_stage(stage, measured)
+    return result
+
+
+async def _run_queued_stage(
+    task: Task,
+    stage: str,
+    func,
+    args: tuple,
+    input_audio: Optional[str],
+    report_progress: bool,
+    kwargs: dict
+):
+    """
+    단계 작업을 큐에 넣고 워커가 끝낼 때까지 대기
+
+    단계별 동시 실행 수는 워커 프로세스의 가져가기 슬롯이 제한하므로 stage_slot을 쓰지 않는다.
+    작업 ID가 작업/단계로 고정되어 있어, 재시작 후 재개된 작업은 진행 중인 큐 작업을 이어받는다.
+    워커가 기록한 단계 내부 진행률은 JOB_POLL_INTERVAL마다 조회하여 구독자에게 전달한다.
+    대기 중인 작업의 단계를 처리하는 살아 있는 워커가 JOB_ORPHAN_TIMEOUT 동안 없으면 실패로 처리한다.
+
+    Returns:
+        (함수 결과, 측정값)
+    """
+    job = await asyncio.to_thread(job_queue.submit, StageJob.create(
+        task.task_id, stage, func, args, kwargs, input_audio, report_progress
+    ))
+    progress = None
+    orphaned_since = None
+    while not job.is_finished:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        job = await asyncio.to_thread(job_queue.get, job.job_id)
+        if job is None:
+            raise Exception(f"단계 작업이 사라졌습니다: {stage}")
+        if report_progress and job.progress is not None and job.progress != progress:
+            progress = job.progress
+            _on_stage_progress(task.task_id, stage, job.progress, job.detail)
+
+        if job.status != JOB_PENDING or await asyncio.to_thread(job_queue.workers, stage):
+            orphaned_since = None
+        elif orphaned_since is None:
+            orphaned_since = time.monotonic()
+        elif time.monotonic() - orphaned_since > JOB_ORPHAN_TIMEOUT:
+            await asyncio.to_thread(job_queue.delete, job.job_id)
+            raise Exception(f"'{stage}' 단계를 처리할 워커가 없습니다.")
+
+    await asyncio.to_thread(job_queue.delete, job.job_id)
+    if job.status == JOB_FAILED:
+        raise Exception(job.error)
+    return job.result, job.measured
+
+
+def _prepare_stream(
+    task: Task, stage: str, name: str, wav_path: str, same_as: Optional[str] = None
+) -> asyncio.Task:
+    """
+    재생용 압축 오디오를 백그라운드에서 한 번만 생성 (완료 전이면 WAV 제공)
+
+    같은 WAV에 대해 진행 중인 작업이 있으면 그 작업을 돌려준다.
+    same_as가 주어지면(분리 없이 믹스를 그대로 쓰는 드럼 트랙) 그 파일의 사본을 하드링크로 공유한다.
+
+    Args:
+        task: 작업
+        stage: WAV를 만든 단계 (사본을 이 단계의 캐시 항목에 추가)
+        name: 캐시 항목 안의 WAV 이름 (예: "audio", "drums")
+        wav_path: WAV 경로
+        same_as: 같은 내용의 WAV 경로
+
+    Returns:
+        백그라운드 작업
+    """
+    job = _stream_jobs.get(wav_path)
+    if job is None:
+        job = _spawn(_build_stream(task, stage, name, wav_path, same_as))
+        _stream_jobs[wav_path] = job
+        job.add_done_callback(lambda _: _stream_jobs.pop(wav_path, None))
+    return job
+
+
+async def _build_stream(task: Task, stage: str, name: str, wav_path: str, same_as: Optional[str]):
+    """
+    재생용 사본 생성 후 단계 캐시 항목에 추가 (캐시 적중 시 사본도 함께 복원되어 다시 변환하지 않음)
+
+    ffmpeg 하위 프로세스를 기다리기만 하므로 다운로드(스레드) 풀에서 실행한다.
+    """
+    try:
+        path = None
+        if same_as is not None:
+            if same_as in _stream_jobs:
+                await _stream_jobs[same_as]
+            path = await asyncio.to_thread(share_stream_copy, same_as, wav_path)
+        if path is None:
+            path = await run_in_stage(STAGE_DOWNLOAD, transcode_for_streaming, wav_path)
+
+        if task.source_key:
+            key = stage_key(task.source_key, stage, _stage_params(task, stage))
+            await asyncio.to_thread(artifact_cache.attach, key, {stream_cache_name(name): path})
+    except Exception as e:
+        logger.warning(f"[{task.task_id}] Failed to prepare streaming audio: {str(e)}")
+
+
+async def _precompress_score(task_id: str, musicxml_path: str) -> Optional[str]:
+    """악보를 gzip으로 미리 압축 (실패하면 비압축 파일을 그대로 제공)"""
+    try:
+        return await asyncio.to_thread(precompress, musicxml_path)
+    except Exception as e:
+        logger.warning(f"[{task_id}] Failed to precompress score: {str(e)}")
+        return None
+
+
+def _stage_done(path: Optional[str]) -> bool:
+    """단계 산출물이 체크포인트로 남아 있는지 확인"""
+    return bool(path) and os.path.exists(path)
+
+
+async def _resolve_source_key(task: Task):
+    """YouTube URL을 영상 ID 기반 캐시 식별자로 정규화"""
+    if task.source_key:
+        return
+
+    video_id = extract_video_id(task.youtube_url)
+    if video_id is None:
+        info = await run_in_stage(STAGE_DOWNLOAD, get_video_info, task.youtube_url)
+        video_id = info.get('youtube_id')
+
+    if video_id:
+        _update_task(task, source_key=f"youtube:{video_id}")
+
+
+def _stage_params(task: Task, stage: str, tier: Optional[str] = None) -> dict:
+    """단계 산출물에 영향을 주는 파라미터 (앞선 단계 포함, tier로 분리 등급 재지정)"""
+    params = {}
+    if task.start_time is not None or task.end_time is not None:
+        params["range"] = [task.start_time, task.end_time]
+    if stage != STAGE_DOWNLOAD:
+        params["separation"] = separation_params(tier or task.separation_tier)
+    if stage in (STAGE_TRANSCRIBE, STAGE_RENDER):
+        params.update(transcription_params(transcriber.name, task.analysis_profile))
+    return params
+
+
+async def _cache_lookup(task: Task, stage: str, tier: Optional[str] = None):
+    """캐시된 단계 산출물을 작업 디렉토리로 복원 (미스면 None)"""
+    if not task.source_key:
+        return None
+
+    dest_dir = task_dir(task.task_id, stage)
+    key = stage_key(task.source_key, stage, _stage_params(task, stage, tier))
+    hit = await asyncio.to_thread(artifact_cache.get, key, dest_dir)
+    if hit:
+        await asyncio.to_thread(restore_stream_copies, hit[0])
+        logger.info(f"[{task.task_id}] Cache hit for stage '{stage}'")
+        CACHE_HITS.inc(stage=stage)
+    return hit
+
+
+async def _cache_store(task: Task, stage: str, files: dict, metadata: Optional[dict] = None):
+    """단계 산출물을 캐시에 저장 (실패해도 작업은 계속 진행)"""
+    if not task.source_key:
+        return
+
+    try:
+        await asyncio.to_thread(
+            artifact_cache.put,
+            stage_key(task.source_key, stage, _stage_params(task, stage)),
+            stage, files, metadata
+        )
+    except Exception as e:
+        logger.warning(f"[{task.task_id}] Failed to cache stage '{stage}': {str(e)}")
+
+
+async def _resolve_separation_tier(task: Task) -> str:
+    """
+    auto 등급을 실제 등급으로 결정
+
+    입력 분석(곡 길이, 타악 비율)은 다운로드 스레드 풀에서 실행하고
+    (트랜스크립션 풀에서 다른 작업의 전사와 자리를 다투지 않도록),
+    분리 단계의 현재 부하와 등급별 실측 실시간 배율로 예상 시간을 계산한다.
+    """
+    profile = await run_in_stage(STAGE_DOWNLOAD, profile_source, task.audio_path)
+    if job_queue is not None:
+        # 분리는 워커 프로세스가 처리하므로 큐 길이와 살아 있는 분리 워커 슬롯 수 기준
+        pending, capacity = await asyncio.gather(
+            asyncio.to_thread(job_queue.depth, STAGE_SEPARATE),
+            asyncio.to_thread(job_queue.workers, STAGE_SEPARATE)
+        )
+    else:
+        pending, capacity = scheduler.stage_load(STAGE_SEPARATE), scheduler.stage_capacity(STAGE_SEPARATE)
+    tier = resolve_tier("auto", profile, pending, max(1, capacity), _separation_rtf)
+    logger.info(
+        f"[{task.task_id}] Separation tier 'auto' -> '{tier}' "
+        f"(duration={profile['duration']:.0f}s, percussive={profile['percussive_ratio']}, "
+        f"pending={pending})"
+    )
+    return tier
+
+
+def _record_separation_rtf(tier: str, measured: dict):
+    """분리 실측 시간으로 등급별 실시간 배율 이동 평균 갱신"""
+    duration = measured.get("input_duration_seconds")
+    if not duration:
+        return
+    rtf = measured["wall_seconds"] / duration
+    previous = _separation_rtf.get(tier)
+    _separation_rtf[tier] = rtf if previous is None else (
+        previous + SEPARATION_RTF_SMOOTHING * (rtf - previous)
+    )
+
+
 async def process_pipeline(task_id: str):
     """
     전체 파이프라인 실행:
-    1. YouTube 다운로드 (yt-dlp)
+    1. YouTube 다운로드 (yt-dlp, 업로드 작업은 업로드 시 디코딩을 마쳐 건너뜀)
     2. 음원 분리 (Demucs)
     3. 드럼 트랜스크립션 (basic-pitch or librosa)
-    4. MIDI → MusicXML 변환
+    4. 이벤트 배열 → MusicXML 렌더링
+
+    각 단계는 블로킹 작업이므로 단계별 워커 풀에서 실행하고,
+    이벤트 루프는 상태 갱신만 담당한다.
+    각 단계 완료 시 산출물 경로를 저장소에 체크포인트로 남기므로,
+    재시작된 서버는 마지막으로 완료된 단계 다음부터 재개한다.
+    같은 영상의 단계 산출물이 캐시에 있으면 해당 단계를 실행하지 않고 복원한다.
     """
-    task = tasks[task_id]
+    task = task_store.get(task_id)
+    _running_tasks[task_id] = task
 
     try:
+        await _resolve_source_key(task)
+
         # 1. YouTube 다운로드
-        task.status = TaskStatus.DOWNLOADING
-        task.current_step = "YouTube 오디오 다운로드 중"
-        task.progress = 10
-        logger.info(f"[{task_id}] Starting YouTube download")
+        if not _stage_done(task.audio_path):
+            _update_task(
+                task,
+                status=TaskStatus.DOWNLOADING,
+                current_step="YouTube 오디오 다운로드 중",
+                progress=STAGE_PROGRESS[STAGE_DOWNLOAD][0]
+            )
 
-        audio_path = await download_youtube_audio(task.youtube_url, task_id)
-        task.audio_path = audio_path
-        task.progress = 25
+            cached = await _cache_lookup(task, STAGE_DOWNLOAD)
+            if cached:
+                audio_path = cached[0]["audio"]
+            elif not task.youtube_url:
+                # 업로드 작업은 원본을 다시 받을 수 없음 (디코딩 결과가 지워졌고 캐시에도 없음)
+                raise Exception("업로드된 오디오가 남아 있지 않습니다. 다시 업로드해 주세요.")
+            else:
+                logger.info(f"[{task_id}] Starting YouTube download")
+                audio_path = await _run_stage(
+                    task, STAGE_DOWNLOAD, download_youtube_audio, task.youtube_url, task_id,
+                    start_time=task.start_time, end_time=task.end_time
+                )
+                await _cache_store(task, STAGE_DOWNLOAD, {"audio": audio_path})
+            _update_task(task, audio_path=audio_path, progress=STAGE_PROGRESS[STAGE_DOWNLOAD][1])
+            _prepare_stream(task, STAGE_DOWNLOAD, "audio", audio_path)
 
         # 2. 음원 분리 (Demucs)
-        task.status = TaskStatus.SEPARATING
-        task.current_step = "Demucs로 드럼 트랙 분리 중"
-        task.progress = 30
-        logger.info(f"[{task_id}] Starting drum separation")
+        if not _stage_done(task.drum_audio_path):
+            _update_task(
+                task,
+                status=TaskStatus.SEPARATING,
+                current_step="Demucs로 드럼 트랙 분리 중",
+                progress=STAGE_PROGRESS[STAGE_SEPARATE][0]
+            )
 
-        drum_audio_path = await separate_drums(audio_path, task_id)
-        task.drum_audio_path = drum_audio_path
-        task.progress = 55
+            cached = None
+            if task.separation_tier == "auto":
+                # quality 결과가 이미 캐시에 있으면 부하와 무관하게 그대로 사용
+                cached = await _cache_lookup(task, STAGE_SEPARATE, tier="quality")
+                tier = "quality" if cached else await _resolve_separation_tier(task)
+                _update_task(task, separation_tier=tier)
+            else:
+                cached = await _cache_lookup(task, STAGE_SEPARATE)
+
+            if cached:
+                drum_audio_path = cached[0]["drums"]
+            elif task.separation_tier == "none":
+                # 분리를 건너뛰므로 분리 슬롯을 기다리지 않음
+                drum_audio_path = await asyncio.to_thread(
+                    separate_drums, task.audio_path, task_id, "none"
+                )
+            else:
+                logger.info(f"[{task_id}] Starting drum separation ({task.separation_tier})")
+                drum_audio_path = await _run_stage(
+                    task, STAGE_SEPARATE, separate_drums, task.audio_path, task_id,
+                    task.separation_tier, input_audio=task.audio_path
+                )
+                task.stage_metrics[STAGE_SEPARATE]["tier"] = task.separation_tier
+                _record_separation_rtf(task.separation_tier, task.stage_metrics[STAGE_SEPARATE])
+                await _cache_store(task, STAGE_SEPARATE, {"drums": drum_audio_path})
+            _update_task(task, drum_audio_path=drum_audio_path, progress=STAGE_PROGRESS[STAGE_SEPARATE][1])
+            _prepare_stream(
+                task, STAGE_SEPARATE, "drums", drum_audio_path,
+                same_as=task.audio_path if task.separation_tier == "none" else None
+            )
 
         # 3. 드럼 트랜스크립션
-        task.status = TaskStatus.TRANSCRIBING
-        task.current_step = "AI 드럼 트랜스크립션 중"
-        task.progress = 60
-        logger.info(f"[{task_id}] Starting transcription")
-
-        midi_path, metadata = await transcribe_drums(drum_audio_path, task_id)
-        task.midi_path = midi_path
-        task.metadata = metadata
-        task.progress = 85
-
-        # 4. MIDI → MusicXML 변환
-        task.status = TaskStatus.RENDERING
-        task.current_step = "MusicXML 악보 생성 중"
-        task.progress = 90
-        logger.info(f"[{task_id}] Converting to MusicXML")
-
-        musicxml_path = await midi_to_musicxml(midi_path, task_id)
-        task.musicxml_path = musicxml_path
-        task.progress = 100
+        if not (_stage_done(task.midi_path) and _stage_done(task.events_path)):
+            _update_task(
+                task,
+                status=TaskStatus.TRANSCRIBING,
+                current_step="AI 드럼 트랜스크립션 중",
+                progress=STAGE_PROGRESS[STAGE_TRANSCRIBE][0]
+            )
+
+            cached = await _cache_lookup(task, STAGE_TRANSCRIBE)
+            if cached:
+                midi_path, events_path = cached[0]["midi"], cached[0]["events"]
+                metadata = cached[1]
+            else:
+                logger.info(f"[{task_id}] Starting transcription")
+                midi_path, events_path, metadata = await _run_stage(
+                    task, STAGE_TRANSCRIBE, run_transcription, task.drum_audio_path,
+                    task_dir(task_id, STAGE_TRANSCRIBE), transcriber.name,
+                    input_audio=task.drum_audio_path, profile=task.analysis_profile
+                )
+                if midi_path is None:
+                    raise Exception("드럼 트랜스크립션 실패")
+                task.stage_metrics[STAGE_TRANSCRIBE].update(
+                    notes=metadata["notes"], thresholds=metadata["thresholds"],
+                    backend=metadata["backend"], analysis=metadata.get("analysis")
+                )
+                TRANSCRIBED_NOTES.observe(metadata["notes"])
+                await _cache_store(
+                    task, STAGE_TRANSCRIBE,
+                    {"midi": midi_path, "events": events_path, "beats": tempo_map_path(events_path)},
+                    metadata
+                )
+            _update_task(
+                task, midi_path=midi_path, events_path=events_path,
+                metadata=metadata, progress=STAGE_PROGRESS[STAGE_TRANSCRIBE][1]
+            )
+
+        # 4. 이벤트 배열 → MusicXML 렌더링 (MIDI 재파싱 없음)
+        if not _stage_done(task.musicxml_path):
+            _update_task(
+                task,
+                status=TaskStatus.RENDERING,
+                current_step="MusicXML 악보 생성 중",
+                progress=STAGE_PROGRESS[STAGE_RENDER][0]
+            )
+
+            cached = await _cache_lookup(task, STAGE_RENDER)
+            if cached:
+                musicxml_path = cached[0]["musicxml"]
+            else:
+                logger.info(f"[{task_id}] Rendering MusicXML")
+                musicxml_path = await _run_stage(
+                    task, STAGE_RENDER, render_musicxml, task.events_path, task_id,
+                    task.metadata["bpm"], task.metadata.get("grid", 4),
+                    report_progress=False
+                )
+                await _cache_store(task, STAGE_RENDER, {"musicxml": musicxml_path})
+            await _precompress_score(task_id, musicxml_path)
+            _update_task(task, musicxml_path=musicxml_path, progress=STAGE_PROGRESS[STAGE_RENDER][1])
 
         # 완료
-        task.status = TaskStatus.COMPLETE
-        task.current_step = "완료"
+        _update_task(task, status=TaskStatus.COMPLETE, current_step="완료")
         logger.info(f"[{task_id}] Processing complete")
 
     except Exception as e:
         logger.error(f"[{task_id}] Error: {str(e)}")
-        task.status = TaskStatus.ERROR
-        task.current_step = f"오류 발생: {str(e)}"
-        task.error_message = str(e)
+        _update_task(
+            task,
+            status=TaskStatus.ERROR,
+            current_step=f"오류 발생: {str(e)}",
+            error_message=str(e)
+        )
+
+    finally:
+        _running_tasks.pop(task_id, None)
+        _progress_saved_at.pop(task_id, None)
+        task_store.release(task_id, WORKER_ID)
+
+
+def get_task_or_404(task_id: str) -> Task:
+    """저장소에서 작업 조회 (없으면 404)"""
+    task = task_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return task
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 형식 단계별 메트릭 (워커 프로세스별 집계)"""
+    gauges = {
+        "grooveextract_queued_pipelines": scheduler.stats()["queued"],
+        "grooveextract_active_pipelines": scheduler.stats()["active"],
+        "grooveextract_event_subscribers": progress_broker.subscriber_count(),
+        "grooveextract_artifact_bytes": artifact_storage.total_bytes,
+    }
+    return PlainTextResponse(
+        render_metrics(gauges),
+        media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get("/api/status/{task_id}")
 async def get_task_status(task_id: str):
     """작업 상태 조회"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    task = _running_tasks.get(task_id) or get_task_or_404(task_id)
+    return _status_payload(task)
 
-    task = tasks[task_id]
-    return {
-        "task_id": task.task_id,
-        "status": task.status,
-        "current_step": task.current_step,
-        "progress": task.progress,
-        "metadata": task.metadata,
-        "error_message": task.error_message
-    }
+
+async def _event_stream(task: Task):
+    """
+    작업 상태 SSE 스트림
+
+    현재 상태를 먼저 보내고 이후 브로커 이벤트를 그대로 전달한다.
+    이벤트가 없는 동안에는 SSE_KEEPALIVE_SECONDS마다 저장소 상태를 다시 보내므로,
+    다른 서버 프로세스에서 실행 중인 작업도 (단계 단위로) 따라갈 수 있다.
+    """
+    task_id = task.task_id
+    queue = progress_broker.subscribe(task_id)
+    try:
+        yield encode_event(_status_payload(task))
+        if task.is_finished:
+            return
+
+        while True:
+            try:
+                message, final = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                task = _running_tasks.get(task_id) or task_store.get(task_id)
+                if task is None:
+                    return
+                message, final = encode_event(_status_payload(task)), task.is_finished
+
+            yield message
+            if final:
+                return
+    finally:
+        progress_broker.unsubscribe(task_id, queue)
+
+
+@app.get("/api/events/{task_id}")
+async def task_events(task_id: str):
+    """작업 상태/진행률 이벤트 스트림 (Server-Sent Events)"""
+    task = _running_tasks.get(task_id) or get_task_or_404(task_id)
+    return StreamingResponse(
+        _event_stream(task),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 
 @app.get("/api/result/{task_id}")
-async def get_result(task_id: str):
-    """완료된 작업의 결과 조회"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+async def get_result(task_id: str, include_score: bool = False):
+    """
+    완료된 작업의 결과 조회 (메타데이터와 URL만 반환)
 
-    task = tasks[task_id]
+    악보는 score_url에서 gzip/ETag를 지원하는 응답으로 받는다.
+    include_score=true이면 이전 클라이언트를 위해 MusicXML 본문을 함께 포함한다.
+    저장소 정리로 산출물이 삭제된 작업은 410을 반환한다.
+    """
+    task = get_task_or_404(task_id)
 
     if task.status != TaskStatus.COMPLETE:
         raise HTTPException(
             status_code=400,
             detail="작업이 아직 완료되지 않았습니다."
         )
+    if task.expired:
+        raise HTTPException(status_code=410, detail="보관 기간이 지나 결과가 삭제되었습니다.")
 
-    # MusicXML 파일 내용 읽기
-    with open(task.musicxml_path, 'r', encoding='utf-8') as f:
-        musicxml_content = f.read()
-
-    return {
+    result = {
         "task_id": task.task_id,
         "metadata": task.metadata,
-        "musicxml": musicxml_content,
+        "score_url": f"/api/score/{task_id}",
+        "midi_url": f"/api/download/{task_id}/midi",
         "drum_audio_url": f"/api/audio/{task_id}/drums",
         "original_audio_url": f"/api/audio/{task_id}/original"
     }
+    touch_task(task_id)
+    if include_score:
+        try:
+            result["musicxml"] = await asyncio.to_thread(_read_text, task.musicxml_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="MusicXML 파일을 찾을 수 없습니다.")
 
+    return result
 
-@app.get("/api/audio/{task_id}/drums")
-async def get_drum_audio(task_id: str):
-    """분리된 드럼 오디오 파일 다운로드"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
-
-    task = tasks[task_id]
 
-    if not task.drum_audio_path or not os.path.exists(task.drum_audio_path):
-        raise HTTPException(status_code=404, detail="드럼 오디오 파일을 찾을 수 없습니다.")
+def _score_response(request: Request, task: Task, attachment: bool = False):
+    """미리 압축된 악보 파일 응답 (gzip 미지원 클라이언트에는 원본)"""
+    if not task.musicxml_path or not os.path.exists(task.musicxml_path):
+        raise HTTPException(status_code=404, detail="MusicXML 파일을 찾을 수 없습니다.")
+    touch_task(task.task_id)
 
-    return FileResponse(
-        task.drum_audio_path,
-        media_type="audio/wav",
-        filename=f"drums_{task_id}.wav"
+    return file_response(
+        request,
+        task.musicxml_path,
+        media_type="application/vnd.recordare.musicxml+xml",
+        filename=f"drums_{task.task_id}.musicxml",
+        gzip_path=f"{task.musicxml_path}.gz",
+        attachment=attachment
     )
 
 
-@app.get("/api/audio/{task_id}/original")
-async def get_original_audio(task_id: str):
-    """원본 오디오 파일 다운로드"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+@app.api_route("/api/score/{task_id}", methods=["GET", "HEAD"])
+async def get_score(task_id: str, request: Request):
+    """MusicXML 악보 (gzip 사전 압축, ETag/조건부 요청 지원)"""
+    task = get_task_or_404(task_id)
+    if _stage_done(task.musicxml_path) and not os.path.exists(f"{task.musicxml_path}.gz"):
+        await _precompress_score(task_id, task.musicxml_path)
+    return _score_response(request, task)
+
 
-    task = tasks[task_id]
+async def _audio_response(
+    request: Request,
+    task_id: str,
+    wav_path: Optional[str],
+    name: str,
+    fmt: Optional[str]
+):
+    """
+    오디오 파일 응답 (기본: 스트리밍 포맷, format=wav면 원본 WAV)
 
-    if not task.audio_path or not os.path.exists(task.audio_path):
+    기본 포맷 변환이 아직 끝나지 않았으면 WAV를 제공하고,
+    다른 압축 포맷을 명시적으로 요청하면 그 자리에서 변환한다.
+    """
+    if not wav_path:
         raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다.")
+    touch_task(task_id)
+    has_wav = os.path.exists(wav_path)
 
-    return FileResponse(
-        task.audio_path,
-        media_type="audio/wav",
-        filename=f"original_{task_id}.wav"
-    )
+    if fmt != "wav":
+        if fmt is not None and fmt not in STREAM_FORMATS:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 포맷입니다: {fmt}")
 
+        stream_fmt = fmt or STREAM_FORMAT
+        path = stream_path(wav_path, stream_fmt)
+        if not os.path.exists(path) and fmt is not None and has_wav:
+            try:
+                path = await run_in_stage(STAGE_DOWNLOAD, transcode_for_streaming, wav_path, stream_fmt)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/download/{task_id}/musicxml")
-async def download_musicxml(task_id: str):
-    """MusicXML 파일 다운로드"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        if os.path.exists(path):
+            ext, media_type, _ = STREAM_FORMATS[stream_fmt]
+            return file_response(request, path, media_type, f"{name}_{task_id}{ext}")
 
-    task = tasks[task_id]
+    if not has_wav:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다.")
+    return file_response(request, wav_path, "audio/wav", f"{name}_{task_id}.wav")
 
-    if not task.musicxml_path or not os.path.exists(task.musicxml_path):
-        raise HTTPException(status_code=404, detail="MusicXML 파일을 찾을 수 없습니다.")
 
-    return FileResponse(
-        task.musicxml_path,
-        media_type="application/xml",
-        filename=f"drums_{task_id}.musicxml"
-    )
+@app.api_route("/api/audio/{task_id}/drums", methods=["GET", "HEAD"])
+async def get_drum_audio(task_id: str, request: Request, format: Optional[str] = None):
+    """분리된 드럼 오디오 (Range/ETag 지원, format=wav|opus|aac|flac)"""
+    task = get_task_or_404(task_id)
+    return await _audio_response(request, task_id, task.drum_audio_path, "drums", format)
+
+
+@app.api_route("/api/audio/{task_id}/original", methods=["GET", "HEAD"])
+async def get_original_audio(task_id: str, request: Request, format: Optional[str] = None):
+    """원본 오디오 (Range/ETag 지원, format=wav|opus|aac|flac)"""
+    task = get_task_or_404(task_id)
+    return await _audio_response(request, task_id, task.audio_path, "original", format)
+
+
+@app.get("/api/download/{task_id}/musicxml")
+async def download_musicxml(task_id: str, request: Request):
+    """MusicXML 파일 다운로드"""
+    task = get_task_or_404(task_id)
+    return _score_response(request, task, attachment=True)
 
 
 @app.get("/api/download/{task_id}/midi")
-async def download_midi(task_id: str):
+async def download_midi(task_id: str, request: Request):
     """MIDI 파일 다운로드"""
-    if task_id not in tasks:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
-
-    task = tasks[task_id]
+    task = get_task_or_404(task_id)
 
     if not task.midi_path or not os.path.exists(task.midi_path):
         raise HTTPException(status_code=404, detail="MIDI 파일을 찾을 수 없습니다.")
+    touch_task(task_id)
 
-    return FileResponse(
+    return file_response(
+        request,
         task.midi_path,
         media_type="audio/midi",
-        filename=f"drums_{task_id}.mid"
+        filename=f"drums_{task_id}.mid",
+        attachment=True
     )
 
 
@@ -3,7 +3,7 @@
 """
 from enum import Enum
 from typing import Optional, Dict, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict, fields
 
 
 class TaskStatus(str, Enum):
@@ -26,14 +26,53 @@ class Task:
     current_step: str
     progress: int = 0
 
+    # 캐시 식별자 (예: "youtube:<영상 ID>")
+    source_key: Optional[str] = None
+
+    # 처리할 구간 (초, None이면 전체)
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+    # 분리 등급 (auto로 요청하면 분리 단계 시작 시 실제 등급으로 바뀜)
+    separation_tier: str = "quality"
+
+    # 트랜스크립션 분석 프로필 (fast: HPSS 근사/저역 저해상도, full: 전체 HPSS)
+    analysis_profile: str = "full"
+
     # 파일 경로
     audio_path: Optional[str] = None
     drum_audio_path: Optional[str] = None
     midi_path: Optional[str] = None
+    events_path: Optional[str] = None
     musicxml_path: Optional[str] = None
 
     # 메타데이터
     metadata: Optional[Dict[str, Any]] = field(default_factory=dict)
 
+    # 단계별 계측값 (wall/CPU 시간, 최대 RSS, 입력 길이 등)
+    stage_metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
     # 오류 정보
     error_message: Optional[str] = None
+
+    # 산출물이 저장소 정리(TTL/LRU)로 삭제되었는지 여부 (결과 조회 시 410)
+    expired: bool = False
+
+    @property
+    def is_finished(self) -> bool:
+        """완료 또는 오류로 종료된 작업인지 여부"""
+        return self.status in (TaskStatus.COMPLETE, TaskStatus.ERROR)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """직렬화용 딕셔너리 변환"""
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """딕셔너리에서 Task 복원 (알 수 없는 키는 무시)"""
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in known}
+        values["status"] = TaskStatus(values["status"])
+        return cls(**values)
@@ -0,0 +1,42 @@
+"""
+트랜스크립션 분석 프로필
+
+API 계층이 요청 검증과 캐시 키 계산에 쓰므로 오디오/수치 라이브러리를 가져오지 않는다.
+실제 분석은 spectral_service.analyze_bands가 프로필에 따라 수행한다.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """
+    트랜스크립션 분석 프로필 (전처리와 해상도, 프레임 간격은 항상 HOP_LENGTH / 44.1kHz 기준과 같음)
+
+    - hpss: 타악기 성분 분리 방식
+      "full"은 시간 영역 HPSS (librosa.effects.hpss),
+      "floor"는 저역 스펙트로그램에서 느리게 변하는 조화 성분 바닥값만 빼는 근사,
+      "none"은 생략 (입력이 이미 분리된 드럼 스템일 때)
+    - decimation: 킥/스네어처럼 상한이 낮은 대역을 sr/decimation에서 분석
+      (FFT 크기와 프레임 간격도 1/decimation이라 주파수 해상도와 프레임 격자는 그대로)
+    """
+    name: str
+    hpss: str = "full"
+    decimation: int = 1
+
+
+ANALYSIS_PROFILES: Dict[str, AnalysisProfile] = {
+    "full": AnalysisProfile("full"),
+    "fast": AnalysisProfile("fast", hpss="floor", decimation=4),
+}
+
+DEFAULT_ANALYSIS_PROFILE = os.getenv("DEFAULT_ANALYSIS_PROFILE", "full")
+
+
+def get_analysis_profile(name: Optional[str] = None) -> AnalysisProfile:
+    """이름으로 분석 프로필 조회 (없으면 DEFAULT_ANALYSIS_PROFILE)"""
+    profile = ANALYSIS_PROFILES.get(name or DEFAULT_ANALYSIS_PROFILE)
+    if profile is None:
+        raise ValueError(f"지원하지 않는 분석 프로필입니다: {name}")
+    return profile
@@ -0,0 +1,150 @@
+"""
+오디오 디코딩 서비스
+
+내려받은 원본 압축 스트림(opus/m4a 등)을 ffmpeg로 한 번만 디코딩하여
+분리 모델이 기대하는 샘플링 레이트/채널 구성의 float32 PCM으로 저장한다.
+이후 단계(Demucs, librosa)는 리샘플링/재디코딩 없이 그대로 읽는다.
+"""
+import os
+import uuid
+import logging
+import tempfile
+import subprocess
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 분리 모델 입력 형식 (htdemucs 계열: 44.1kHz 스테레오)
+DECODE_SAMPLE_RATE = 44100
+DECODE_CHANNELS = 2
+
+# ffmpeg 파이프에서 한 번에 읽을 바이트 수
+PIPE_CHUNK_BYTES = 1024 * 1024
+
+# RIFF 4바이트 크기 필드의 최댓값 (넘으면 RF64, 44.1kHz 스테레오 float32 기준 약 3.4시간)
+RIFF_MAX_BYTES = 0xFFFFFFFF
+
+
+def _wav_header(n_frames: int, sample_rate: int, channels: int) -> bytes:
+    """
+    IEEE float32 WAV 헤더 (WAVE_FORMAT_IEEE_FLOAT, fact 청크 포함)
+
+    크기가 4바이트 필드를 넘으면 RF64(EBU Tech 3306)로 쓴다. 디코딩 전에 헤더 자리를 잡아 두고
+    마지막에 채우므로, 길이와 무관하게 헤더 크기가 같도록 ds64 자리에 같은 크기의 JUNK 청크를 둔다.
+    """
+    block_align = channels * 4
+    data_bytes = n_frames * block_align
+    fmt = (
+        (3).to_bytes(2, "little")
+        + channels.to_bytes(2, "little")
+        + sample_rate.to_bytes(4, "little")
+        + (sample_rate * block_align).to_bytes(4, "little")
+        + block_align.to_bytes(2, "little")
+        + (32).to_bytes(2, "little")
+        + (0).to_bytes(2, "little")
+    )
+    # ds64: RIFF 크기, data 크기, 프레임 수 (8바이트씩), 테이블 길이
+    ds64_size = 28
+    riff_bytes = 4 + (8 + ds64_size) + (8 + len(fmt)) + (8 + 4) + 8 + data_bytes
+    rf64 = riff_bytes > RIFF_MAX_BYTES
+    # RF64의 4바이트 크기 필드는 -1로 두고 실제 크기는 ds64에 기록
+    riff_size, data_size = (RIFF_MAX_BYTES, RIFF_MAX_BYTES) if rf64 else (riff_bytes, data_bytes)
+
+    if rf64:
+        reserved = b"ds64" + ds64_size.to_bytes(4, "little") + (
+            riff_bytes.to_bytes(8, "little") + data_bytes.to_bytes(8, "little")
+            + n_frames.to_bytes(8, "little") + (0).to_bytes(4, "little")
+        )
+    else:
+        reserved = b"JUNK" + ds64_size.to_bytes(4, "little") + b"\0" * ds64_size
+
+    fact = min(n_frames, RIFF_MAX_BYTES).to_bytes(4, "little")
+    body = (
+        b"WAVE"
+        + reserved
+        + b"fmt " + len(fmt).to_bytes(4, "little") + fmt
+        + b"fact" + len(fact).to_bytes(4, "little") + fact
+        + b"data" + data_size.to_bytes(4, "little")
+    )
+    return (b"RF64" if rf64 else b"RIFF") + riff_size.to_bytes(4, "little") + body
+
+
+def decode_audio(
+    src_path: str,
+    dest_path: str,
+    sample_rate: int = DECODE_SAMPLE_RATE,
+    channels: int = DECODE_CHANNELS,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+    duration_hint: Optional[float] = None
+) -> str:
+    """
+    압축 오디오를 float32 PCM WAV로 한 번에 디코딩
+
+    ffmpeg 출력(f32le)을 파이프로 받아 청크 단위로 파일에 기록하므로
+    메모리 사용량은 곡 길이와 무관하며, 헤더는 마지막에 실제 길이로 채운다.
+
+    Args:
+        src_path: 원본 오디오 파일 (ffmpeg가 읽을 수 있는 모든 포맷)
+        dest_path: 저장할 WAV 경로
+        sample_rate: 출력 샘플링 레이트
+        channels: 출력 채널 수
+        start: 시작 시각 (초, None이면 처음부터)
+        end: 끝 시각 (초, None이면 끝까지)
+        progress: 진행률 콜백 (0~1, 설명)
+        duration_hint: 진행률 계산용 예상 길이 (초)
+
+    Returns:
+        저장된 WAV 경로
+    """
+    cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", src_path]
+    if end is not None:
+        cmd += ["-t", f"{end - (start or 0):.3f}"]
+    cmd += ["-vn", "-f", "f32le", "-acodec", "pcm_f32le",
+            "-ac", str(channels), "-ar", str(sample_rate), "pipe:1"]
+
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex[:8]}.part"
+    header_size = len(_wav_header(0, sample_rate, channels))
+    expected_bytes = (duration_hint or 0) * sample_rate * channels * 4
+    written = 0
+
+    try:
+        # stderr는 파이프 대신 임시 파일로 받음 (stdout을 읽는 동안 stderr 파이프가 차서 멈추지 않도록)
+        with tempfile.TemporaryFile() as errors, open(tmp_path, "wb") as f:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+            f.write(b"\0" * header_size)
+            while True:
+                chunk = process.stdout.read(PIPE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+                if progress is not None and expected_bytes:
+                    progress(min(written / expected_bytes, 0.99), "디코딩 중")
+
+            if process.wait() != 0:
+                errors.seek(0)
+                raise Exception(errors.read().decode(errors="replace").strip())
+            if written == 0:
+                raise Exception("디코딩된 오디오가 비어 있습니다.")
+
+            n_frames = written // (channels * 4)
+            f.seek(0)
+            f.write(_wav_header(n_frames, sample_rate, channels))
+
+        os.replace(tmp_path, dest_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.error(f"Decoding failed for {src_path}: {str(e)}")
+        raise Exception(f"오디오 디코딩 실패: {str(e)}")
+
+    logger.info(
+        f"Decoded {src_path} -> {dest_path} "
+        f"({n_frames / sample_rate:.1f}s, {sample_rate}Hz, {channels}ch)"
+    )
+    return dest_path
@@ -0,0 +1,210 @@
+"""
+basic-pitch 배치 추론 엔진
+
+basic-pitch 모델은 프로세스에 한 번만 로드되어 상주하며, 전용 추론 스레드가
+대기 중인 여러 작업의 오디오 창을 모아 한 번의 배치 추론으로 처리한다.
+transcription_backends.BasicPitchBackend가 처음 사용할 때 가져온다.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.spectral_service import DrumBand
+
+logger = logging.getLogger(__name__)
+
+# basic-pitch 배치 추론 설정
+# - BATCH_WINDOWS: 한 번의 추론 호출에 넣을 최대 오디오 창 수 (창 1개 ≈ 2초)
+# - BATCH_WAIT: 첫 작업이 들어온 뒤 다른 작업을 모으기 위해 기다리는 최대 시간 (초)
+# - THREADS: TensorFlow 연산 스레드 수 (0이면 TensorFlow 기본값)
+BASIC_PITCH_BATCH_WINDOWS = int(os.getenv("BASIC_PITCH_BATCH_WINDOWS", "32"))
+BASIC_PITCH_BATCH_WAIT = float(os.getenv("BASIC_PITCH_BATCH_WAIT", "0.05"))
+BASIC_PITCH_THREADS = int(os.getenv("BASIC_PITCH_THREADS", "0"))
+
+# basic-pitch 입력/출력 형식 (basic_pitch.constants와 같은 값)
+BP_SAMPLE_RATE = 22050
+BP_HOP_LENGTH = 256
+BP_WINDOW_SAMPLES = 43844
+BP_WINDOW_FRAMES = 172
+BP_OVERLAP_FRAMES = 30
+BP_MIDI_LOW = 21
+BP_N_KEYS = 88
+
+# 겹친 프레임을 잘라 이어 붙인 출력의 평균 프레임 간격 (샘플)
+# 창 간격(43844 - 30×256)을 창마다 남는 142프레임이 나눠 가지므로 256보다 조금 짧다.
+# 256으로 계산하면 창마다 오차가 쌓여 곡 뒤쪽 타격이 밀리고, 평균 간격을 쓰면 창 안에서 최대 9ms 이내이다.
+BP_FRAME_HOP = (BP_WINDOW_SAMPLES - BP_OVERLAP_FRAMES * BP_HOP_LENGTH) / (BP_WINDOW_FRAMES - BP_OVERLAP_FRAMES)
+
+# basic-pitch 음역(27.5Hz~4.2kHz)을 벗어나는 대역은 가장 가까운 한 옥타브를 사용
+_EDGE_KEYS = 12
+
+
+def _window_audio(y: np.ndarray) -> np.ndarray:
+    """
+    basic-pitch 입력 창으로 분할 (basic_pitch.inference.get_audio_input과 같은 배치)
+
+    앞에 겹침 길이의 절반만큼 0을 붙이고, 창 길이 - 겹침 간격으로 잘라 마지막 창은 0으로 채운다.
+
+    Returns:
+        (창 수, BP_WINDOW_SAMPLES, 1) float32 배열
+    """
+    overlap = BP_OVERLAP_FRAMES * BP_HOP_LENGTH
+    hop = BP_WINDOW_SAMPLES - overlap
+    padded = np.concatenate([np.zeros(overlap // 2, dtype=np.float32), y.astype(np.float32, copy=False)])
+    n_windows = max(1, -(-len(padded) // hop))
+    padded = np.pad(padded, (0, (n_windows - 1) * hop + BP_WINDOW_SAMPLES - len(padded)))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, BP_WINDOW_SAMPLES)[::hop]
+    return np.ascontiguousarray(windows[:n_windows])[..., np.newaxis]
+
+
+def _unwrap(output: np.ndarray, n_samples: int) -> np.ndarray:
+    """창별 출력 (창 수, 프레임, 키)에서 겹친 프레임을 잘라 이어 붙임 (basic_pitch.inference.unwrap_output)"""
+    n_olap = BP_OVERLAP_FRAMES // 2
+    output = output[:, n_olap:-n_olap, :]
+    n_frames = int(np.ceil(n_samples / BP_FRAME_HOP))
+    return output.reshape(-1, output.shape[-1])[:n_frames]
+
+
+def band_keys(band: DrumBand) -> slice:
+    """드럼 대역의 주파수 범위에 해당하는 basic-pitch 피아노 키 열 범위"""
+    low = int(np.floor(12 * np.log2(max(band.low, 1.0) / 440.0) + 69)) - BP_MIDI_LOW
+    high = int(np.ceil(12 * np.log2(band.high / 440.0) + 69)) - BP_MIDI_LOW
+    low = min(max(low, 0), BP_N_KEYS - _EDGE_KEYS)
+    high = max(min(high, BP_N_KEYS), low + _EDGE_KEYS)
+    return slice(low, high)
+
+
+class BasicPitchEngine:
+    """
+    프로세스 내 상주 basic-pitch 추론 엔진
+
+    작업마다 오디오를 창으로 나눠 큐에 넣으면, 전용 스레드가 BASIC_PITCH_BATCH_WAIT 동안
+    대기 중인 다른 작업의 창까지 모아 BASIC_PITCH_BATCH_WINDOWS 단위로 추론하고
+    결과를 작업별로 다시 나눠 돌려준다.
+    """
+
+    def __init__(
+        self,
+        batch_windows: int = BASIC_PITCH_BATCH_WINDOWS,
+        batch_wait: float = BASIC_PITCH_BATCH_WAIT,
+        num_threads: int = BASIC_PITCH_THREADS
+    ):
+        self.batch_windows = max(1, batch_windows)
+        self.batch_wait = batch_wait
+        self.num_threads = num_threads
+
+        self._model = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """basic-pitch 모델 로드 (이미 로드되었으면 캐시된 모델 반환)"""
+        with self._lock:
+            if self._model is not None:
+                return self._model
+
+            import tensorflow as tf
+            from basic_pitch import ICASSP_2022_MODEL_PATH
+
+            if self.num_threads > 0:
+                tf.config.threading.set_intra_op_parallelism_threads(self.num_threads)
+
+            logger.info(f"Loading basic-pitch model from {ICASSP_2022_MODEL_PATH}")
+            self._model = tf.saved_model.load(str(ICASSP_2022_MODEL_PATH))
+            return self._model
+
+    def submit(self, y: np.ndarray) -> Future:
+        """
+        추론 작업을 큐에 추가
+
+        Args:
+            y: BP_SAMPLE_RATE 모노 오디오
+
+        Returns:
+            {"onset", "note"} → (프레임, 88) 확률 배열을 결과로 갖는 Future
+        """
+        future: Future = Future()
+        self._queue.put((_window_audio(y), len(y), future))
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="basic-pitch-engine", daemon=True
+                )
+                self._thread.start()
+
+        return future
+
+    def infer(self, y: np.ndarray) -> Dict[str, np.ndarray]:
+        """추론 작업을 큐에 넣고 완료될 때까지 대기"""
+        return self.submit(y).result()
+
+    def _collect(self) -> List[tuple]:
+        """첫 작업을 기다린 뒤 배치가 찰 때까지 (최대 batch_wait 동안) 대기 중인 작업을 더 모음"""
+        jobs = [self._queue.get()]
+        n_windows = len(jobs[0][0])
+        deadline = time.monotonic() + self.batch_wait
+        while n_windows < self.batch_windows:
+            timeout = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            jobs.append(job)
+            n_windows += len(job[0])
+        return jobs
+
+    def _run(self):
+        """작업 큐 처리 루프"""
+        while True:
+            jobs = [job for job in self._collect() if job[2].set_running_or_notify_cancel()]
+            if not jobs:
+                continue
+            try:
+                outputs = self._predict(np.concatenate([windows for windows, _, _ in jobs]))
+            except Exception as e:
+                for _, _, future in jobs:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for windows, n_samples, future in jobs:
+                end = start + len(windows)
+                future.set_result({
+                    key: _unwrap(value[start:end], n_samples) for key, value in outputs.items()
+                })
+                start = end
+
+    def _predict(self, windows: np.ndarray) -> Dict[str, np.ndarray]:
+        """창 배열을 batch_windows 단위로 추론하여 키별로 이어 붙임"""
+        model = self.load()
+        outputs: Dict[str, List[np.ndarray]] = {"onset": [], "note": []}
+        started = time.perf_counter()
+        for i in range(0, len(windows), self.batch_windows):
+            result = model(windows[i:i + self.batch_windows])
+            for key in outputs:
+                outputs[key].append(np.asarray(result[key]))
+        logger.info(
+            f"basic-pitch batch: {len(windows)} windows in {time.perf_counter() - started:.2f}s"
+        )
+        return {key: np.concatenate(value) for key, value in outputs.items()}
+
+
+_engine: Optional[BasicPitchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_basic_pitch_engine() -> BasicPitchEngine:
+    """프로세스당 하나의 basic-pitch 엔진 반환"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = BasicPitchEngine()
+        return _engine
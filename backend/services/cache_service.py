@@ -0,0 +1,320 @@
+"""
+결과 캐시 서비스 (YouTube 영상 ID 기준 콘텐츠 주소 저장소)
+
+같은 영상이 반복 요청되면 다운로드/분리/트랜스크립션/렌더링을 다시 실행하지 않고
+캐시된 단계 산출물을 하드링크로 복원한다.
+"""
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from services.storage_service import ARTIFACT_ROOT
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(ARTIFACT_ROOT, "cache"))
+
+# 캐시 최대 크기 (기본 20GB)
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(20 * 1024 ** 3)))
+
+# 단계별 모델/파라미터 버전 (산출물이 바뀌는 변경 시 올려야 함)
+STAGE_VERSIONS = {
+    "download": "yt-dlp-native-f32:2",
+    "separate": "demucs-two-stems:1",
+    "transcribe": "spectral-flux-beats:4",
+    "render": "direct-musicxml:2",
+}
+STAGE_ORDER = ("download", "separate", "transcribe", "render")
+
+_YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com", "youtu.be")
+_PATH_PREFIXES = ("/shorts/", "/embed/", "/live/", "/v/")
+
+
+def extract_video_id(youtube_url: str) -> Optional[str]:
+    """
+    URL 파싱만으로 YouTube 영상 ID 추출 (네트워크 요청 없음)
+
+    Args:
+        youtube_url: YouTube URL
+
+    Returns:
+        영상 ID (인식할 수 없는 URL이면 None)
+    """
+    try:
+        parsed = urlparse(youtube_url.strip())
+    except ValueError:
+        return None
+
+    host = (parsed.hostname or "").lower()
+    if not any(host == h or host.endswith("." + h) for h in _YOUTUBE_HOSTS):
+        return None
+
+    if host.endswith("youtu.be"):
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    elif parsed.path == "/watch":
+        video_id = parse_qs(parsed.query).get("v", [""])[0]
+    else:
+        video_id = ""
+        for prefix in _PATH_PREFIXES:
+            if parsed.path.startswith(prefix):
+                video_id = parsed.path[len(prefix):].split("/")[0]
+                break
+
+    return video_id if len(video_id) == 11 else None
+
+
+def stage_key(source_key: str, stage: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    단계별 캐시 키 생성
+
+    산출물은 앞선 단계에 의존하므로, 해당 단계까지의 모든 단계 버전을 키에 포함한다.
+
+    Args:
+        source_key: 입력 식별자 (예: "youtube:<영상 ID>")
+        stage: 단계 이름
+        params: 산출물에 영향을 주는 추가 파라미터
+
+    Returns:
+        sha256 16진수 키
+    """
+    upstream = STAGE_ORDER[:STAGE_ORDER.index(stage) + 1]
+    parts = [source_key] + [f"{s}={STAGE_VERSIONS[s]}" for s in upstream]
+    if params:
+        parts.append(json.dumps(params, sort_keys=True))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _file_sha256(path: str) -> str:
+    """파일 내용의 sha256 계산 (청크 단위)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src: str, dst: str):
+    """하드링크 시도 후 실패하면 복사"""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ArtifactCache:
+    """
+    콘텐츠 주소 기반 단계 산출물 캐시
+
+    - objects/<앞 2자리>/<sha256>: 파일 내용 (중복 저장 없음)
+    - index.db: 단계 키 → 파일 목록/메타데이터, 마지막 접근 시각 (LRU 축출용)
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, "index.db"),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entry_files (
+                key TEXT NOT NULL,
+                name TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                ext TEXT NOT NULL,
+                PRIMARY KEY (key, name)
+            );
+            CREATE TABLE IF NOT EXISTS objects (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access);
+            CREATE INDEX IF NOT EXISTS idx_entry_files_hash ON entry_files(hash);
+        """)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def get(self, key: str, dest_dir: str) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """
+        캐시된 단계 산출물을 dest_dir에 복원
+
+        Args:
+            key: 단계 캐시 키
+            dest_dir: 복원할 디렉토리
+
+        Returns:
+            (이름 → 파일 경로, 메타데이터) 또는 캐시 미스 시 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            files = self._conn.execute(
+                "SELECT name, hash, ext FROM entry_files WHERE key = ?", (key,)
+            ).fetchall()
+
+            if not all(os.path.exists(self._object_path(h)) for _, h, _ in files):
+                logger.warning(f"Cache entry {key[:12]} has missing objects, dropping")
+                self._delete_entry(key)
+                self._collect_orphans()
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+
+        os.makedirs(dest_dir, exist_ok=True)
+        paths = {}
+        for name, digest, ext in files:
+            path = os.path.join(dest_dir, f"{name}{ext}")
+            _link_or_copy(self._object_path(digest), path)
+            paths[name] = path
+
+        return paths, json.loads(row[0])
+
+    def put(self, key: str, stage: str, files: Dict[str, str], metadata: Optional[Dict[str, Any]] = None):
+        """
+        단계 산출물을 캐시에 저장
+
+        Args:
+            key: 단계 캐시 키
+            stage: 단계 이름
+            files: 이름 → 파일 경로
+            metadata: 함께 저장할 JSON 직렬화 가능한 메타데이터
+        """
+        hashed = [self._store_object(name, path) for name, path in files.items()]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete_entry(key)
+                self._conn.execute(
+                    "INSERT INTO entries (key, stage, metadata, last_access) VALUES (?, ?, ?, ?)",
+                    (key, stage, json.dumps(metadata or {}), time.time())
+                )
+                self._insert_files(key, hashed)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._evict()
+
+        logger.info(f"Cached {stage} artifacts under {key[:12]}")
+
+    def attach(self, key: str, files: Dict[str, str]) -> bool:
+        """
+        기존 캐시 항목에 파일 추가 (재생용 사본처럼 단계가 끝난 뒤 백그라운드에서 만들어지는 파일)
+
+        Args:
+            key: 단계 캐시 키
+            files: 이름 → 파일 경로
+
+        Returns:
+            추가했으면 True, 항목이 없으면(저장되지 않았거나 축출됨) False
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is None:
+                return False
+
+        hashed = [self._store_object(name, path) for name, path in files.items()]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+                if exists:
+                    self._conn.execute(
+                        f"DELETE FROM entry_files WHERE key = ? AND name IN ({','.join('?' * len(files))})",
+                        (key, *files)
+                    )
+                    self._insert_files(key, hashed)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            # 교체된 이전 사본이나 그 사이 항목이 축출되어 참조가 없는 객체 정리
+            self._collect_orphans()
+            if exists:
+                self._evict()
+        return exists is not None
+
+    def _store_object(self, name: str, path: str) -> Tuple[str, str, str, int]:
+        """파일을 객체 저장소에 넣고 (이름, 해시, 확장자, 크기) 반환 (이미 있으면 그대로 사용)"""
+        digest = _file_sha256(path)
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{os.getpid()}.tmp"
+            _link_or_copy(path, tmp_path)
+            os.replace(tmp_path, object_path)
+        return name, digest, os.path.splitext(path)[1], os.path.getsize(object_path)
+
+    def _insert_files(self, key: str, hashed: List[Tuple[str, str, str, int]]):
+        for name, digest, ext, size in hashed:
+            self._conn.execute(
+                "INSERT INTO entry_files (key, name, hash, ext) VALUES (?, ?, ?, ?)",
+                (key, name, digest, ext)
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO objects (hash, size) VALUES (?, ?)",
+                (digest, size)
+            )
+
+    def total_bytes(self) -> int:
+        """캐시 객체 총 크기"""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _delete_entry(self, key: str):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM entry_files WHERE key = ?", (key,))
+
+    def _collect_orphans(self):
+        """어떤 항목에서도 참조하지 않는 객체 삭제"""
+        orphans = self._conn.execute(
+            "SELECT hash FROM objects WHERE hash NOT IN (SELECT hash FROM entry_files)"
+        ).fetchall()
+        for (digest,) in orphans:
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+
+    def _evict(self):
+        """최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)"""
+        while self.total_bytes() > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key FROM entries ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            logger.info(f"Evicting cache entry {row[0][:12]}")
+            self._delete_entry(row[0])
+            self._collect_orphans()
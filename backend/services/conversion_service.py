@@ -1,14 +1,337 @@
 """
 MIDI to MusicXML 변환 서비스
+
+드럼 이벤트 배열은 music21을 거치지 않고 Standard MIDI / 타악기 MusicXML로 직접 기록한다.
 """
 import os
+import struct
 import logging
-from music21 import converter, stream, instrument
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.rhythm_service import TempoMap
+from services.storage_service import task_dir, tempo_map_path
 
 logger = logging.getLogger(__name__)
 
+MIDI_TICKS_PER_QUARTER = 480
+MIDI_DRUM_CHANNEL = 9  # GM 드럼 채널 (10번, 0부터 시작)
+
+BEATS_PER_MEASURE = 4  # 4/4 박자
+
+# 템포 맵을 마디별 템포로 옮길 때 허용하는 재생 시각 오차 (초)
+TEMPO_DRIFT_SECONDS = 0.02
+
+# GM 드럼 번호 → (이름, 표기 음이름, 옥타브, notehead, 성부)
+# 성부 1은 손(스템 위), 성부 2는 발(스템 아래)
+DRUM_NOTATION: Dict[int, Tuple[str, str, int, Optional[str], int]] = {
+    35: ("Acoustic Bass Drum", "E", 4, None, 2),
+    36: ("Bass Drum", "F", 4, None, 2),
+    37: ("Side Stick", "C", 5, "x", 1),
+    38: ("Snare", "C", 5, None, 1),
+    40: ("Electric Snare", "C", 5, None, 1),
+    41: ("Low Floor Tom", "G", 4, None, 1),
+    42: ("Closed Hi-hat", "G", 5, "x", 1),
+    43: ("High Floor Tom", "A", 4, None, 1),
+    44: ("Pedal Hi-hat", "D", 4, "x", 2),
+    45: ("Low Tom", "D", 5, None, 1),
+    46: ("Open Hi-hat", "G", 5, "circle-x", 1),
+    47: ("Low-Mid Tom", "D", 5, None, 1),
+    48: ("Hi-Mid Tom", "E", 5, None, 1),
+    49: ("Crash Cymbal", "A", 5, "x", 1),
+    50: ("High Tom", "E", 5, None, 1),
+    51: ("Ride Cymbal", "F", 5, "x", 1),
+    53: ("Ride Bell", "F", 5, "diamond", 1),
+    57: ("Crash Cymbal 2", "B", 5, "x", 1),
+}
+_DEFAULT_NOTATION = ("Percussion", "C", 5, "x", 1)
+
+# 4분음표 단위 길이 → MusicXML 음표 종류
+_NOTE_TYPES = {
+    4.0: "whole", 2.0: "half", 1.0: "quarter",
+    0.5: "eighth", 0.25: "16th", 0.125: "32nd", 0.0625: "64th",
+}
+
+
+def _vlq(value: int) -> bytes:
+    """MIDI 가변 길이 정수 인코딩"""
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def tempo_changes(bpm: float, tempo_map: Optional[TempoMap] = None) -> List[Tuple[float, float]]:
+    """
+    마디 단위 템포 변경 목록
+
+    기록된 템포로 재생한 마디 시작 시각이 템포 맵과 TEMPO_DRIFT_SECONDS 이상 어긋날 때만
+    새 템포를 넣으므로, 박 추적 잡음으로 매 마디 템포가 바뀌지 않으면서도 오차가 누적되지 않는다.
+
+    Args:
+        bpm: 템포 맵이 없을 때의 고정 템포
+        tempo_map: 박 위치 기반 템포 맵
+
+    Returns:
+        [(박 번호, BPM), ...] (첫 항목은 항상 0번 박)
+    """
+    if tempo_map is None:
+        return [(0.0, float(bpm))]
+
+    starts = np.arange(0, tempo_map.beats[-1] + BEATS_PER_MEASURE, BEATS_PER_MEASURE, dtype=np.float64)
+    bar_times = tempo_map.beat_to_time(starts)
+
+    changes: List[Tuple[float, float]] = []
+    played = bar_times[0]
+    for beat, end in zip(starts[:-1].tolist(), bar_times[1:].tolist()):
+        if not changes or abs(played + 60.0 * BEATS_PER_MEASURE / changes[-1][1] - end) > TEMPO_DRIFT_SECONDS:
+            changes.append((beat, round(60.0 * BEATS_PER_MEASURE / (end - played), 1)))
+        played += 60.0 * BEATS_PER_MEASURE / changes[-1][1]
+    return changes
+
 
-async def midi_to_musicxml(midi_path: str, task_id: str) -> str:
+def write_drum_midi(
+    events: np.ndarray,
+    bpm: float,
+    path: str,
+    grid: int = 4,
+    tempo_map: Optional[TempoMap] = None
+) -> str:
+    """
+    퀀타이즈된 드럼 이벤트 배열을 Standard MIDI (format 0) 파일로 기록
+
+    Args:
+        events: EVENT_DTYPE 배열 (beat, midi, velocity 필드 사용)
+        bpm: 템포 (tempo_map이 없을 때 사용)
+        path: 저장할 MIDI 파일 경로
+        grid: 4분음표당 격자 수 (노트 길이 = 격자 1칸)
+        tempo_map: 주어지면 마디마다 템포 변경 이벤트를 기록하여 원곡 연주 시각과 맞춤
+
+    Returns:
+        MIDI 파일 경로
+    """
+    note_ticks = MIDI_TICKS_PER_QUARTER // grid
+    starts = np.round(events["beat"] * MIDI_TICKS_PER_QUARTER).astype(np.int64)
+
+    changes = tempo_changes(bpm, tempo_map)
+    tempo_ticks = np.round(np.array([beat for beat, _ in changes]) * MIDI_TICKS_PER_QUARTER).astype(np.int64)
+    tempos = [int(round(60_000_000 / change_bpm)) for _, change_bpm in changes]
+
+    # (tick, 순서, 상태, 노트, 세기): 같은 tick에서는 템포 변경, note off, note on 순
+    # 인덱스 2n 이후는 템포 변경 이벤트
+    n = len(events)
+    ticks = np.concatenate([starts + note_ticks, starts, tempo_ticks[1:]])
+    order = np.concatenate([
+        np.zeros(n, dtype=np.int8), np.ones(n, dtype=np.int8), np.full(len(changes) - 1, -1, dtype=np.int8)
+    ])
+    status = np.concatenate([
+        np.full(n, 0x80 | MIDI_DRUM_CHANNEL), np.full(n, 0x90 | MIDI_DRUM_CHANNEL)
+    ])
+    notes = np.concatenate([events["midi"], events["midi"]])
+    velocities = np.concatenate([np.zeros(n, dtype=np.uint8), events["velocity"]])
+
+    idx = np.lexsort((order, ticks))
+    deltas = np.diff(ticks[idx], prepend=0)
+
+    track = bytearray()
+    track += b"\x00\xff\x51\x03" + tempos[0].to_bytes(3, "big")
+    track += b"\x00\xff\x58\x04" + bytes([BEATS_PER_MEASURE, 2, 24, 8])
+    for delta, i in zip(deltas.tolist(), idx.tolist()):
+        track += _vlq(delta)
+        if i >= 2 * n:
+            track += b"\xff\x51\x03" + tempos[i - 2 * n + 1].to_bytes(3, "big")
+        else:
+            track += bytes((int(status[i]), int(notes[i]), int(velocities[i])))
+    track += b"\x00\xff\x2f\x00"
+
+    with open(path, "wb") as f:
+        f.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, MIDI_TICKS_PER_QUARTER))
+        f.write(b"MTrk" + struct.pack(">I", len(track)))
+        f.write(track)
+
+    return path
+
+
+def _rest_durations(start: int, end: int, measure_len: int) -> List[int]:
+    """start~end 구간을 박 위치에 정렬된 2의 거듭제곱 길이 쉼표로 분할"""
+    durations = []
+    while start < end:
+        d = measure_len
+        while d > 1 and (start % d != 0 or start + d > end):
+            d //= 2
+        durations.append(d)
+        start += d
+    return durations
+
+
+def _voice_xml(
+    positions: Dict[int, List[int]],
+    voice: int,
+    measure_len: int,
+    divisions: int
+) -> List[str]:
+    """한 마디의 한 성부를 MusicXML note 요소 목록으로 변환"""
+    out = []
+    stem = "up" if voice == 1 else "down"
+    cursor = 0
+
+    def rest(d):
+        kind = _NOTE_TYPES[d / divisions]
+        out.append(
+            f"<note><rest/><duration>{d}</duration><voice>{voice}</voice>"
+            f"<type>{kind}</type></note>"
+        )
+
+    for pos in sorted(positions):
+        for d in _rest_durations(cursor, pos, measure_len):
+            rest(d)
+        kind = _NOTE_TYPES[1 / divisions]
+        for j, midi in enumerate(sorted(positions[pos])):
+            _, step, octave, notehead, _ = DRUM_NOTATION.get(midi, _DEFAULT_NOTATION)
+            out.append(
+                "<note>"
+                + ("<chord/>" if j else "")
+                + f"<unpitched><display-step>{step}</display-step>"
+                f"<display-octave>{octave}</display-octave></unpitched>"
+                f"<duration>1</duration><instrument id=\"P1-I{midi}\"/>"
+                f"<voice>{voice}</voice><type>{kind}</type><stem>{stem}</stem>"
+                + (f"<notehead>{notehead}</notehead>" if notehead else "")
+                + "</note>"
+            )
+        cursor = pos + 1
+
+    for d in _rest_durations(cursor, measure_len, measure_len):
+        rest(d)
+    return out
+
+
+def write_drum_musicxml(
+    events: np.ndarray,
+    bpm: float,
+    path: str,
+    grid: int = 4,
+    title: str = "Drums",
+    tempo_map: Optional[TempoMap] = None
+) -> str:
+    """
+    퀀타이즈된 드럼 이벤트 배열을 타악기 MusicXML (partwise)로 한 번에 기록
+
+    손(스네어/심벌/탐)은 성부 1, 발(킥/페달 하이햇)은 성부 2로 나누고,
+    심벌류는 x notehead로 표기한다.
+
+    Args:
+        events: EVENT_DTYPE 배열 (beat, midi 필드 사용)
+        bpm: 템포
+        path: 저장할 MusicXML 파일 경로
+        grid: 4분음표당 격자 수 (2의 거듭제곱)
+        title: 악보 제목
+        tempo_map: 주어지면 템포가 바뀌는 마디마다 재생 템포(<sound tempo>)를 기록
+
+    Returns:
+        MusicXML 파일 경로
+    """
+    if grid < 1 or grid & (grid - 1):
+        raise ValueError(f"격자 수는 2의 거듭제곱이어야 합니다: {grid}")
+
+    divisions = grid
+    measure_len = BEATS_PER_MEASURE * divisions
+
+    slots = np.round(events["beat"] * divisions).astype(np.int64)
+    measures = slots // measure_len
+    n_measures = int(measures.max()) + 1 if len(events) else 1
+
+    # 마디 → 성부 → 위치 → MIDI 번호 목록
+    layout: List[Dict[int, Dict[int, List[int]]]] = [{1: {}, 2: {}} for _ in range(n_measures)]
+    for slot, measure, midi in zip(slots.tolist(), measures.tolist(), events["midi"].tolist()):
+        voice = DRUM_NOTATION.get(midi, _DEFAULT_NOTATION)[4]
+        layout[measure][voice].setdefault(slot - measure * measure_len, []).append(midi)
+
+    # 마디 번호 → 재생 템포 (악보에 표시하는 메트로놈은 첫 마디의 대표 템포만)
+    measure_tempos = {int(beat) // BEATS_PER_MEASURE: tempo for beat, tempo in tempo_changes(bpm, tempo_map)}
+
+    used = sorted(set(events["midi"].tolist()))
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" '
+        '"http://www.musicxml.org/dtds/partwise.dtd">',
+        '<score-partwise version="4.0">',
+        f"<work><work-title>{title}</work-title></work>",
+        '<part-list><score-part id="P1"><part-name>Drums</part-name>',
+    ]
+    for midi in used:
+        parts.append(
+            f'<score-instrument id="P1-I{midi}"><instrument-name>'
+            f"{DRUM_NOTATION.get(midi, _DEFAULT_NOTATION)[0]}</instrument-name></score-instrument>"
+        )
+    for midi in used:
+        parts.append(
+            f'<midi-instrument id="P1-I{midi}"><midi-channel>{MIDI_DRUM_CHANNEL + 1}</midi-channel>'
+            f"<midi-unpitched>{midi + 1}</midi-unpitched></midi-instrument>"
+        )
+    parts.append('</score-part></part-list><part id="P1">')
+
+    for m, voices in enumerate(layout):
+        parts.append(f'<measure number="{m + 1}">')
+        if m == 0:
+            parts.append(
+                f"<attributes><divisions>{divisions}</divisions><key><fifths>0</fifths></key>"
+                f"<time><beats>{BEATS_PER_MEASURE}</beats><beat-type>4</beat-type></time>"
+                "<clef><sign>percussion</sign><line>2</line></clef></attributes>"
+                '<direction placement="above"><direction-type><metronome>'
+                f"<beat-unit>quarter</beat-unit><per-minute>{bpm:g}</per-minute>"
+                f'</metronome></direction-type><sound tempo="{measure_tempos[0]:g}"/></direction>'
+            )
+        elif m in measure_tempos:
+            parts.append(f'<sound tempo="{measure_tempos[m]:g}"/>')
+        parts.extend(_voice_xml(voices[1], 1, measure_len, divisions))
+        parts.append(f"<backup><duration>{measure_len}</duration></backup>")
+        parts.extend(_voice_xml(voices[2], 2, measure_len, divisions))
+        parts.append("</measure>")
+
+    parts.append("</part></score-partwise>")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+    return path
+
+
+def render_musicxml(events_path: str, task_id: str, bpm: float, grid: int = 4) -> str:
+    """
+    트랜스크립션 단계가 저장한 이벤트 배열에서 MusicXML 생성 (MIDI 재파싱 없음)
+
+    이벤트 배열 옆에 템포 맵(beats.npy)이 있으면 마디별 템포 변경을 함께 기록한다.
+
+    Args:
+        events_path: events.npy 경로
+        task_id: 작업 ID
+        bpm: 템포
+        grid: 4분음표당 격자 수
+
+    Returns:
+        MusicXML 파일 경로
+    """
+    try:
+        logger.info(f"Rendering MusicXML from events: {events_path}")
+
+        events = np.load(events_path)
+        beats_path = tempo_map_path(events_path)
+        tempo_map = TempoMap.load(beats_path) if os.path.exists(beats_path) else None
+        musicxml_path = os.path.join(task_dir(task_id, "render"), f"{task_id}.musicxml")
+        write_drum_musicxml(events, bpm, musicxml_path, grid=grid, tempo_map=tempo_map)
+
+        logger.info(f"MusicXML rendering complete: {musicxml_path}")
+        return musicxml_path
+
+    except Exception as e:
+        logger.error(f"MusicXML rendering failed: {str(e)}")
+        raise Exception(f"MusicXML 변환 실패: {str(e)}")
+
+
+def midi_to_musicxml(midi_path: str, task_id: str) -> str:
     """
     MIDI 파일을 MusicXML로 변환
 
@@ -19,6 +342,8 @@ async def midi_to_musicxml(midi_path: str, task_id: str) -> str:
     Returns:
         MusicXML 파일 경로
     """
+    from music21 import converter, instrument
+
     try:
         logger.info(f"Converting MIDI to MusicXML: {midi_path}")
 
@@ -44,7 +369,7 @@ async def midi_to_musicxml(midi_path: str, task_id: str) -> str:
         raise Exception(f"MusicXML 변환 실패: {str(e)}")
 
 
-async def midi_to_pdf(midi_path: str, task_id: str) -> str:
+def midi_to_pdf(midi_path: str, task_id: str) -> str:
     """
     MIDI 파일을 PDF 악보로 변환 (선택사항)
 
@@ -55,6 +380,8 @@ async def midi_to_pdf(midi_path: str, task_id: str) -> str:
     Returns:
         PDF 파일 경로
     """
+    from music21 import converter
+
     try:
         logger.info(f"Converting MIDI to PDF: {midi_path}")
 
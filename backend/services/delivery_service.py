@@ -0,0 +1,338 @@
+"""
+결과 파일 전송 서비스
+
+분리된 스템/원본 오디오를 스트리밍용 압축 포맷으로 한 번만 변환해 WAV 옆에 보관하고,
+악보 같은 텍스트 산출물은 미리 gzip으로 압축해 두며,
+파일을 ETag/조건부 GET(304)과 HTTP Range(206)를 지원하는 응답으로 메모리에 올리지 않고 전송한다.
+"""
+import os
+import re
+import gzip
+import shutil
+import logging
+import subprocess
+import uuid
+from email.utils import formatdate
+from typing import Dict, Iterator, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# 스트리밍 포맷: (확장자, MIME 타입, ffmpeg 인코더 인자)
+STREAM_FORMATS = {
+    "opus": (".opus", "audio/ogg", ["-c:a", "libopus", "-b:a", "96k"]),
+    "aac": (".m4a", "audio/mp4", ["-c:a", "aac", "-b:a", "160k", "-movflags", "+faststart"]),
+    "flac": (".flac", "audio/flac", ["-c:a", "flac", "-compression_level", "5"]),
+}
+
+# 기본 스트리밍 포맷 (Safari 구버전 지원이 필요하면 aac)
+STREAM_FORMAT = os.getenv("STREAM_FORMAT", "opus")
+
+# 파일 전송 청크 크기 (바이트)
+CHUNK_SIZE = 256 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def stream_path(wav_path: str, fmt: str = STREAM_FORMAT) -> str:
+    """WAV 파일 옆에 저장되는 스트리밍 포맷 파일 경로"""
+    return os.path.splitext(wav_path)[0] + STREAM_FORMATS[fmt][0]
+
+
+def stream_cache_name(name: str, fmt: str = STREAM_FORMAT) -> str:
+    """단계 캐시 항목에 재생용 사본을 함께 저장할 때의 이름 (<WAV 이름>_<포맷>)"""
+    return f"{name}_{fmt}"
+
+
+def restore_stream_copies(files: Dict[str, str]) -> Dict[str, str]:
+    """
+    캐시에서 함께 복원된 재생용 사본을 WAV 옆 이름(stream_path)으로 옮김
+
+    Args:
+        files: 캐시에서 복원된 이름 → 파일 경로 (재생용 사본 항목은 제거됨)
+
+    Returns:
+        같은 딕셔너리
+    """
+    for name in [n for n in files if "_" in n]:
+        base, fmt = name.rsplit("_", 1)
+        if base in files and fmt in STREAM_FORMATS:
+            os.replace(files.pop(name), stream_path(files[base], fmt))
+    return files
+
+
+def share_stream_copy(source_wav: str, wav_path: str, fmt: str = STREAM_FORMAT) -> Optional[str]:
+    """
+    같은 내용의 WAV(분리 없이 믹스를 그대로 쓰는 드럼 트랙 등)에 이미 만든 재생용 사본을 하드링크로 공유
+
+    Returns:
+        재생용 사본 경로, 원본 사본이 없으면 None
+    """
+    source = stream_path(source_wav, fmt)
+    if not os.path.exists(source):
+        return None
+    output_path = stream_path(wav_path, fmt)
+    tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part"
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def transcode_for_streaming(wav_path: str, fmt: str = STREAM_FORMAT) -> str:
+    """
+    오디오 파일을 스트리밍 포맷으로 변환 (이미 있으면 그대로 사용)
+
+    호출마다 다른 임시 파일에 기록한 뒤 이름을 바꾸므로 변환 중인 파일이 전송되지 않고,
+    같은 파일을 동시에 변환해도 서로 덮어쓰지 않는다.
+
+    Args:
+        wav_path: 원본 WAV 파일 경로
+        fmt: STREAM_FORMATS 키
+
+    Returns:
+        변환된 파일 경로
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"지원하지 않는 스트리밍 포맷입니다: {fmt}")
+
+    output_path = stream_path(wav_path, fmt)
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(wav_path):
+        return output_path
+
+    ext, _, codec_args = STREAM_FORMATS[fmt]
+    tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part{ext}"
+    cmd = [
+        "ffmpeg", "-y", "-v", "error", "-i", wav_path,
+        "-vn", "-map_metadata", "-1", *codec_args, tmp_path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        if result.returncode != 0:
+            raise Exception(result.stderr.strip())
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.error(f"Transcoding failed for {wav_path}: {str(e)}")
+        raise Exception(f"오디오 변환 실패: {str(e)}")
+
+    logger.info(
+        f"Transcoded {wav_path} -> {output_path} "
+        f"({os.path.getsize(wav_path)} -> {os.path.getsize(output_path)} bytes)"
+    )
+    return output_path
+
+
+# 스트리밍 포맷별로 재인코딩 없이 옮겨 담을 수 있는 원본 코덱 (yt-dlp acodec 접두어)
+_COPYABLE_CODECS = {"opus": "opus", "aac": "mp4a"}
+
+
+def adopt_stream_copy(source_path: str, source_codec: Optional[str], wav_path: str) -> Optional[str]:
+    """
+    원본 압축 스트림의 코덱이 스트리밍 포맷과 같으면 재인코딩 없이 컨테이너만 바꿔 재생용 사본으로 사용
+
+    Args:
+        source_path: 내려받은 원본 스트림 파일
+        source_codec: 원본 코덱 (예: "opus", "mp4a.40.2")
+        wav_path: 같은 내용을 디코딩한 WAV 경로 (재생용 사본이 이 옆에 저장됨)
+
+    Returns:
+        재생용 사본 경로, 코덱이 다르거나 실패하면 None (이후 transcode_for_streaming 사용)
+    """
+    codec = _COPYABLE_CODECS.get(STREAM_FORMAT)
+    if not codec or not source_codec or not source_codec.startswith(codec):
+        return None
+
+    ext = STREAM_FORMATS[STREAM_FORMAT][0]
+    output_path = stream_path(wav_path)
+    tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part{ext}"
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", source_path, "-vn", "-map_metadata", "-1", "-c:a", "copy"]
+    if STREAM_FORMAT == "aac":
+        cmd += ["-movflags", "+faststart"]
+
+    result = subprocess.run(cmd + [tmp_path], capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.warning(f"Stream copy failed for {source_path}: {result.stderr.strip()}")
+        return None
+
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def precompress(path: str) -> str:
+    """
+    파일을 gzip으로 미리 압축하여 path.gz로 저장 (이미 최신이면 그대로 사용)
+
+    Args:
+        path: 원본 파일 경로
+
+    Returns:
+        압축 파일 경로
+    """
+    gz_path = f"{path}.gz"
+    if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(path):
+        return gz_path
+
+    tmp_path = f"{gz_path}.{uuid.uuid4().hex[:8]}.part"
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=9) as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    os.replace(tmp_path, gz_path)
+    return gz_path
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Accept-Encoding에 gzip이 허용되어 있는지 확인 (q=0 제외)"""
+    for token in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = token.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _etag(stat: os.stat_result, suffix: str = "") -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"'
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    단일 바이트 범위 파싱
+
+    Returns:
+        (시작, 끝) 포함 범위, 여러 범위 등 처리하지 않는 형식이면 None
+
+    Raises:
+        ValueError: 파일 크기를 벗어난 범위 (416)
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 마지막 N바이트
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    headers: Optional[dict] = None,
+    gzip_path: Optional[str] = None,
+    attachment: bool = False
+) -> Response:
+    """
+    ETag/조건부 GET과 HTTP Range를 지원하는 파일 응답
+
+    - If-None-Match가 현재 ETag와 같으면 304
+    - Range: bytes=a-b (단일 범위)이면 206, 범위를 벗어나면 416
+    - If-Range가 현재 ETag와 다르면 전체 파일(200)
+    - gzip_path가 있고 클라이언트가 gzip을 허용하면 미리 압축된 파일을 그대로 전송
+
+    Args:
+        request: 요청 객체
+        path: 파일 경로
+        media_type: Content-Type
+        filename: 다운로드 파일 이름 (Content-Disposition)
+        headers: 추가 응답 헤더
+        gzip_path: 미리 압축된 파일 경로 (precompress 결과)
+        attachment: 다운로드로 처리할지 여부 (기본값 inline)
+
+    Returns:
+        304/206/200/416 응답
+    """
+    encoding_headers = {}
+    if gzip_path is not None:
+        encoding_headers["Vary"] = "Accept-Encoding"
+        if os.path.exists(gzip_path) and accepts_gzip(request):
+            path = gzip_path
+            encoding_headers["Content-Encoding"] = "gzip"
+
+    stat = os.stat(path)
+    etag = _etag(stat, "-gz" if "Content-Encoding" in encoding_headers else "")
+    base_headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        **encoding_headers,
+        **(headers or {}),
+    }
+    if filename:
+        disposition = "attachment" if attachment else "inline"
+        base_headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=base_headers)
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**base_headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    if byte_range is None:
+        start, length, status_code = 0, size, 200
+    else:
+        start, end = byte_range
+        length, status_code = end - start + 1, 206
+        base_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    base_headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=base_headers, media_type=media_type)
+
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=status_code,
+        headers=base_headers,
+        media_type=media_type
+    )
@@ -0,0 +1,120 @@
+"""
+드럼 이벤트 배열 처리 (병합, 중복 제거, 퀀타이즈)
+
+피크 검출 결과를 NumPy 구조화 배열로 다루어 타격 수에 비례하는 Python 루프 없이
+정렬/중복 제거/퀀타이즈를 한 번에 처리한다.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from services.rhythm_service import TempoMap
+
+# 피크 검출 직후의 타격 (시간 단위: 초)
+HIT_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("instrument", "u1"),
+    ("velocity", "f4"),
+])
+
+# 퀀타이즈된 이벤트 (beat 단위: 4분음표)
+EVENT_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("beat", "f8"),
+    ("instrument", "u1"),
+    ("midi", "u1"),
+    ("velocity", "u1"),
+])
+
+
+def make_hits(
+    band_times: Sequence[np.ndarray],
+    band_strengths: Sequence[np.ndarray]
+) -> np.ndarray:
+    """
+    대역별 타격 시각/세기를 하나의 타격 배열로 결합
+
+    Args:
+        band_times: 대역별 타격 시각 (초)
+        band_strengths: 대역별 타격 세기 (0~1)
+
+    Returns:
+        HIT_DTYPE 구조화 배열 (정렬되지 않음)
+    """
+    counts = [len(t) for t in band_times]
+    hits = np.empty(sum(counts), dtype=HIT_DTYPE)
+    if len(hits) == 0:
+        return hits
+
+    hits["time"] = np.concatenate(band_times)
+    hits["velocity"] = np.concatenate(band_strengths)
+    hits["instrument"] = np.repeat(np.arange(len(counts)), counts)
+    return hits
+
+
+def merge_hits(hits: np.ndarray, window: float = 0.05) -> np.ndarray:
+    """
+    악기별로 window(초) 이내에 연속된 타격을 제거하고 시간순으로 정렬
+
+    Args:
+        hits: HIT_DTYPE 배열
+        window: 같은 악기의 중복으로 간주할 간격 (초)
+
+    Returns:
+        중복이 제거된 시간순 HIT_DTYPE 배열
+    """
+    if len(hits) == 0:
+        return hits
+
+    hits = hits[np.lexsort((hits["time"], hits["instrument"]))]
+
+    keep = np.ones(len(hits), dtype=bool)
+    same_instrument = hits["instrument"][1:] == hits["instrument"][:-1]
+    keep[1:] = ~(same_instrument & (np.diff(hits["time"]) <= window))
+
+    hits = hits[keep]
+    return hits[np.argsort(hits["time"], kind="stable")]
+
+
+def quantize_hits(
+    hits: np.ndarray,
+    midi_notes: Sequence[int],
+    tempo_map: TempoMap,
+    subdivisions: int = 4
+) -> np.ndarray:
+    """
+    타격을 템포 맵의 박 격자에 퀀타이즈하여 이벤트 배열 생성
+
+    박과 박 사이는 선형으로 나누어 격자를 만드므로 템포가 변해도 격자가 실제 박을 따라간다.
+    같은 악기가 같은 격자 위치에 여러 번 놓이면 가장 센 타격만 남긴다.
+
+    Args:
+        hits: HIT_DTYPE 배열
+        midi_notes: 악기 인덱스별 GM 드럼 MIDI 번호
+        tempo_map: 박 위치 기반 템포 맵 (고정 템포는 TempoMap.constant)
+        subdivisions: 4분음표당 격자 수 (4 = 16분음표)
+
+    Returns:
+        (beat, instrument) 순으로 정렬된 EVENT_DTYPE 배열
+    """
+    events = np.empty(len(hits), dtype=EVENT_DTYPE)
+    if len(hits) == 0:
+        return events
+
+    beats = tempo_map.time_to_beat(hits["time"])
+    events["time"] = hits["time"]
+    events["beat"] = np.round(beats * subdivisions) / subdivisions
+    events["instrument"] = hits["instrument"]
+    events["midi"] = np.asarray(midi_notes, dtype=np.uint8)[hits["instrument"]]
+    events["velocity"] = np.clip(np.round(32 + 95 * hits["velocity"]), 1, 127)
+
+    # 같은 (악기, 격자) 위치에서는 가장 센 타격만 유지
+    events = events[np.lexsort((-events["velocity"].astype(np.int16), events["beat"], events["instrument"]))]
+    duplicate = np.zeros(len(events), dtype=bool)
+    duplicate[1:] = (
+        (events["instrument"][1:] == events["instrument"][:-1])
+        & (events["beat"][1:] == events["beat"][:-1])
+    )
+    events = events[~duplicate]
+
+    return events[np.lexsort((events["instrument"], events["beat"]))]
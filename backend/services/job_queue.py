@@ -0,0 +1,710 @@
+"""
+단계 작업 큐 서비스 (분산 워커용)
+
+API 프로세스는 파이프라인 진행/캐시/상태 저장만 맡고, 각 단계의 무거운 작업은
+단계별 큐에 작업(StageJob)으로 넣는다. 별도 워커 프로세스(worker.py)는 담당 단계의 큐에서
+작업을 lease로 가져가 실행하고, 실행 중에는 하트비트로 lease를 연장하며 진행률을 기록한다.
+워커가 죽어 lease가 만료되거나 작업이 예외로 끝나면 JOB_MAX_ATTEMPTS까지 다시 대기열에 들어간다.
+
+- local: 큐 없이 API 프로세스의 단계별 워커 풀에서 실행 (기본값)
+- sqlite: 같은 머신/공유 볼륨의 SQLite(WAL) 파일 (로컬 테스트용)
+- redis: Redis 호환 서버 (운영용, redis 패키지 필요)
+
+작업 ID는 "<작업 ID>:<단계>"로 고정되므로, 같은 단계를 다시 넣으면(API 서버 재시작 후 재개 등)
+진행 중이거나 끝난 기존 작업을 그대로 이어받는다. 산출물 경로를 주고받으므로
+ARTIFACT_ROOT는 API 서버와 모든 워커가 공유해야 한다.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from services.storage_service import ARTIFACT_ROOT
+from services.worker_pool import LazyFunction, DEFAULT_STAGE_POOLS
+
+logger = logging.getLogger(__name__)
+
+# 큐 종류 (local, sqlite, redis)
+JOB_QUEUE = os.getenv("JOB_QUEUE", "local")
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(ARTIFACT_ROOT, "jobs.db"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_PREFIX = os.getenv("REDIS_PREFIX", "grooveextract")
+
+# 워커가 작업을 가져간 뒤 하트비트 없이 유지되는 시간 (초, 하트비트는 1/3 간격)
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+
+# 작업당 최대 실행 횟수 (실패/lease 만료 포함)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# 재시도 대기 시간 (초, 실패할 때마다 2배)
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5"))
+
+# 빈 큐/작업 상태를 다시 확인하는 간격 (초)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+
+# 이 시간 동안 하트비트가 없는 워커는 단계 처리 용량에서 제외 (초)
+WORKER_TTL_SECONDS = float(os.getenv("WORKER_TTL_SECONDS", str(JOB_LEASE_SECONDS)))
+
+# 대기 중인 작업의 단계를 처리하는 살아 있는 워커가 없을 때 API가 기다리는 최대 시간 (초)
+JOB_ORPHAN_TIMEOUT = float(os.getenv("JOB_ORPHAN_TIMEOUT", "300"))
+
+# lease 만료로 최종 실패한 작업의 실패 사유 (이전 실행의 실패 사유가 없을 때)
+LEASE_EXPIRED_ERROR = "워커 응답 없음 (lease 만료)"
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# 큐로 실행할 수 있는 함수의 모듈 접두사
+_ALLOWED_MODULES = ("services.",)
+
+
+def function_ref(func: Callable) -> str:
+    """큐에 넣을 함수 참조 ("모듈:이름")"""
+    if isinstance(func, LazyFunction):
+        return func.ref
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def resolve_function(ref: str) -> Callable:
+    """함수 참조를 실제 함수로 변환 (services 패키지의 모듈 수준 함수만 허용)"""
+    module_name, _, name = ref.partition(":")
+    if not module_name.startswith(_ALLOWED_MODULES) or not name or "." in name:
+        raise ValueError(f"큐로 실행할 수 없는 함수입니다: {ref}")
+    return LazyFunction(ref).resolve()
+
+
+def _json_default(value: Any) -> Any:
+    """numpy 스칼라/배열 등 JSON 기본 타입이 아닌 결과 값 변환"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+def job_id_for(task_id: str, stage: str) -> str:
+    return f"{task_id}:{stage}"
+
+
+@dataclass
+class StageJob:
+    """
+    단계 작업
+
+    - func/args/kwargs/input_audio: 워커가 metrics.measure_call로 실행할 호출 (JSON 직렬화 가능해야 함)
+    - report_progress: 실행 시 progress 콜백을 키워드 인자로 넘길지 여부
+    - attempts: 지금까지 워커가 가져간 횟수
+    - progress/detail: 워커가 하트비트와 함께 기록한 단계 내부 진행률
+    - result/measured: 완료 시 함수 결과와 자원 사용량, error: 마지막 실패 사유
+    """
+    job_id: str
+    task_id: str
+    stage: str
+    func: str
+    args: List[Any] = field(default_factory=list)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    input_audio: Optional[str] = None
+    report_progress: bool = False
+    status: str = JOB_PENDING
+    attempts: int = 0
+    owner: Optional[str] = None
+    lease_until: float = 0.0
+    available_at: float = 0.0
+    created_at: float = 0.0
+    progress: Optional[float] = None
+    detail: Optional[str] = None
+    result: Any = None
+    measured: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        task_id: str,
+        stage: str,
+        func: Callable,
+        args=(),
+        kwargs: Optional[Dict[str, Any]] = None,
+        input_audio: Optional[str] = None,
+        report_progress: bool = False
+    ) -> "StageJob":
+        now = time.time()
+        return cls(
+            job_id=job_id_for(task_id, stage), task_id=task_id, stage=stage,
+            func=function_ref(func), args=list(args), kwargs=dict(kwargs or {}),
+            input_audio=input_audio, report_progress=report_progress,
+            available_at=now, created_at=now
+        )
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StageJob":
+        return cls(**data)
+
+
+class JobQueue(ABC):
+    """
+    단계 작업 큐 인터페이스
+
+    재시도 정책(max_attempts, retry_delay)과 lease 길이는 구현과 무관하게 같다.
+    """
+
+    def __init__(
+        self,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_delay: float = JOB_RETRY_DELAY
+    ):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+
+    def _retry_at(self, attempts: int) -> float:
+        return time.time() + self.retry_delay * 2 ** max(0, attempts - 1)
+
+    @abstractmethod
+    def submit(self, job: StageJob) -> StageJob:
+        """
+        작업 등록 (같은 ID의 작업이 대기/실행 중이거나 완료되었으면 기존 작업 반환,
+        최종 실패한 작업은 새 작업으로 교체)
+        """
+
+    @abstractmethod
+    def claim(self, stage: str, owner: str) -> Optional[StageJob]:
+        """
+        단계 대기열에서 실행할 작업 하나를 lease와 함께 가져옴
+
+        lease가 만료된 실행 중 작업(워커 종료)도 다시 가져가며,
+        이미 max_attempts번 실행된 작업은 최종 실패로 처리한다.
+        """
+
+    @abstractmethod
+    def heartbeat(
+        self,
+        job_id: str,
+        owner: str,
+        progress: Optional[float] = None,
+        detail: Optional[str] = None
+    ) -> bool:
+        """lease 연장 및 진행률 기록 (lease를 잃었으면 False)"""
+
+    @abstractmethod
+    def complete(self, job_id: str, owner: str, result: Any, measured: Dict[str, Any]) -> bool:
+        """작업 완료 기록 (lease를 잃었으면 기록하지 않고 False)"""
+
+    @abstractmethod
+    def fail(self, job_id: str, owner: str, error: str) -> bool:
+        """
+        작업 실패 기록 (max_attempts 미만이면 재시도 대기 후 다시 대기열로)
+
+        Returns:
+            다시 대기열에 들어갔는지 여부
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[StageJob]:
+        """
+        작업 조회 (없으면 None)
+
+        lease가 만료된 실행 중 작업은 가져가기와 같이 대기열로 되돌리거나 최종 실패 처리한 뒤 반환한다
+        (해당 단계의 워커가 claim을 호출하지 않아도 API가 만료를 알 수 있도록).
+        """
+
+    @abstractmethod
+    def delete(self, job_id: str):
+        """끝난 작업 삭제 (API 프로세스가 결과를 반영한 뒤 호출)"""
+
+    @abstractmethod
+    def depth(self, stage: str) -> int:
+        """단계의 대기 중이거나 실행 중인 작업 수"""
+
+    @abstractmethod
+    def register_worker(self, owner: str, stages: List[str]):
+        """워커 생존 신호 (주기적으로 호출)"""
+
+    @abstractmethod
+    def workers(self, stage: str) -> int:
+        """단계를 처리하는 살아 있는 워커 슬롯 수"""
+
+    @abstractmethod
+    def unregister_worker(self, owner: str):
+        """워커 종료 시 등록 해제"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite(WAL 모드) 기반 작업 큐 (같은 파일을 공유하는 로컬/단일 호스트 테스트용)
+
+    가져가기는 BEGIN IMMEDIATE 트랜잭션 안에서 선택과 lease 기록을 함께 하므로
+    여러 워커 프로세스가 같은 작업을 동시에 가져가지 않는다.
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self._local = threading.local()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL NOT NULL DEFAULT 0,
+                owner TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_stage ON jobs(stage, status, available_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_workers (
+                owner TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (owner, stage)
+            )
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 반환 (최초 호출 시 WAL 모드로 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, conn: sqlite3.Connection, job: StageJob):
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, stage, status, available_at, lease_until, owner, attempts, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.stage, job.status, job.available_at, job.lease_until,
+             job.owner, job.attempts, _dumps(job.to_dict()))
+        )
+
+    def _read(self, conn: sqlite3.Connection, job_id: str) -> Optional[StageJob]:
+        row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return StageJob.from_dict(json.loads(row[0])) if row else None
+
+    def _update_owned(self, job_id: str, owner: str, update: Callable[[StageJob], None]) -> Optional[StageJob]:
+        """owner가 lease를 가진 실행 중 작업만 갱신"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            job = self._read(conn, job_id)
+            if job is None or job.status != JOB_RUNNING or job.owner != owner:
+                conn.execute("COMMIT")
+                return None
+            update(job)
+            self._write(conn, job)
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def submit(self, job: StageJob) -> StageJob:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._read(conn, job.job_id)
+            if existing is not None and existing.status != JOB_FAILED:
+                conn.execute("COMMIT")
+                return existing
+            self._write(conn, job)
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, stage: str, owner: str) -> Optional[StageJob]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT data FROM jobs WHERE stage = ? AND ("
+                    "(status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?)"
+                    ") ORDER BY available_at LIMIT 1",
+                    (stage, JOB_PENDING, now, JOB_RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                job = StageJob.from_dict(json.loads(row[0]))
+                if job.status == JOB_RUNNING:
+                    self._expire(job, now)
+                    if job.status == JOB_FAILED:
+                        self._write(conn, job)
+                        continue
+
+                job.status, job.owner = JOB_RUNNING, owner
+                job.lease_until = now + self.lease_seconds
+                job.attempts += 1
+                self._write(conn, job)
+                conn.execute("COMMIT")
+                return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _expire(self, job: StageJob, now: float):
+        """lease 만료 작업을 최종 실패(max_attempts 도달) 또는 대기 상태로 변경"""
+        logger.warning(f"[{job.task_id}] Lease expired for job {job.job_id} (owner {job.owner})")
+        job.owner = None
+        if job.attempts >= self.max_attempts:
+            job.status = JOB_FAILED
+            job.error = job.error or LEASE_EXPIRED_ERROR
+        else:
+            job.status, job.available_at = JOB_PENDING, now
+
+    def heartbeat(self, job_id, owner, progress=None, detail=None) -> bool:
+        def update(job: StageJob):
+            job.lease_until = time.time() + self.lease_seconds
+            if progress is not None:
+                job.progress, job.detail = progress, detail
+        return self._update_owned(job_id, owner, update) is not None
+
+    def complete(self, job_id, owner, result, measured) -> bool:
+        def update(job: StageJob):
+            job.status, job.owner, job.lease_until = JOB_DONE, None, 0.0
+            job.result, job.measured, job.error = result, measured, None
+        return self._update_owned(job_id, owner, update) is not None
+
+    def fail(self, job_id, owner, error) -> bool:
+        def update(job: StageJob):
+            job.owner, job.lease_until, job.error = None, 0.0, error
+            if job.attempts < self.max_attempts:
+                job.status, job.available_at = JOB_PENDING, self._retry_at(job.attempts)
+            else:
+                job.status = JOB_FAILED
+        job = self._update_owned(job_id, owner, update)
+        return job is not None and job.status == JOB_PENDING
+
+    def get(self, job_id: str) -> Optional[StageJob]:
+        conn = self._connect()
+        job = self._read(conn, job_id)
+        if job is None or job.status != JOB_RUNNING or job.lease_until >= time.time():
+            return job
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            job = self._read(conn, job_id)
+            now = time.time()
+            if job is not None and job.status == JOB_RUNNING and job.lease_until < now:
+                self._expire(job, now)
+                self._write(conn, job)
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, job_id: str):
+        self._connect().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def depth(self, stage: str) -> int:
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE stage = ? AND status IN (?, ?)",
+            (stage, JOB_PENDING, JOB_RUNNING)
+        ).fetchone()
+        return row[0]
+
+    def register_worker(self, owner: str, stages: List[str]):
+        now = time.time()
+        self._connect().executemany(
+            "INSERT OR REPLACE INTO job_workers (owner, stage, seen_at) VALUES (?, ?, ?)",
+            [(owner, stage, now) for stage in stages]
+        )
+
+    def workers(self, stage: str) -> int:
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM job_workers WHERE stage = ? AND seen_at >= ?",
+            (stage, time.time() - WORKER_TTL_SECONDS)
+        ).fetchone()
+        return row[0]
+
+    def unregister_worker(self, owner: str):
+        self._connect().execute("DELETE FROM job_workers WHERE owner = ?", (owner,))
+
+
+# Redis 스크립트: 키와 인자 순서는 RedisJobQueue의 호출부 참고
+# lease 만료 작업 처리 (가져가기/조회 공통): max_attempts에 이르렀으면 최종 실패, 아니면 대기열로
+# (None은 빈 문자열로 저장되므로 실패 사유가 없는지는 false와 ''를 모두 확인)
+_REDIS_EXPIRE = """
+local function expire(key, pending, running, id, now, max_attempts, reason)
+    redis.call('ZREM', running, id)
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= max_attempts then
+        redis.call('HSET', key, 'status', 'failed', 'owner', '')
+        local last_error = redis.call('HGET', key, 'error')
+        if not last_error or last_error == '' then
+            redis.call('HSET', key, 'error', reason)
+        end
+    else
+        redis.call('HSET', key, 'status', 'pending', 'owner', '', 'available_at', now)
+        redis.call('ZADD', pending, now, id)
+    end
+end
+"""
+
+# 가져가기: lease 만료 작업을 처리한 뒤, 가장 오래된 대기 작업을 실행 중으로 이동
+_REDIS_CLAIM = _REDIS_EXPIRE + """
+local pending, running, prefix = KEYS[1], KEYS[2], ARGV[1]
+local now, lease_until, owner, max_attempts = tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4], tonumber(ARGV[5])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', running, '-inf', now)) do
+    expire(prefix .. ':job:' .. id, pending, running, id, now, max_attempts, ARGV[6])
+end
+local ids = redis.call('ZRANGEBYSCORE', pending, '-inf', now, 'LIMIT', 0, 1)
+if #ids == 0 then return false end
+local id = ids[1]
+redis.call('ZREM', pending, id)
+redis.call('ZADD', running, lease_until, id)
+local key = prefix .. ':job:' .. id
+redis.call('HSET', key, 'status', 'running', 'owner', owner, 'lease_until', lease_until)
+redis.call('HINCRBY', key, 'attempts', 1)
+return id
+"""
+
+# 조회 시 만료 처리: 작업 하나의 lease가 만료되었으면 expire (처리했으면 1)
+_REDIS_REAP = _REDIS_EXPIRE + """
+local key, pending, running, id = KEYS[1], KEYS[2], KEYS[3], ARGV[1]
+local now = tonumber(ARGV[2])
+local lease_until = redis.call('ZSCORE', running, id)
+if redis.call('HGET', key, 'status') ~= 'running' or not lease_until or tonumber(lease_until) >= now then
+    return 0
+end
+expire(key, pending, running, id, now, tonumber(ARGV[3]), ARGV[4])
+return 1
+"""
+
+# 소유 확인 후 갱신: lease 연장(ARGV[3] = 새 lease 만료 시각)과 필드 기록(ARGV[4..] = 이름, 값 쌍)
+_REDIS_HEARTBEAT = """
+local key, running = KEYS[1], KEYS[2]
+if redis.call('HGET', key, 'status') ~= 'running' or redis.call('HGET', key, 'owner') ~= ARGV[1] then
+    return 0
+end
+redis.call('ZADD', running, tonumber(ARGV[3]), ARGV[2])
+redis.call('HSET', key, 'lease_until', ARGV[3])
+if #ARGV > 3 then redis.call('HSET', key, unpack(ARGV, 4)) end
+return 1
+"""
+
+# 소유 확인 후 종료: 실행 중 목록에서 빼고 필드 기록, ARGV[3]이 있으면 그 시각에 대기열로 복귀
+_REDIS_FINISH = """
+local key, running, pending = KEYS[1], KEYS[2], KEYS[3]
+if redis.call('HGET', key, 'status') ~= 'running' or redis.call('HGET', key, 'owner') ~= ARGV[1] then
+    return 0
+end
+redis.call('ZREM', running, ARGV[2])
+redis.call('HSET', key, 'owner', '', unpack(ARGV, 4))
+if ARGV[3] ~= '' then redis.call('ZADD', pending, tonumber(ARGV[3]), ARGV[2]) end
+return 1
+"""
+
+# 등록: 최종 실패가 아닌 기존 작업이 있으면 그대로 두고 0 반환
+_REDIS_SUBMIT = """
+local key, pending = KEYS[1], KEYS[2]
+local status = redis.call('HGET', key, 'status')
+if status and status ~= 'failed' then return 0 end
+redis.call('DEL', key)
+redis.call('HSET', key, unpack(ARGV, 3))
+redis.call('ZADD', pending, tonumber(ARGV[2]), ARGV[1])
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Redis 호환 서버 기반 작업 큐 (운영용)
+
+    - {prefix}:job:<id>: 작업 해시 (spec은 JSON, 상태/lease/진행률은 개별 필드)
+    - {prefix}:pending:<stage>: 대기 작업 (점수 = 실행 가능 시각)
+    - {prefix}:running:<stage>: 실행 중 작업 (점수 = lease 만료 시각)
+    - {prefix}:workers:<stage>: 워커 슬롯 (점수 = 마지막 생존 신호 시각)
+
+    가져가기/하트비트/종료는 Lua 스크립트로 원자적으로 처리한다.
+    """
+
+    # 해시에 JSON으로 저장하는 필드
+    _JSON_FIELDS = ("args", "kwargs", "result", "measured")
+    _FLOAT_FIELDS = ("lease_until", "available_at", "created_at", "progress")
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = REDIS_PREFIX, **kwargs):
+        super().__init__(**kwargs)
+        import redis
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self._redis.register_script(_REDIS_CLAIM)
+        self._heartbeat = self._redis.register_script(_REDIS_HEARTBEAT)
+        self._finish = self._redis.register_script(_REDIS_FINISH)
+        self._submit = self._redis.register_script(_REDIS_SUBMIT)
+        self._reap = self._redis.register_script(_REDIS_REAP)
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    def _encode(self, **fields) -> List[Any]:
+        """해시 필드 목록 (이름, 값 평탄화, None은 빈 문자열)"""
+        flat: List[Any] = []
+        for name, value in fields.items():
+            if name in self._JSON_FIELDS:
+                value = _dumps(value)
+            elif isinstance(value, bool):
+                value = int(value)
+            flat.extend([name, "" if value is None else value])
+        return flat
+
+    def _decode(self, data: Dict[str, str]) -> StageJob:
+        job: Dict[str, Any] = {}
+        for name, value in data.items():
+            if name in self._JSON_FIELDS:
+                job[name] = json.loads(value)
+            elif value == "":
+                continue
+            elif name in self._FLOAT_FIELDS:
+                job[name] = float(value)
+            elif name == "attempts":
+                job[name] = int(value)
+            elif name == "report_progress":
+                job[name] = value == "1"
+            else:
+                job[name] = value
+        return StageJob(**job)
+
+    def submit(self, job: StageJob) -> StageJob:
+        created = self._submit(
+            keys=[self._key("job", job.job_id), self._key("pending", job.stage)],
+            args=[job.job_id, job.available_at, *self._encode(**job.to_dict())]
+        )
+        return job if created else self.get(job.job_id) or job
+
+    def claim(self, stage: str, owner: str) -> Optional[StageJob]:
+        now = time.time()
+        job_id = self._claim(
+            keys=[self._key("pending", stage), self._key("running", stage)],
+            args=[self.prefix, now, now + self.lease_seconds, owner, self.max_attempts, LEASE_EXPIRED_ERROR]
+        )
+        return self.get(job_id) if job_id else None
+
+    def heartbeat(self, job_id, owner, progress=None, detail=None) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        fields = self._encode(progress=progress, detail=detail) if progress is not None else []
+        return bool(self._heartbeat(
+            keys=[self._key("job", job_id), self._key("running", job.stage)],
+            args=[owner, job_id, time.time() + self.lease_seconds, *fields]
+        ))
+
+    def _end(self, job_id: str, owner: str, retry_at: Optional[float], **fields) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        return bool(self._finish(
+            keys=[self._key("job", job_id), self._key("running", job.stage), self._key("pending", job.stage)],
+            args=[owner, job_id, "" if retry_at is None else retry_at, *self._encode(**fields)]
+        ))
+
+    def complete(self, job_id, owner, result, measured) -> bool:
+        return self._end(job_id, owner, None, status=JOB_DONE, result=result, measured=measured, error=None)
+
+    def fail(self, job_id, owner, error) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        if job.attempts < self.max_attempts:
+            retry_at = self._retry_at(job.attempts)
+            return self._end(job_id, owner, retry_at, status=JOB_PENDING, available_at=retry_at, error=error)
+        self._end(job_id, owner, None, status=JOB_FAILED, error=error)
+        return False
+
+    def get(self, job_id: str) -> Optional[StageJob]:
+        data = self._redis.hgetall(self._key("job", job_id))
+        if not data:
+            return None
+        job = self._decode(data)
+        now = time.time()
+        if job.status == JOB_RUNNING and job.lease_until < now and self._reap(
+            keys=[self._key("job", job_id), self._key("pending", job.stage), self._key("running", job.stage)],
+            args=[job_id, now, self.max_attempts, LEASE_EXPIRED_ERROR]
+        ):
+            logger.warning(f"[{job.task_id}] Lease expired for job {job_id} (owner {job.owner})")
+            data = self._redis.hgetall(self._key("job", job_id))
+            job = self._decode(data) if data else None
+        return job
+
+    def delete(self, job_id: str):
+        job = self.get(job_id)
+        if job is None:
+            return
+        with self._redis.pipeline() as pipe:
+            pipe.zrem(self._key("pending", job.stage), job_id)
+            pipe.zrem(self._key("running", job.stage), job_id)
+            pipe.delete(self._key("job", job_id))
+            pipe.execute()
+
+    def depth(self, stage: str) -> int:
+        with self._redis.pipeline() as pipe:
+            pipe.zcard(self._key("pending", stage))
+            pipe.zcard(self._key("running", stage))
+            return sum(pipe.execute())
+
+    def register_worker(self, owner: str, stages: List[str]):
+        now = time.time()
+        with self._redis.pipeline() as pipe:
+            for stage in stages:
+                pipe.zadd(self._key("workers", stage), {owner: now})
+                pipe.zremrangebyscore(self._key("workers", stage), "-inf", now - WORKER_TTL_SECONDS)
+            pipe.execute()
+
+    def workers(self, stage: str) -> int:
+        return self._redis.zcount(self._key("workers", stage), time.time() - WORKER_TTL_SECONDS, "+inf")
+
+    def unregister_worker(self, owner: str):
+        with self._redis.pipeline() as pipe:
+            for stage in DEFAULT_STAGE_POOLS:
+                pipe.zrem(self._key("workers", stage), owner)
+            pipe.execute()
+
+
+def create_job_queue(kind: str = JOB_QUEUE) -> Optional[JobQueue]:
+    """
+    환경 변수(JOB_QUEUE)에 따라 작업 큐 생성
+
+    Returns:
+        JobQueue 구현체, local이면 None (API 프로세스의 워커 풀에서 직접 실행)
+    """
+    if kind == "local":
+        return None
+    if kind == "sqlite":
+        return SQLiteJobQueue()
+    if kind == "redis":
+        return RedisJobQueue()
+    raise ValueError(f"지원하지 않는 작업 큐입니다: {kind}")
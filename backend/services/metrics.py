@@ -0,0 +1,226 @@
+"""
+단계별 계측 및 Prometheus 메트릭 서비스
+
+각 단계를 워커 안에서 감싸 wall/CPU 시간, 최대 RSS, 입력 길이를 측정하고,
+API 프로세스에서 단계별 히스토그램으로 집계하여 /metrics로 노출한다.
+"""
+import os
+import sys
+import time
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 최대 RSS 샘플링 간격 (초)
+RSS_SAMPLE_INTERVAL = 0.05
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _current_rss() -> int:
+    """현재 프로세스 RSS (바이트, 알 수 없으면 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if resource is not None:
+        # ru_maxrss는 Linux에서 KB, macOS에서 바이트 단위
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return 0
+
+
+def _cpu_seconds() -> float:
+    """현재 프로세스와 종료된 자식 프로세스(Demucs CLI 등)의 CPU 시간 합계"""
+    total = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += children.ru_utime + children.ru_stime
+    return total
+
+
+def _audio_duration(path: str) -> Optional[float]:
+    """오디오 파일 길이 (초, 헤더만 읽음)"""
+    try:
+        import soundfile as sf
+        return float(sf.info(path).duration)
+    except Exception:
+        return None
+
+
+def measure_call(
+    func: Callable[..., Any],
+    args: Sequence[Any],
+    input_audio: Optional[str] = None,
+    kwargs: Optional[Dict[str, Any]] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    함수를 실행하며 자원 사용량 측정 (워커 풀 안에서 실행, pickle 가능)
+
+    스레드 풀에서 실행되면 CPU 시간과 RSS는 같은 프로세스의 다른 작업을 포함한다.
+
+    Args:
+        func: 실행할 단계 함수
+        args: 함수 인자
+        input_audio: 입력 길이를 기록할 오디오 파일 경로
+        kwargs: 함수 키워드 인자
+
+    Returns:
+        (함수 결과, 측정값 {wall_seconds, cpu_seconds, peak_rss_bytes, input_duration_seconds})
+    """
+    peak = [_current_rss()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(RSS_SAMPLE_INTERVAL):
+            peak[0] = max(peak[0], _current_rss())
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    try:
+        result = func(*args, **(kwargs or {}))
+    finally:
+        done.set()
+        sampler.join()
+
+    measured = {
+        "wall_seconds": time.perf_counter() - wall_start,
+        "cpu_seconds": _cpu_seconds() - cpu_start,
+        "peak_rss_bytes": max(peak[0], _current_rss()),
+    }
+    if input_audio:
+        measured["input_duration_seconds"] = _audio_duration(input_audio)
+
+    return result, measured
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+class Histogram:
+    """라벨별 누적 버킷 히스토그램 (Prometheus 텍스트 형식)"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, count, total) in sorted(self._series.items()):
+                labels = dict(key)
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels({**labels, 'le': f'{bound:g}'})} {cumulative}"
+                    )
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(key))} {value:g}")
+        return "\n".join(lines)
+
+
+_SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+_BYTES_BUCKETS = tuple(2 ** p * 1024 ** 2 for p in range(5, 15))  # 32MB ~ 16GB
+
+STAGE_WALL = Histogram(
+    "grooveextract_stage_wall_seconds", "Stage wall-clock time", _SECONDS_BUCKETS
+)
+STAGE_CPU = Histogram(
+    "grooveextract_stage_cpu_seconds", "Stage CPU time (process-wide)", _SECONDS_BUCKETS
+)
+STAGE_PEAK_RSS = Histogram(
+    "grooveextract_stage_peak_rss_bytes", "Peak resident memory during stage", _BYTES_BUCKETS
+)
+STAGE_INPUT_DURATION = Histogram(
+    "grooveextract_stage_input_duration_seconds", "Duration of the stage input audio",
+    (30, 60, 120, 180, 240, 300, 450, 600, 900, 1800, 3600)
+)
+TRANSCRIBED_NOTES = Histogram(
+    "grooveextract_transcribed_notes", "Notes produced per transcription",
+    (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+STAGE_FAILURES = Counter("grooveextract_stage_failures_total", "Stage failures")
+CACHE_HITS = Counter("grooveextract_cache_hits_total", "Stages restored from cache")
+
+_REGISTRY = (
+    STAGE_WALL, STAGE_CPU, STAGE_PEAK_RSS, STAGE_INPUT_DURATION,
+    TRANSCRIBED_NOTES, STAGE_FAILURES, CACHE_HITS,
+)
+
+
+def observe_stage(stage: str, measured: Dict[str, Any]):
+    """
+    단계 측정값을 히스토그램에 기록
+
+    Args:
+        stage: 단계 이름
+        measured: measure_call 측정값
+    """
+    STAGE_WALL.observe(measured["wall_seconds"], stage=stage)
+    STAGE_CPU.observe(measured["cpu_seconds"], stage=stage)
+    STAGE_PEAK_RSS.observe(measured["peak_rss_bytes"], stage=stage)
+    if measured.get("input_duration_seconds") is not None:
+        STAGE_INPUT_DURATION.observe(measured["input_duration_seconds"], stage=stage)
+
+
+def render_metrics(gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Prometheus 텍스트 형식으로 모든 메트릭 출력
+
+    Args:
+        gauges: 함께 출력할 게이지 (이름 → 값)
+    """
+    blocks = [metric.render() for metric in _REGISTRY]
+    for name, value in (gauges or {}).items():
+        blocks.append(f"# TYPE {name} gauge\n{name} {value:g}")
+    return "\n".join(blocks) + "\n"
@@ -0,0 +1,156 @@
+"""
+온셋 검출 엔진 (대역별 스펙트럴 플럭스 + 적응형 임계값)
+
+대역별 로그 크기 스펙트럼의 반파 정류 차분(스펙트럴 플럭스)을 온셋 강도로 사용하고,
+이동 중간값(또는 이동 평균) 기준선을 뺀 값에서 한 번의 피크 검출로 타격을 찾는다.
+임계값은 주변 구간 최댓값에 비례하므로 곡 안에서 음량이 바뀌어도 여린 구간의 타격이 남는다.
+모든 시간 파라미터는 초 단위로 받아 STFT 프레임 단위로 변환한다.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+from scipy.ndimage import maximum_filter1d, median_filter, uniform_filter1d
+from scipy.signal import find_peaks
+
+# 로그 압축 계수 (log(1 + C·|X|), 정규화된 입력 기준)
+# 압축이 강하면 조용한 대역에 새어 든 다른 악기 소리도 큰 상대 변화로 보이므로
+# 약하게 압축하여 플럭스가 에너지에 비례하도록 둔다.
+LOG_COMPRESSION = 0.01
+
+
+@dataclass(frozen=True)
+class OnsetParams:
+    """
+    악기별 온셋 검출 파라미터 (시간 단위: 초)
+
+    - min_interval: 같은 악기 타격 사이 최소 간격
+    - window: 적응형 기준선을 계산하는 창 길이 (중심 기준 전체 길이)
+    - method: 기준선 계산 방식 (median 또는 mean)
+    - relative: 임계값 = 주변 context 구간 novelty 최댓값 × relative (클수록 둔감)
+    - context: relative 기준 최댓값을 찾는 구간 길이
+    - floor: 임계값 하한 (정규화된 온셋 강도 기준, min_notes를 채우기 위해서도 이 아래로 내리지 않음)
+    - min_notes: 임계값을 넘는 타격이 이보다 적으면 높이순 상위 min_notes개까지 채움
+    """
+    min_interval: float = 0.05
+    window: float = 0.2
+    method: str = "median"
+    relative: float = 0.4
+    context: float = 2.0
+    floor: float = 0.02
+    min_notes: int = 20
+
+
+def band_flux(S: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """
+    대역별 스펙트럴 플럭스 (온셋 강도)
+
+    Args:
+        S: (bin 수, 프레임 수) 크기 스펙트로그램
+        table: spectral_service.band_weight_table 가중치 행렬
+
+    Returns:
+        (대역 수, 프레임 수) 온셋 강도 (첫 프레임은 0, 대역별 최댓값 1로 정규화되지 않음)
+    """
+    log_s = np.log1p(LOG_COMPRESSION * S.astype(np.float32, copy=False))
+    diff = np.empty_like(log_s)
+    diff[:, 0] = 0.0
+    np.subtract(log_s[:, 1:], log_s[:, :-1], out=diff[:, 1:])
+    np.maximum(diff, 0.0, out=diff)
+    return table @ diff
+
+
+def normalize_flux(flux: np.ndarray) -> np.ndarray:
+    """대역별 최댓값으로 나눠 0~1로 정규화 (무음 대역은 0)"""
+    peak = flux.max(axis=-1, keepdims=True) if flux.size else flux
+    return np.divide(flux, peak, out=np.zeros_like(flux), where=peak > 0)
+
+
+def to_frames(seconds: float, sr: int, hop_length: int) -> int:
+    """초를 STFT 프레임 수로 변환 (최소 1프레임)"""
+    return max(1, int(round(seconds * sr / hop_length)))
+
+
+def adaptive_novelty(
+    strength: np.ndarray,
+    params: OnsetParams,
+    sr: int,
+    hop_length: int
+) -> np.ndarray:
+    """
+    온셋 강도에서 적응형 기준선(이동 중간값/평균)을 뺀 값
+
+    Args:
+        strength: 한 대역의 정규화된 온셋 강도
+        params: 검출 파라미터
+        sr: 샘플링 레이트
+        hop_length: 프레임 간격 (샘플)
+
+    Returns:
+        기준선 위로 솟은 정도 (음수는 0)
+    """
+    size = to_frames(params.window, sr, hop_length) | 1
+    if params.method == "median":
+        baseline = median_filter(strength, size=size, mode="nearest")
+    elif params.method == "mean":
+        baseline = uniform_filter1d(strength, size=size, mode="nearest")
+    else:
+        raise ValueError(f"지원하지 않는 기준선 방식입니다: {params.method}")
+    return np.maximum(strength - baseline, 0.0)
+
+
+def pick_onsets(
+    strength: np.ndarray,
+    params: OnsetParams,
+    sr: int,
+    hop_length: int
+) -> Tuple[np.ndarray, float]:
+    """
+    한 대역의 온셋 프레임 검출 (피크 검출 1회)
+
+    기준선을 뺀 novelty에서 최소 간격(프레임)을 지키는 후보 피크를 한 번에 구한 뒤,
+    각 후보를 주변 구간 최댓값 × relative(단, floor 이상)와 비교한다.
+    남은 타격이 min_notes보다 적으면 floor를 넘는 후보 중 높은 순으로 채운다. 재검출은 하지 않는다.
+
+    Args:
+        strength: 한 대역의 정규화된 온셋 강도
+        params: 검출 파라미터
+        sr: 샘플링 레이트
+        hop_length: 프레임 간격 (샘플)
+
+    Returns:
+        (온셋 프레임 인덱스, 채택된 타격의 최소 novelty = 실효 임계값)
+    """
+    novelty = adaptive_novelty(strength, params, sr, hop_length)
+    candidates, props = find_peaks(
+        novelty,
+        height=params.floor,
+        distance=to_frames(params.min_interval, sr, hop_length)
+    )
+    heights = props["peak_heights"]
+
+    local_max = maximum_filter1d(
+        novelty, size=to_frames(params.context, sr, hop_length) | 1, mode="nearest"
+    )
+    keep = heights >= np.maximum(params.floor, params.relative * local_max[candidates])
+
+    shortfall = min(params.min_notes, len(heights)) - np.count_nonzero(keep)
+    if shortfall > 0:
+        order = np.argsort(-heights, kind="stable")
+        keep[order[:min(params.min_notes, len(heights))]] = True
+
+    if not keep.any():
+        return candidates[keep], params.floor
+    return candidates[keep], round(float(heights[keep].min()), 4)
+
+
+def peak_strengths(envelope: np.ndarray, frames: np.ndarray, lookahead: int = 2) -> np.ndarray:
+    """
+    온셋 프레임의 타격 세기 (온셋 프레임부터 lookahead 프레임 뒤까지의 에너지 최댓값)
+
+    플럭스 피크는 에너지 상승 시작점에 있으므로 에너지 곡선의 정점은 한두 프레임 뒤에 온다.
+    """
+    last = len(envelope) - 1
+    return np.max(
+        [envelope[np.minimum(frames + k, last)] for k in range(lookahead + 1)], axis=0
+    ) if len(frames) else envelope[frames]
@@ -0,0 +1,170 @@
+"""
+작업 진행률 이벤트 서비스
+
+워커(스레드/프로세스 풀)에서 보고한 단계 내부 진행률을 하나의 채널로 모아
+API 프로세스의 이벤트 루프로 전달하고, 작업별 구독자(SSE 연결)에게
+한 번만 직렬화한 이벤트를 그대로 나눠준다.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 워커에서 같은 단계의 진행률을 보고하는 최소 간격 (초)
+PROGRESS_MIN_INTERVAL = float(os.getenv("PROGRESS_MIN_INTERVAL", "0.5"))
+
+# 구독자별 대기 이벤트 수 (가득 차면 가장 오래된 이벤트를 버림)
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "16"))
+
+# 워커 → API 프로세스 진행률 채널 (multiprocessing.Queue)
+_channel = None
+
+
+def attach_channel(channel):
+    """
+    현재 프로세스에서 사용할 진행률 채널 지정
+
+    프로세스 풀 initializer로도 사용된다.
+
+    Args:
+        channel: multiprocessing.Queue
+    """
+    global _channel
+    _channel = channel
+
+
+class ProgressReporter:
+    """
+    단계 함수에 넘기는 진행률 보고 객체 (pickle 가능)
+
+    reporter(fraction, detail) 형태로 호출하며, 채널이 없으면 아무 일도 하지 않는다.
+    너무 잦은 보고(yt-dlp 청크 단위 등)는 PROGRESS_MIN_INTERVAL 간격으로 걸러낸다.
+    """
+
+    def __init__(self, task_id: str, stage: str, min_interval: float = PROGRESS_MIN_INTERVAL):
+        self.task_id = task_id
+        self.stage = stage
+        self.min_interval = min_interval
+        self._last_time = 0.0
+
+    def __call__(self, fraction: float, detail: Optional[str] = None):
+        now = time.monotonic()
+        if fraction < 1.0 and now - self._last_time < self.min_interval:
+            return
+        self._last_time = now
+
+        if _channel is None:
+            return
+        try:
+            _channel.put_nowait((self.task_id, self.stage, min(max(fraction, 0.0), 1.0), detail))
+        except Exception as e:
+            logger.debug(f"Dropped progress event: {str(e)}")
+
+
+def start_relay(
+    channel,
+    loop: asyncio.AbstractEventLoop,
+    callback: Callable[[str, str, float, Optional[str]], Any]
+) -> threading.Thread:
+    """
+    채널의 진행률을 이벤트 루프로 전달하는 스레드 시작
+
+    Args:
+        channel: multiprocessing.Queue
+        loop: API 이벤트 루프
+        callback: 루프 안에서 호출할 함수 (task_id, stage, fraction, detail)
+
+    Returns:
+        전달 스레드 (채널에 None을 넣으면 종료)
+    """
+    def relay():
+        while True:
+            try:
+                item = channel.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            try:
+                loop.call_soon_threadsafe(callback, *item)
+            except RuntimeError:  # 루프 종료됨
+                break
+
+    thread = threading.Thread(target=relay, name="progress-relay", daemon=True)
+    thread.start()
+    return thread
+
+
+def encode_event(payload: Dict[str, Any]) -> str:
+    """SSE 이벤트 프레임으로 직렬화"""
+    return f"data: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+
+
+class ProgressBroker:
+    """
+    작업별 구독자에게 이벤트를 전달하는 브로커 (이벤트 루프 안에서만 사용)
+
+    이벤트는 발행 시 한 번만 직렬화되어 모든 구독자 큐에 같은 문자열로 들어가므로,
+    구독자 수가 늘어도 발행 비용은 큐 삽입 횟수만큼만 증가한다.
+    새 구독자는 마지막 이벤트를 즉시 받는다.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last: Dict[str, str] = {}
+
+    def publish(self, task_id: str, payload: Dict[str, Any], final: bool = False):
+        """
+        작업 이벤트 발행
+
+        Args:
+            task_id: 작업 ID
+            payload: 이벤트 내용
+            final: 작업이 끝났는지 여부 (구독자 스트림 종료 신호)
+        """
+        message = encode_event(payload)
+        if final:
+            self._last.pop(task_id, None)
+        else:
+            self._last[task_id] = message
+
+        for queue in self._subscribers.get(task_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((message, final))
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """
+        작업 이벤트 구독
+
+        Args:
+            task_id: 작업 ID
+
+        Returns:
+            (SSE 프레임, 종료 여부)를 받는 큐
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        last = self._last.get(task_id)
+        if last is not None:
+            queue.put_nowait((last, False))
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        """구독 해제"""
+        subscribers = self._subscribers.get(task_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[task_id]
+
+    def subscriber_count(self) -> int:
+        """전체 구독자 수"""
+        return sum(len(s) for s in self._subscribers.values())
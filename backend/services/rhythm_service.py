@@ -0,0 +1,315 @@
+"""
+리듬 분석 서비스 (템포 맵, 박/마디 첫 박 위치)
+
+트랜스크립션 단계가 한 번 계산한 온셋 강도 곡선에서
+1. 겹치는 창마다 자기상관으로 국소 템포를 추정하고 (곡 전체 템포를 사전 분포로 사용),
+2. 국소 템포를 따르는 동적 계획법으로 박 위치를 추적한 뒤,
+3. 킥/스네어 강세로 마디 첫 박을 정해 박마다 마디 기준 박 번호를 붙인다.
+
+퀀타이즈는 고정 템포(60/bpm) 격자 대신 이 템포 맵의 박 위치를 기준으로 하므로
+연주 템포가 조금씩 변하는 라이브 녹음에서도 마디가 밀리지 않는다.
+"""
+import os
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import librosa
+from scipy.ndimage import median_filter
+
+logger = logging.getLogger(__name__)
+
+# 결과 템포 범위 (벗어나면 고정값으로 바꾸지 않고 2배/절반으로 접음)
+MIN_BPM = float(os.getenv("RHYTHM_MIN_BPM", "60"))
+MAX_BPM = float(os.getenv("RHYTHM_MAX_BPM", "180"))
+
+# 박을 찾지 못했을 때 사용할 템포
+DEFAULT_BPM = 120.0
+
+# 국소 템포 추정 창 길이/간격 (초)
+TEMPO_WINDOW = 8.0
+TEMPO_STRIDE = 1.0
+
+# 국소 템포의 사전 분포 폭 (곡 전체 템포 기준, 옥타브 단위)
+LOCAL_TEMPO_STD = 0.25
+
+# 국소 템포 평활 (창 개수, 홀수)
+TEMPO_SMOOTHING = 5
+
+# 박 간격이 국소 템포에서 벗어날 때의 벌점 (librosa.beat.beat_track과 같은 척도)
+TIGHTNESS = 100.0
+
+BEATS_PER_BAR = 4
+
+TEMPO_MAP_DTYPE = np.dtype([("time", "f8"), ("beat", "f8")])
+
+
+def _interp(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """구간 선형 보간 (범위 밖은 양 끝 구간의 기울기로 연장)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.interp(x, xp, fp)
+    before, after = x < xp[0], x > xp[-1]
+    y[before] = fp[0] + (x[before] - xp[0]) * (fp[1] - fp[0]) / (xp[1] - xp[0])
+    y[after] = fp[-1] + (x[after] - xp[-1]) * (fp[-1] - fp[-2]) / (xp[-1] - xp[-2])
+    return y
+
+
+@dataclass
+class TempoMap:
+    """
+    박 위치 기반 템포 맵
+
+    - times: 박 시각 (초, 증가 순)
+    - beats: 각 박의 박 번호 (4분음표 단위, beats % BEATS_PER_BAR == 0이 마디 첫 박)
+
+    박 번호는 오디오 시작(0초)이 0 이상이 되도록 붙이며, 0번 박은 오디오 시작과 같거나 앞선다.
+    """
+    times: np.ndarray
+    beats: np.ndarray
+
+    @classmethod
+    def constant(cls, bpm: float, duration: float) -> "TempoMap":
+        """고정 템포 맵 (0초 = 0번 박)"""
+        period = 60.0 / bpm
+        n = max(2, int(np.ceil(duration / period)) + 1)
+        return cls(np.arange(n) * period, np.arange(n, dtype=np.float64))
+
+    @property
+    def bpm(self) -> float:
+        """대표 템포 (박 간격 중간값 기준)"""
+        return float(60.0 / np.median(np.diff(self.times) / np.diff(self.beats)))
+
+    @property
+    def lead_in(self) -> float:
+        """0번 박부터 오디오 시작까지의 시간 (초, MIDI/악보에서 오디오가 시작되는 위치)"""
+        return float(-self.beat_to_time(np.zeros(1))[0])
+
+    def time_to_beat(self, times: np.ndarray) -> np.ndarray:
+        """시각(초) → 박 번호 (실수)"""
+        return _interp(times, self.times, self.beats)
+
+    def beat_to_time(self, beats: np.ndarray) -> np.ndarray:
+        """박 번호 → 시각(초)"""
+        return _interp(beats, self.beats, self.times)
+
+    def bar_tempos(self) -> List[Tuple[float, float]]:
+        """
+        마디별 평균 템포
+
+        Returns:
+            [(마디 첫 박 번호, BPM), ...] (0번 박부터 마지막 박을 포함하는 마디까지)
+        """
+        starts = np.arange(0, self.beats[-1] + 1, BEATS_PER_BAR, dtype=np.float64)
+        edges = self.beat_to_time(np.append(starts, starts[-1] + BEATS_PER_BAR))
+        bpms = 60.0 * BEATS_PER_BAR / np.diff(edges)
+        return list(zip(starts.tolist(), bpms.tolist()))
+
+    def save(self, path: str) -> str:
+        """구조화 배열(.npy)로 저장"""
+        data = np.empty(len(self.times), dtype=TEMPO_MAP_DTYPE)
+        data["time"] = self.times
+        data["beat"] = self.beats
+        np.save(path, data)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "TempoMap":
+        data = np.load(path)
+        return cls(data["time"].astype(np.float64), data["beat"].astype(np.float64))
+
+
+def fold_tempo(bpm: np.ndarray) -> np.ndarray:
+    """템포를 2배/절반으로 접어 [MIN_BPM, MAX_BPM] 범위로 이동"""
+    bpm = np.array(bpm, dtype=np.float64)
+    for _ in range(8):
+        bpm = np.where(bpm < MIN_BPM, bpm * 2, bpm)
+        bpm = np.where(bpm > MAX_BPM, bpm / 2, bpm)
+    return bpm
+
+
+def _log_prior(bpms: np.ndarray, center: float, std: float) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return -0.5 * ((np.log2(bpms) - np.log2(center)) / std) ** 2
+
+
+def local_tempo(
+    onset_env: np.ndarray,
+    sr: int,
+    hop_length: float
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    겹치는 창별 자기상관으로 국소 템포 추정
+
+    템포그램을 매 프레임이 아니라 TEMPO_STRIDE 간격으로만 계산하므로
+    메모리와 시간이 곡 길이에 비례하되 프레임 수 × 창 길이만큼 커지지 않는다.
+
+    Args:
+        onset_env: 온셋 강도 곡선
+        sr: 샘플링 레이트
+        hop_length: onset_env 프레임 간격 (샘플)
+
+    Returns:
+        (곡 전체 템포, 창 중심 프레임, 창별 템포)
+    """
+    win = max(16, int(round(TEMPO_WINDOW * sr / hop_length)))
+    stride = max(1, int(round(TEMPO_STRIDE * sr / hop_length)))
+
+    padded = np.pad(onset_env.astype(np.float64), win // 2, mode="linear_ramp")
+    if len(padded) < win:
+        padded = np.pad(padded, (0, win - len(padded)))
+    frames = librosa.util.frame(padded, frame_length=win, hop_length=stride)
+    frames = frames * np.hanning(win)[:, np.newaxis]
+    ac = librosa.autocorrelate(frames, axis=0)
+    ac = ac / np.maximum(ac[:1], 1e-10)
+
+    bpms = librosa.tempo_frequencies(win, hop_length=hop_length, sr=sr)
+    valid = (bpms >= 30) & (bpms <= 300)
+
+    # 전체 템포: 창 평균 자기상관 × 120BPM 중심 사전 분포 (librosa 기본과 같은 폭 1옥타브)
+    mean_ac = np.log1p(1e6 * np.maximum(ac.mean(axis=1), 0))
+    score = np.where(valid, mean_ac + _log_prior(bpms, DEFAULT_BPM, 1.0), -np.inf)
+    global_bpm = float(fold_tempo(bpms[np.argmax(score)]))
+
+    # 국소 템포: 전체 템포 근처를 우선하여 창마다 옥타브가 뒤집히지 않게 함
+    prior = np.maximum(
+        _log_prior(bpms, global_bpm, LOCAL_TEMPO_STD),
+        np.maximum(_log_prior(bpms, global_bpm * 2, LOCAL_TEMPO_STD), _log_prior(bpms, global_bpm / 2, LOCAL_TEMPO_STD)) - 2.0
+    )
+    local_score = np.where(valid[:, np.newaxis], np.log1p(1e6 * np.maximum(ac, 0)) + prior[:, np.newaxis], -np.inf)
+    local = bpms[np.argmax(local_score, axis=0)]
+    # 범위 경계 근처에서 창마다 다르게 접히지 않도록 전체 템포와 같은 옥타브로 맞춤
+    local = local * 2.0 ** np.round(np.log2(global_bpm / local))
+    if len(local) >= TEMPO_SMOOTHING:
+        local = median_filter(local, size=TEMPO_SMOOTHING, mode="nearest")
+
+    centers = np.arange(frames.shape[1]) * stride
+    return global_bpm, centers, local
+
+
+def track_beats(
+    onset_env: np.ndarray,
+    period: np.ndarray,
+    tightness: float = TIGHTNESS
+) -> np.ndarray:
+    """
+    프레임별 박 간격을 따르는 동적 계획법 박 추적 (Ellis 2007, 간격이 시간에 따라 변하는 형태)
+
+    Args:
+        onset_env: 온셋 강도 곡선
+        period: 프레임별 박 간격 (프레임)
+        tightness: 간격 벗어남 벌점
+
+    Returns:
+        박 프레임 인덱스 (증가 순)
+    """
+    n = len(onset_env)
+    onset = onset_env / (onset_env.std() + 1e-10)
+
+    typical = float(np.median(period))
+    offsets = np.arange(-int(typical), int(typical) + 1)
+    localscore = np.convolve(onset, np.exp(-0.5 * (offsets * 32.0 / typical) ** 2), mode="same")
+
+    # 프레임 i의 이전 박 후보: [i - round(2p), i - round(p/2)]
+    frames = np.arange(n)
+    nearest = np.round(period / 2).astype(np.int64)
+    hi = frames - nearest
+    lo = np.maximum(0, frames - np.round(2 * period).astype(np.int64))
+    width = max(1, int((hi - lo).max()) + 1)
+    lags = np.arange(width)
+    max_nearest = max(1, int(nearest.max()))
+
+    cumscore = np.zeros(n)
+    backlink = np.full(n, -1, dtype=np.int64)
+    start = 0
+    while start < n:
+        # 블록 안의 프레임은 모두 블록 시작 전의 누적 점수만 참조하므로 한 번에 계산
+        stop = min(n, start + max(1, int(nearest[start:start + max_nearest].min())))
+        block = slice(start, stop)
+        candidates = lo[block, np.newaxis] + lags
+        valid = candidates <= hi[block, np.newaxis]
+        candidates = np.minimum(candidates, np.maximum(hi[block, np.newaxis], 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = (frames[block, np.newaxis] - candidates) / period[block, np.newaxis]
+            score = np.where(valid, cumscore[candidates] - tightness * np.log(distance) ** 2, -np.inf)
+        k = np.argmax(score, axis=1)
+        best = score[np.arange(stop - start), k]
+        found = valid[:, 0]
+        cumscore[block] = localscore[block] + np.where(found, best, 0.0)
+        backlink[block] = np.where(found, lo[block] + k, -1)
+        start = stop
+
+    # 마지막 박: 누적 점수 극대점 중 중간값의 절반을 넘는 마지막 위치
+    peaks = np.flatnonzero(librosa.util.localmax(cumscore))
+    if len(peaks) == 0:
+        return np.zeros(0, dtype=np.int64)
+    threshold = 0.5 * np.median(cumscore[peaks])
+    last = int(peaks[cumscore[peaks] >= threshold][-1])
+
+    beats = [last]
+    while backlink[beats[-1]] >= 0:
+        beats.append(int(backlink[beats[-1]]))
+    beats = np.array(beats[::-1], dtype=np.int64)
+
+    # 앞뒤의 약한 박(무음 구간을 채운 박) 제거
+    strength = localscore[beats]
+    keep = np.flatnonzero(strength >= 0.5 * np.sqrt(np.mean(strength ** 2)))
+    return beats[keep[0]:keep[-1] + 1] if len(keep) else beats
+
+
+def downbeat_phase(beat_frames: np.ndarray, accent: Optional[np.ndarray]) -> int:
+    """
+    마디 첫 박 위치 (beat_frames 중 phase, phase + 4, ...번째가 첫 박)
+
+    accent(예: 킥 온셋 강도 - 스네어 온셋 강도)의 박 위치 평균이 가장 큰 위상을 고른다.
+    """
+    if accent is None or len(beat_frames) < BEATS_PER_BAR:
+        return 0
+    at_beats = np.max(
+        [accent[np.clip(beat_frames + k, 0, len(accent) - 1)] for k in (-1, 0, 1, 2)], axis=0
+    )
+    scores = [at_beats[p::BEATS_PER_BAR].mean() for p in range(BEATS_PER_BAR)]
+    return int(np.argmax(scores))
+
+
+def analyze_rhythm(
+    onset_env: np.ndarray,
+    sr: int,
+    hop_length: float,
+    duration: float,
+    accent: Optional[np.ndarray] = None
+) -> TempoMap:
+    """
+    온셋 강도 곡선에서 템포 맵 생성
+
+    Args:
+        onset_env: 온셋 강도 곡선 (트랜스크립션 특징 계산 시 함께 만든 것)
+        sr: 샘플링 레이트
+        hop_length: onset_env 프레임 간격 (샘플)
+        duration: 오디오 길이 (초)
+        accent: 마디 첫 박 판정용 강세 곡선 (onset_env와 같은 프레임 격자)
+
+    Returns:
+        TempoMap (박을 충분히 찾지 못하면 곡 전체 템포의 고정 템포 맵)
+    """
+    if len(onset_env) == 0 or not np.any(onset_env > 0):
+        return TempoMap.constant(DEFAULT_BPM, duration)
+
+    global_bpm, centers, local = local_tempo(onset_env, sr, hop_length)
+    frames_per_minute = 60.0 * sr / hop_length
+    period = frames_per_minute / np.interp(np.arange(len(onset_env)), centers, local)
+
+    beat_frames = track_beats(onset_env, period)
+    if len(beat_frames) < 2 * BEATS_PER_BAR:
+        logger.info(f"Too few beats tracked ({len(beat_frames)}), using constant {global_bpm:.1f} BPM")
+        return TempoMap.constant(global_bpm, duration)
+
+    times = beat_frames * hop_length / sr
+    phase = downbeat_phase(beat_frames, accent)
+
+    # 첫 번째 추적 박의 번호: 첫 박 위상이 마디 경계에 오고, 0초가 0번 박 이후가 되는 가장 작은 값
+    first = (-phase) % BEATS_PER_BAR
+    lead = times[0] / (times[1] - times[0])
+    first += BEATS_PER_BAR * int(np.ceil(max(0.0, lead - first) / BEATS_PER_BAR))
+
+    return TempoMap(times, first + np.arange(len(times), dtype=np.float64))
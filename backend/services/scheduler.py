@@ -0,0 +1,171 @@
+"""
+작업 스케줄러 서비스
+
+동시에 실행되는 파이프라인 수(전역 허용량)와 단계별 동시 실행 수를 제한하고,
+대기 중인 작업을 우선순위/FIFO 순서로 투입한다.
+허용량은 API 프로세스마다 따로 적용되므로 여러 프로세스로 띄우면 실제 상한은 프로세스 수만큼 늘어난다.
+"""
+import os
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from services.worker_pool import get_stage_config
+
+logger = logging.getLogger(__name__)
+
+# 동시에 진행할 수 있는 파이프라인 수 (API 프로세스당)
+MAX_ACTIVE_PIPELINES = int(os.getenv("MAX_ACTIVE_PIPELINES", "4"))
+
+
+class JobScheduler:
+    """
+    우선순위 큐 기반 파이프라인 스케줄러
+
+    - 전역 허용량: 동시에 진행 중인 파이프라인 수 제한
+    - 단계별 상한: 각 단계를 동시에 실행하는 파이프라인 수 제한
+      (기본값은 해당 단계 워커 풀 크기, {STAGE}_CONCURRENCY로 재정의)
+    - 우선순위가 높은 작업이 먼저, 같은 우선순위는 제출 순서대로 투입
+    - 상한과 대기열은 이 프로세스 안에서만 유효 (uvicorn --workers N이면 실제 상한은 N배)
+    """
+
+    def __init__(self, max_active: int = MAX_ACTIVE_PIPELINES):
+        self.max_active = max(1, max_active)
+
+        self._heap: List[Tuple[int, int, str]] = []
+        self._queued: Dict[str, Tuple[int, int, str]] = {}
+        self._active: Set[str] = set()
+        self._jobs: Set[asyncio.Task] = set()
+        self._seq = itertools.count()
+
+        # asyncio 객체는 실행 중인 이벤트 루프에서 생성 (start 호출 시)
+        self._runner: Optional[Callable[[str], Awaitable[None]]] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stage_slots: Dict[str, asyncio.Semaphore] = {}
+        self._stage_limits: Dict[str, int] = {}
+        self._stage_load: Dict[str, int] = {}
+
+    def start(self, runner: Callable[[str], Awaitable[None]]) -> asyncio.Task:
+        """
+        디스패처 시작
+
+        Args:
+            runner: 작업 ID를 받아 파이프라인을 실행하는 코루틴 함수
+
+        Returns:
+            디스패처 asyncio.Task
+        """
+        self._runner = runner
+        self._slots = asyncio.Semaphore(self.max_active)
+        self._wakeup = asyncio.Event()
+        if self._heap:
+            self._wakeup.set()
+        return asyncio.create_task(self._dispatch())
+
+    def submit(self, task_id: str, priority: int = 0):
+        """
+        작업을 대기열에 추가
+
+        Args:
+            task_id: 작업 ID
+            priority: 우선순위 (클수록 먼저 실행)
+        """
+        if task_id in self._queued or task_id in self._active:
+            return
+
+        entry = (-priority, next(self._seq), task_id)
+        heapq.heappush(self._heap, entry)
+        self._queued[task_id] = entry
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def position(self, task_id: str) -> Optional[int]:
+        """
+        대기열에서의 순번 (1부터 시작, 대기 중이 아니면 None)
+
+        Args:
+            task_id: 작업 ID
+        """
+        entry = self._queued.get(task_id)
+        if entry is None:
+            return None
+        return 1 + sum(1 for other in self._queued.values() if other < entry)
+
+    def stats(self) -> Dict[str, int]:
+        """대기/실행 중인 작업 수"""
+        return {"queued": len(self._queued), "active": len(self._active)}
+
+    def stage_capacity(self, stage: str) -> int:
+        """
+        단계별 동시 실행 상한
+
+        Args:
+            stage: 단계 이름
+        """
+        limit = self._stage_limits.get(stage)
+        if limit is None:
+            _, workers = get_stage_config(stage)
+            limit = max(1, int(os.getenv(f"{stage.upper()}_CONCURRENCY", workers)))
+            self._stage_limits[stage] = limit
+        return limit
+
+    def stage_load(self, stage: str) -> int:
+        """
+        단계에서 실행 중이거나 슬롯을 기다리는 작업 수
+
+        Args:
+            stage: 단계 이름
+        """
+        return self._stage_load.get(stage, 0)
+
+    @asynccontextmanager
+    async def stage_slot(self, stage: str) -> AsyncIterator[None]:
+        """
+        단계별 동시 실행 제한 (`async with`로 사용)
+
+        슬롯을 기다리는 동안과 실행 중인 동안 stage_load에 포함된다.
+
+        Args:
+            stage: 단계 이름
+        """
+        slot = self._stage_slots.get(stage)
+        if slot is None:
+            slot = asyncio.Semaphore(self.stage_capacity(stage))
+            self._stage_slots[stage] = slot
+
+        self._stage_load[stage] = self._stage_load.get(stage, 0) + 1
+        try:
+            async with slot:
+                yield
+        finally:
+            self._stage_load[stage] -= 1
+
+    async def _dispatch(self):
+        """허용량이 남아 있는 동안 대기열의 작업을 순서대로 투입"""
+        while True:
+            await self._slots.acquire()
+
+            while not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            _, _, task_id = heapq.heappop(self._heap)
+            del self._queued[task_id]
+            self._active.add(task_id)
+
+            job = asyncio.create_task(self._run(task_id))
+            self._jobs.add(job)
+            job.add_done_callback(self._jobs.discard)
+
+    async def _run(self, task_id: str):
+        try:
+            await self._runner(task_id)
+        except Exception as e:
+            logger.error(f"[{task_id}] Pipeline crashed: {str(e)}")
+        finally:
+            self._active.discard(task_id)
+            self._slots.release()
@@ -2,50 +2,813 @@
 음원 분리 서비스 (Demucs 사용)
 """
 import os
+import math
+import shutil
 import logging
 import subprocess
-import shutil
 import sys
+import queue
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.storage_service import task_dir, remove_intermediate
+from services.worker_pool import START_METHOD
 
 logger = logging.getLogger(__name__)
 
-TEMP_DIR = "backend/temp/separated"
+# 분리 실행 방식: inprocess (모델 상주) 또는 subprocess (기존 CLI 호출)
+SEPARATION_MODE = os.getenv("SEPARATION_MODE", "inprocess")
+
+# Demucs 설정 (CPU 전용 서버에서는 segment/overlap/스레드 수를 조정)
+DEMUCS_MODEL = os.getenv("DEMUCS_MODEL", "htdemucs")
+DEMUCS_DEVICE = os.getenv("DEMUCS_DEVICE", "cpu")
+DEMUCS_SHIFTS = int(os.getenv("DEMUCS_SHIFTS", "1"))
+DEMUCS_OVERLAP = float(os.getenv("DEMUCS_OVERLAP", "0.25"))
+DEMUCS_SEGMENT = float(os.getenv("DEMUCS_SEGMENT")) if os.getenv("DEMUCS_SEGMENT") else None
+DEMUCS_THREADS = int(os.getenv("DEMUCS_THREADS", "0"))  # 0이면 torch 기본값
+DEMUCS_PRELOAD = os.getenv("DEMUCS_PRELOAD", "0") == "1"
+
+# subprocess 모드 최소 타임아웃 (초, 긴 곡은 곡 길이의 3배까지 허용)
+DEMUCS_TIMEOUT = float(os.getenv("DEMUCS_TIMEOUT", "600"))
+
+# 긴 트랙 병렬 분리: 이 길이(초) 이상이면 겹치는 구간으로 나눠 프로세스 풀에서 동시에 분리
+PARALLEL_MIN_SECONDS = float(os.getenv("PARALLEL_MIN_SECONDS", "180"))
+
+# 구간 길이와 이웃 구간과 겹치는 길이 (초, 겹친 부분은 크로스페이드로 이어 붙임)
+CHUNK_SECONDS = float(os.getenv("SEPARATION_CHUNK_SECONDS", "60"))
+CHUNK_OVERLAP_SECONDS = float(os.getenv("SEPARATION_CHUNK_OVERLAP", "5"))
+
+# 구간 분리 프로세스 수와 프로세스당 torch 스레드 수
+# (0이면 CPU 코어 수 / 스레드 수, 단 CHUNK_MAX_WORKERS까지. 프로세스마다 모델과 구간 활성값이 상주하므로
+#  htdemucs 기준 프로세스당 약 1~2GB를 차지하며, 풀은 한 번 만들어지면 계속 유지된다)
+CHUNK_WORKERS = int(os.getenv("SEPARATION_CHUNK_WORKERS", "0"))
+CHUNK_THREADS = int(os.getenv("SEPARATION_CHUNK_THREADS", "1"))
+CHUNK_MAX_WORKERS = int(os.getenv("SEPARATION_CHUNK_MAX_WORKERS", "4"))
+
+# quick 등급: 시프트 없이 겹침을 줄이고, 입력을 낮은 레이트로 리샘플해 모델이 처리할 샘플 수를 줄인다
+DEMUCS_QUICK_MODEL = os.getenv("DEMUCS_QUICK_MODEL", DEMUCS_MODEL)
+DEMUCS_QUICK_OVERLAP = float(os.getenv("DEMUCS_QUICK_OVERLAP", "0.1"))
+DEMUCS_QUICK_RATE = float(os.getenv("DEMUCS_QUICK_RATE", "0.5"))
+
+# fine 등급: 파인튜닝 모델 묶음 중 드럼 전담 모델만 실행
+DEMUCS_FINE_MODEL = os.getenv("DEMUCS_FINE_MODEL", "htdemucs_ft")
+
+# 요청에 등급이 없을 때 사용할 등급 (auto면 곡 길이/대기열에 따라 자동 선택)
+DEFAULT_SEPARATION_TIER = os.getenv("DEFAULT_SEPARATION_TIER", "auto")
+
+# auto 선택 기준: 분리 예상 시간 상한 (초, 대기 시간 포함)
+SEPARATION_TIME_BUDGET = float(os.getenv("SEPARATION_TIME_BUDGET", "600"))
+
+# auto 선택 기준: quality 등급의 초기 실시간 배율 (분리 시간 / 곡 길이, 이후 실측으로 갱신)
+SEPARATION_RTF = float(os.getenv("SEPARATION_RTF", "1.0"))
+
+# auto 선택 기준: 타악 성분 에너지 비율이 이 값 이상이면 분리를 건너뜀
+DRUM_DOMINANT_RATIO = float(os.getenv("DRUM_DOMINANT_RATIO", "0.7"))
+
+# 타악 비율 분석에 사용할 구간 길이 (초)
+PROFILE_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class SeparationTier:
+    """
+    분리 품질 등급
+
+    model이 None이면 분리를 건너뛰고 믹스를 그대로 드럼 트랙으로 사용한다.
+    drums_only이면 모델 묶음(BagOfModels) 중 드럼 가중치가 가장 큰 모델 하나만 실행한다.
+    rate가 1보다 작으면 입력을 모델 레이트 × rate로 리샘플한 샘플열을 모델 레이트로 간주해 분리하고
+    드럼 스템을 원래 레이트로 되돌린다 (연산량은 rate배, 모델 레이트 × rate / 2 이상의 대역은 잃음).
+    """
+    name: str
+    model: Optional[str]
+    shifts: int = DEMUCS_SHIFTS
+    overlap: float = DEMUCS_OVERLAP
+    segment: Optional[float] = DEMUCS_SEGMENT
+    drums_only: bool = False
+    rate: float = 1.0
+
+    @property
+    def cost(self) -> float:
+        """quality 등급 대비 상대 연산량 (세그먼트 forward 횟수 × 처리 샘플 비율 기준)"""
+        if self.model is None:
+            return 0.0
+        passes = max(1, self.shifts) / (1 - self.overlap) * self.rate
+        return passes / (max(1, DEMUCS_SHIFTS) / (1 - DEMUCS_OVERLAP))
+
+
+SEPARATION_TIERS: Dict[str, SeparationTier] = {
+    "none": SeparationTier("none", None),
+    "quick": SeparationTier(
+        "quick", DEMUCS_QUICK_MODEL, shifts=0, overlap=DEMUCS_QUICK_OVERLAP,
+        rate=min(1.0, max(0.25, DEMUCS_QUICK_RATE))
+    ),
+    "quality": SeparationTier("quality", DEMUCS_MODEL),
+    "fine": SeparationTier("fine", DEMUCS_FINE_MODEL, drums_only=True),
+}
+
+# auto 선택 시 시도하는 순서 (좋은 품질부터)
+AUTO_TIER_ORDER = ("quality", "quick")
+
+
+def get_tier(name: str) -> SeparationTier:
+    """등급 이름으로 설정 조회 (알 수 없는 이름이면 ValueError)"""
+    tier = SEPARATION_TIERS.get(name)
+    if tier is None:
+        raise ValueError(f"지원하지 않는 분리 등급입니다: {name}")
+    return tier
+
+
+class DemucsEngine:
+    """
+    프로세스 내 상주 Demucs 분리 엔진
+
+    모델은 등급별로 최초 사용 시 한 번만 로드되어 워커 프로세스에 상주하며,
+    전용 스레드가 작업 큐에서 트랙을 하나씩 꺼내 순서대로 분리한다.
+    """
+
+    def __init__(
+        self,
+        device: str = DEMUCS_DEVICE,
+        num_threads: int = DEMUCS_THREADS
+    ):
+        self.device = device
+        self.num_threads = num_threads
+
+        self._models: Dict[Tuple[str, bool], object] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def load(self, tier: SeparationTier = SEPARATION_TIERS["quality"]):
+        """
+        등급에 해당하는 모델 로드 (이미 로드되었으면 캐시된 모델 반환)
+
+        Args:
+            tier: 분리 등급
+
+        Returns:
+            분리에 사용할 모델
+        """
+        key = (tier.model, tier.drums_only)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            import torch
+            from demucs.pretrained import get_model
+
+            if self.num_threads > 0:
+                torch.set_num_threads(self.num_threads)
+
+            logger.info(f"Loading Demucs model '{tier.model}' on {self.device}")
+            model = get_model(tier.model)
+            if tier.drums_only:
+                model = _drum_specialist(model)
+            model.to(self.device)
+            model.eval()
+            self._models[key] = model
+            return model
+
+    def submit(
+        self,
+        audio_path: str,
+        output_dir: str,
+        tier: SeparationTier = SEPARATION_TIERS["quality"],
+        progress: Optional[Callable[[float, Optional[str]], None]] = None
+    ) -> Future:
+        """
+        분리 작업을 큐에 추가
+
+        Args:
+            audio_path: 입력 오디오 파일 경로
+            output_dir: 드럼 트랙을 저장할 디렉토리
+            tier: 분리 등급
+            progress: 진행률 콜백 (처리한 세그먼트 비율, 설명)
+
+        Returns:
+            드럼 트랙 경로를 결과로 갖는 Future
+        """
+        future: Future = Future()
+        self._queue.put((audio_path, output_dir, tier, progress, future))
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="demucs-engine", daemon=True
+                )
+                self._thread.start()
+
+        return future
+
+    def separate(
+        self,
+        audio_path: str,
+        output_dir: str,
+        tier: SeparationTier = SEPARATION_TIERS["quality"],
+        progress: Optional[Callable[[float, Optional[str]], None]] = None
+    ) -> str:
+        """분리 작업을 큐에 넣고 완료될 때까지 대기"""
+        return self.submit(audio_path, output_dir, tier, progress).result()
+
+    def _run(self):
+        """작업 큐 처리 루프"""
+        while True:
+            audio_path, output_dir, tier, progress, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._separate(audio_path, output_dir, tier, progress))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _separate(
+        self,
+        audio_path: str,
+        output_dir: str,
+        tier: SeparationTier,
+        progress: Optional[Callable[[float, Optional[str]], None]] = None
+    ) -> str:
+        """한 트랙의 드럼 분리 (Demucs CLI와 동일한 정규화 적용)"""
+        from demucs.audio import save_audio
+
+        model = self.load(tier)
+
+        wav = _load_audio(audio_path, model.samplerate, model.audio_channels)
+        ref = wav.mean(0)
+        drums = self.extract_drums(model, (wav - ref.mean()) / ref.std(), tier, progress)
+        drums = drums * ref.std() + ref.mean()
+
+        os.makedirs(output_dir, exist_ok=True)
+        drum_path = os.path.join(output_dir, "drums.wav")
+        save_audio(drums.cpu(), drum_path, samplerate=model.samplerate)
+        return drum_path
+
+    def extract_drums(
+        self,
+        model,
+        wav,
+        tier: SeparationTier,
+        progress: Optional[Callable[[float, Optional[str]], None]] = None
+    ):
+        """
+        정규화된 입력 텐서에서 드럼 스템 추출
+
+        Args:
+            model: load()로 얻은 모델
+            wav: (채널, 샘플) 텐서 (트랙 전체 기준 평균/표준편차로 정규화됨)
+            tier: 분리 등급
+            progress: 진행률 콜백
+
+        Returns:
+            (채널, 샘플) 드럼 텐서 (정규화된 크기)
+        """
+        import torch
+        from demucs.apply import apply_model
+
+        length = wav.shape[-1]
+        if tier.rate < 1:
+            wav = _resample(wav, model.samplerate, _reduced_rate(model.samplerate, tier.rate))
+
+        hooks = self._track_progress(model, wav.shape[-1], tier, progress) if progress else []
+        try:
+            with torch.no_grad():
+                sources = apply_model(
+                    model,
+                    wav[None],
+                    device=self.device,
+                    shifts=tier.shifts,
+                    split=True,
+                    overlap=tier.overlap,
+                    segment=tier.segment,
+                    progress=False
+                )[0]
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        drums = sources[model.sources.index("drums")]
+        if tier.rate < 1:
+            drums = _resample(drums, _reduced_rate(model.samplerate, tier.rate), model.samplerate, length)
+        return drums
+
+    def _count_segments(self, model, length: int, tier: SeparationTier) -> int:
+        """apply_model이 모델 forward를 호출할 횟수 (세그먼트 수 × shift 수 × 모델 수)"""
+        models = getattr(model, "models", [model])
+        segment = tier.segment or float(models[0].segment)
+        segment_length = int(model.samplerate * segment)
+        stride = max(1, int((1 - tier.overlap) * segment_length))
+        if tier.shifts:
+            length += int(0.5 * model.samplerate)
+        return len(models) * max(1, tier.shifts) * math.ceil(length / stride)
+
+    def _track_progress(
+        self,
+        model,
+        length: int,
+        tier: SeparationTier,
+        progress: Callable[[float, Optional[str]], None]
+    ):
+        """
+        세그먼트 단위 진행률 보고용 forward hook 등록
+
+        Returns:
+            hook 핸들 목록 (작업 후 remove 필요)
+        """
+        total = self._count_segments(model, length, tier)
+        done = [0]
+
+        def on_forward(module, inputs, output):
+            done[0] += 1
+            progress(min(done[0] / total, 0.99), f"세그먼트 {min(done[0], total)}/{total}")
+
+        return [m.register_forward_hook(on_forward) for m in getattr(model, "models", [model])]
+
+
+def _drum_specialist(model):
+    """
+    모델 묶음에서 드럼 가중치가 가장 큰 하위 모델 선택
+
+    htdemucs_ft처럼 소스별로 파인튜닝된 모델을 묶은 경우 드럼 전담 모델 하나만 실행하면
+    묶음 전체와 같은 드럼 결과를 단일 모델 비용으로 얻는다.
+    """
+    models = getattr(model, "models", None)
+    if not models:
+        return model
+
+    index = model.sources.index("drums")
+    best = max(range(len(models)), key=lambda i: model.weights[i][index])
+    return models[best]
+
+
+def _reduced_rate(samplerate: int, rate: float) -> int:
+    """rate < 1 등급이 모델에 넣는 실제 샘플링 레이트"""
+    return max(1, round(samplerate * rate))
+
+
+def _resample(wav, old_sr: int, new_sr: int, length: Optional[int] = None):
+    """(채널, 샘플) 텐서 리샘플 (length를 주면 그 길이로 맞춤)"""
+    import julius
+    return julius.resample_frac(wav, old_sr, new_sr, output_length=length)
+
+
+def _resample_file(src_path: str, dest_path: str, old_sr: int, new_sr: int, header_sr: int):
+    """
+    WAV 파일 리샘플 (subprocess 모드의 rate < 1 등급용, torch 없이 scipy로 처리)
+
+    Args:
+        src_path: 입력 WAV
+        dest_path: 출력 WAV (입력과 같은 서브타입)
+        old_sr: 입력 샘플의 실제 레이트
+        new_sr: 출력 샘플의 실제 레이트
+        header_sr: 출력 헤더에 기록할 레이트
+    """
+    import soundfile as sf
+    from fractions import Fraction
+    from scipy.signal import resample_poly
+
+    info = sf.info(src_path)
+    data, _ = sf.read(src_path, dtype="float32", always_2d=True)
+    ratio = Fraction(new_sr, old_sr)
+    out = resample_poly(data, ratio.numerator, ratio.denominator, axis=0)
+    sf.write(dest_path, out.astype("float32"), header_sr, format="WAV", subtype=info.subtype)
+
+
+def _load_audio(audio_path: str, samplerate: int, channels: int):
+    """
+    모델 입력 형식으로 오디오 로드
+
+    WAV/FLAC 등은 soundfile로 바로 읽고, 그 외 포맷은 Demucs의 ffmpeg 로더를 사용한다.
+    """
+    import torch
+    import soundfile as sf
+    from demucs.audio import AudioFile, convert_audio
+
+    try:
+        data, sr = sf.read(audio_path, dtype="float32", always_2d=True)
+    except RuntimeError:
+        return AudioFile(audio_path).read(streams=0, samplerate=samplerate, channels=channels)
+
+    wav = torch.from_numpy(data.T.copy())
+    return convert_audio(wav, sr, samplerate, channels)
+
+
+_engine: Optional[DemucsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> DemucsEngine:
+    """프로세스당 하나의 분리 엔진 반환"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = DemucsEngine()
+        return _engine
+
+
+def separation_params(tier: str = "quality") -> dict:
+    """분리 결과에 영향을 주는 설정 (캐시 키에 포함)"""
+    config = get_tier(tier)
+    if config.model is None:
+        return {"model": None}
+
+    params = {
+        "model": config.model,
+        "shifts": config.shifts,
+        "overlap": config.overlap,
+        "segment": config.segment,
+    }
+    if config.drums_only:
+        params["drums_only"] = True
+    if config.rate < 1:
+        params["rate"] = config.rate
+    return params
+
+
+def _chunk_bounds(n_frames: int, sample_rate: int) -> List[Tuple[int, int]]:
+    """
+    긴 트랙을 CHUNK_OVERLAP_SECONDS씩 겹치는 구간으로 나눈 프레임 범위
+
+    마지막 구간을 제외한 모든 구간은 CHUNK_SECONDS 길이이며,
+    다음 구간은 항상 겹침 길이보다 길다.
+    """
+    size = int(CHUNK_SECONDS * sample_rate)
+    overlap = int(CHUNK_OVERLAP_SECONDS * sample_rate)
+    step = max(1, size - overlap)
+
+    bounds, start = [], 0
+    while True:
+        stop = min(start + size, n_frames)
+        bounds.append((start, stop))
+        if stop >= n_frames:
+            return bounds
+        start += step
 
 
-async def separate_drums(audio_path: str, task_id: str) -> str:
+def _mix_stats(audio_path: str) -> Tuple[float, float]:
+    """트랙 전체 모노 믹스의 평균/표준편차 (블록 단위로 읽어 계산, 구간 정규화에 공통 사용)"""
+    import numpy as np
+    import soundfile as sf
+
+    total, total_sq, count = 0.0, 0.0, 0
+    for block in sf.blocks(audio_path, blocksize=1 << 20, dtype="float32", always_2d=True):
+        mono = block.mean(axis=1, dtype=np.float64)
+        total += float(mono.sum())
+        total_sq += float(np.square(mono).sum())
+        count += len(mono)
+
+    mean = total / count
+    variance = (total_sq - count * mean ** 2) / max(1, count - 1)
+    return mean, math.sqrt(max(variance, 1e-12))
+
+
+def _init_chunk_worker(num_threads: int):
+    """구간 분리 프로세스 초기화 (프로세스마다 스레드 수를 제한한 엔진 생성)"""
+    global _engine
+    _engine = DemucsEngine(num_threads=num_threads)
+
+
+def _separate_chunk(
+    audio_path: str,
+    start: int,
+    stop: int,
+    tier: SeparationTier,
+    mean: float,
+    std: float
+):
+    """
+    한 구간의 드럼 분리 (구간 분리 프로세스에서 실행)
+
+    Returns:
+        ((샘플, 채널) float32 배열, 샘플링 레이트)
+    """
+    import torch
+    import soundfile as sf
+    from demucs.audio import convert_audio
+
+    engine = get_engine()
+    model = engine.load(tier)
+
+    data, sr = sf.read(audio_path, start=start, stop=stop, dtype="float32", always_2d=True)
+    wav = convert_audio(torch.from_numpy(data.T.copy()), sr, model.samplerate, model.audio_channels)
+    drums = engine.extract_drums(model, (wav - mean) / std, tier) * std + mean
+    return drums.cpu().numpy().T.copy(), model.samplerate
+
+
+_chunk_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _chunk_worker_count() -> int:
+    """구간 분리 프로세스 수 (명시하지 않으면 코어 수 기준, CHUNK_MAX_WORKERS로 제한)"""
+    if CHUNK_WORKERS:
+        return CHUNK_WORKERS
+    by_cores = (os.cpu_count() or 1) // max(1, CHUNK_THREADS)
+    return max(1, min(by_cores, CHUNK_MAX_WORKERS))
+
+
+def get_chunk_executor() -> ProcessPoolExecutor:
+    """구간 분리 프로세스 풀 (최초 호출 시 생성, 프로세스마다 모델 상주)"""
+    global _chunk_executor
+    with _engine_lock:
+        if _chunk_executor is None:
+            workers = _chunk_worker_count()
+            _chunk_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(START_METHOD),
+                initializer=_init_chunk_worker,
+                initargs=(CHUNK_THREADS,)
+            )
+            logger.info(f"Created chunk separation pool ({workers} workers x {CHUNK_THREADS} threads)")
+        return _chunk_executor
+
+
+def shutdown_chunk_pool(wait: bool = True):
+    """구간 분리 프로세스 풀 종료"""
+    global _chunk_executor
+    with _engine_lock:
+        if _chunk_executor is not None:
+            _chunk_executor.shutdown(wait=wait, cancel_futures=True)
+            _chunk_executor = None
+
+
+def _separate_parallel(
+    audio_path: str,
+    output_dir: str,
+    tier: SeparationTier,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None
+) -> str:
+    """
+    긴 트랙을 겹치는 구간으로 나눠 프로세스 풀에서 동시에 분리한 뒤 이어 붙임
+
+    모든 구간은 트랙 전체의 평균/표준편차로 정규화하여 구간마다 음량이 달라지지 않게 하고,
+    겹친 부분은 선형 크로스페이드로 합친다. 구간 결과는 순서대로 바로 파일에 기록하므로
+    메모리에는 완료 순서가 앞선 구간만 남는다.
+
+    Returns:
+        드럼 트랙 경로 (float32 WAV)
+    """
+    import numpy as np
+    import soundfile as sf
+
+    info = sf.info(audio_path)
+    bounds = _chunk_bounds(info.frames, info.samplerate)
+    mean, std = _mix_stats(audio_path)
+
+    executor = get_chunk_executor()
+    futures = [
+        executor.submit(_separate_chunk, audio_path, start, stop, tier, mean, std)
+        for start, stop in bounds
+    ]
+    logger.info(f"Separating {len(bounds)} chunks of {audio_path} in parallel")
+
+    drum_path = os.path.join(output_dir, "drums.wav")
+    tmp_path = f"{drum_path}.{uuid.uuid4().hex[:8]}.part"
+    out = None
+    try:
+        carry = None
+        for i, future in enumerate(futures):
+            drums, sample_rate = future.result()
+            if out is None:
+                out = sf.SoundFile(
+                    tmp_path, "w", samplerate=sample_rate, channels=drums.shape[1],
+                    format="WAV", subtype="FLOAT"
+                )
+                # 입력과 모델의 샘플링 레이트가 다르면 겹침 길이도 출력 기준으로 환산
+                overlap = round(int(CHUNK_OVERLAP_SECONDS * info.samplerate) * sample_rate / info.samplerate)
+
+            if carry is not None:
+                n = min(len(carry), len(drums))
+                fade = np.linspace(0.0, 1.0, n, dtype=np.float32)[:, None]
+                drums[:n] = carry[:n] * (1 - fade) + drums[:n] * fade
+
+            if i < len(futures) - 1:
+                keep = max(0, len(drums) - overlap)
+                out.write(drums[:keep])
+                carry = drums[keep:]
+            else:
+                out.write(drums)
+
+            if progress is not None:
+                progress(min((i + 1) / len(futures), 0.99), f"구간 {i + 1}/{len(futures)}")
+
+        out.close()
+        os.replace(tmp_path, drum_path)
+    except Exception:
+        for future in futures:
+            future.cancel()
+        if out is not None and not out.closed:
+            out.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return drum_path
+
+
+def _use_parallel(audio_path: str) -> bool:
+    """구간 병렬 분리 대상인지 확인 (PARALLEL_MIN_SECONDS 이상이고 WAV 등 soundfile로 읽을 수 있는 입력)"""
+    if _chunk_worker_count() < 2:
+        return False
+    try:
+        import soundfile as sf
+        return sf.info(audio_path).duration >= PARALLEL_MIN_SECONDS
+    except Exception:
+        return False
+
+
+def preload_separator():
+    """워커 시작 시 모델을 미리 로드 (DEMUCS_PRELOAD=1)"""
+    if SEPARATION_MODE == "inprocess" and DEMUCS_PRELOAD:
+        get_engine().load()
+
+
+def profile_source(audio_path: str) -> dict:
+    """
+    분리 등급 자동 선택용 입력 분석 (다운로드 스레드 풀에서 실행)
+
+    곡 길이는 헤더에서 읽고, 타악 성분 비율은 곡 가운데 PROFILE_SECONDS 구간을
+    22.05kHz 모노로 읽어 HPSS로 나눈 뒤 타악 에너지 / 전체 에너지로 계산한다.
+
+    Args:
+        audio_path: 입력 오디오 파일 경로
+
+    Returns:
+        {"duration": 곡 길이(초), "percussive_ratio": 0~1}
+    """
+    import numpy as np
+    import librosa
+    import soundfile as sf
+
+    duration = float(sf.info(audio_path).duration)
+    offset = max(0.0, (duration - PROFILE_SECONDS) / 2)
+    y, _ = librosa.load(audio_path, sr=22050, mono=True, offset=offset, duration=PROFILE_SECONDS)
+
+    stft = librosa.stft(y)
+    harmonic, percussive = librosa.decompose.hpss(np.abs(stft) ** 2)
+    total = float(harmonic.sum() + percussive.sum())
+    ratio = float(percussive.sum()) / total if total > 0 else 0.0
+
+    return {"duration": duration, "percussive_ratio": round(ratio, 3)}
+
+
+def resolve_tier(
+    requested: str,
+    profile: dict,
+    pending: int = 0,
+    workers: int = 1,
+    realtime_factors: Optional[Dict[str, float]] = None
+) -> str:
+    """
+    요청된 등급을 실제 실행할 등급으로 결정
+
+    auto이면 타악 비중이 DRUM_DOMINANT_RATIO 이상인 음원은 분리를 건너뛰고,
+    그 외에는 예상 시간(곡 길이 × 실시간 배율 × 대기열 부하)이
+    SEPARATION_TIME_BUDGET 안에 드는 가장 좋은 등급을 고른다. 어느 등급도 맞지 않으면 none.
+
+    Args:
+        requested: 요청 등급 (auto 또는 SEPARATION_TIERS 키)
+        profile: profile_source 결과
+        pending: 분리 단계에서 대기/실행 중인 작업 수 (자신 제외)
+        workers: 분리 단계 동시 실행 수
+        realtime_factors: 등급별 실측 실시간 배율 (없으면 SEPARATION_RTF × 상대 연산량)
+
+    Returns:
+        등급 이름
+    """
+    if requested != "auto":
+        return get_tier(requested).name
+
+    if profile.get("percussive_ratio", 0.0) >= DRUM_DOMINANT_RATIO:
+        return "none"
+
+    load = 1 + pending / max(1, workers)
+    for name in AUTO_TIER_ORDER:
+        rtf = (realtime_factors or {}).get(name, SEPARATION_RTF * SEPARATION_TIERS[name].cost)
+        if profile["duration"] * rtf * load <= SEPARATION_TIME_BUDGET:
+            return name
+    return "none"
+
+
+def _use_mix_as_drums(audio_path: str, output_dir: str) -> str:
+    """분리 없이 믹스를 드럼 트랙 자리에 연결 (하드링크, 실패하면 복사)"""
+    drum_path = os.path.join(output_dir, "drums.wav")
+    remove_intermediate(drum_path)
+    try:
+        os.link(audio_path, drum_path)
+    except OSError:
+        shutil.copyfile(audio_path, drum_path)
+    return drum_path
+
+
+def separate_drums(
+    audio_path: str,
+    task_id: str,
+    tier: str = "quality",
+    progress: Optional[Callable[[float, Optional[str]], None]] = None
+) -> str:
     """
     Demucs를 사용하여 드럼 트랙 분리
 
     Args:
         audio_path: 입력 오디오 파일 경로
         task_id: 작업 ID
+        tier: 분리 등급 (none이면 분리하지 않고 믹스를 그대로 사용)
+        progress: 진행률 콜백 (inprocess 모드는 세그먼트, 병렬 분리는 구간 단위로 보고)
+
+    Returns:
+        분리된 드럼 트랙 파일 경로
+    """
+    config = get_tier(tier)
+    output_dir = task_dir(task_id, "separate")
+
+    if config.model is None:
+        logger.info(f"Skipping separation for: {audio_path}")
+        return _use_mix_as_drums(audio_path, output_dir)
+
+    # 긴 트랙은 실행 모드와 무관하게 구간으로 나눠 여러 프로세스에서 동시에 분리
+    if _use_parallel(audio_path):
+        try:
+            drum_path = _separate_parallel(audio_path, output_dir, config, progress)
+            logger.info(f"Drum separation complete: {drum_path}")
+            return drum_path
+        except Exception as e:
+            logger.error(f"Parallel separation failed: {str(e)}")
+            raise Exception(f"음원 분리 실패: {str(e)}")
+
+    if SEPARATION_MODE == "inprocess":
+        try:
+            logger.info(f"Starting in-process Demucs separation ({tier}) for: {audio_path}")
+            drum_path = get_engine().separate(audio_path, output_dir, config, progress)
+            logger.info(f"Drum separation complete: {drum_path}")
+            return drum_path
+        except Exception as e:
+            logger.error(f"Separation failed: {str(e)}")
+            raise Exception(f"음원 분리 실패: {str(e)}")
+
+    return _separate_drums_subprocess(audio_path, task_id, config)
+
+
+def _subprocess_timeout(audio_path: str) -> float:
+    """CLI 타임아웃 (기본 DEMUCS_TIMEOUT, 긴 곡은 곡 길이의 3배)"""
+    try:
+        import soundfile as sf
+        return max(DEMUCS_TIMEOUT, 3 * sf.info(audio_path).duration)
+    except Exception:
+        return DEMUCS_TIMEOUT
+
+
+def _separate_drums_subprocess(audio_path: str, task_id: str, tier: SeparationTier) -> str:
+    """
+    Demucs CLI를 별도 프로세스로 실행하여 드럼 트랙 분리
+
+    CLI는 모델 묶음의 하위 모델만 실행할 수 없으므로 fine 등급은 묶음 전체를 실행한다.
+    rate < 1 등급은 리샘플한 샘플을 원래 레이트 헤더로 기록한 입력을 넘기고, 출력 드럼을 다시 되돌린다.
+
+    Args:
+        audio_path: 입력 오디오 파일 경로
+        task_id: 작업 ID
+        tier: 분리 등급
 
     Returns:
         분리된 드럼 트랙 파일 경로
     """
-    os.makedirs(TEMP_DIR, exist_ok=True)
+    import soundfile as sf
 
-    output_dir = os.path.join(TEMP_DIR, task_id)
+    output_dir = task_dir(task_id, "separate")
+    scaled_path = None
 
     try:
+        if tier.rate < 1:
+            sample_rate = sf.info(audio_path).samplerate
+            scaled_path = os.path.join(output_dir, "input_scaled.wav")
+            _resample_file(audio_path, scaled_path, sample_rate, _reduced_rate(sample_rate, tier.rate), sample_rate)
+
         # Demucs 실행
         # htdemucs: Hybrid Transformer Demucs (최신 모델)
-        logger.info(f"Starting Demucs separation for: {audio_path}")
+        logger.info(f"Starting Demucs separation ({tier.name}) for: {audio_path}")
 
         cmd = [
             sys.executable, "-m", "demucs",
             "--two-stems=drums",  # 드럼만 분리
-            "-n", "htdemucs",  # htdemucs 모델 사용
-            "-o", TEMP_DIR,
-            "--filename", f"{task_id}/{{stem}}.{{ext}}",
-            audio_path
+            "-n", tier.model,
+            "--shifts", str(tier.shifts),
+            "--overlap", str(tier.overlap),
+            "-o", output_dir,
+            "--filename", "{stem}.{ext}",
         ]
+        if tier.segment is not None:
+            cmd += ["--segment", str(int(tier.segment))]  # CLI는 정수 초만 허용
+        cmd.append(scaled_path or audio_path)
 
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=600  # 10분 타임아웃
+            timeout=_subprocess_timeout(audio_path)
         )
 
         if result.returncode != 0:
@@ -53,16 +816,25 @@ async def separate_drums(audio_path: str, task_id: str) -> str:
             raise Exception(f"Demucs 음원 분리 실패: {result.stderr}")
 
         # 분리된 드럼 파일 경로
-        drum_path = os.path.join(TEMP_DIR, task_id, "drums.wav")
+        drum_path = os.path.join(output_dir, "drums.wav")
 
         if not os.path.exists(drum_path):
-            # htdemucs 폴더 구조 확인
-            htdemucs_path = os.path.join(TEMP_DIR, "htdemucs", task_id, "drums.wav")
+            # htdemucs 폴더 구조 확인 (CLI는 -o 아래 모델 이름 폴더를 만든다)
+            htdemucs_path = os.path.join(output_dir, tier.model, "drums.wav")
             if os.path.exists(htdemucs_path):
                 drum_path = htdemucs_path
             else:
                 raise Exception("분리된 드럼 파일을 찾을 수 없습니다.")
 
+        # 드럼 외 스템은 이후 단계에서 사용하지 않음
+        remove_intermediate(os.path.join(os.path.dirname(drum_path), "no_drums.wav"))
+
+        if scaled_path is not None:
+            model_rate = sf.info(drum_path).samplerate
+            tmp_path = f"{drum_path}.{uuid.uuid4().hex[:8]}.part"
+            _resample_file(drum_path, tmp_path, _reduced_rate(model_rate, tier.rate), model_rate, model_rate)
+            os.replace(tmp_path, drum_path)
+
         logger.info(f"Drum separation complete: {drum_path}")
         return drum_path
 
@@ -72,16 +844,5 @@ async def separate_drums(audio_path: str, task_id: str) -> str:
     except Exception as e:
         logger.error(f"Separation failed: {str(e)}")
         raise Exception(f"음원 분리 실패: {str(e)}")
-
-
-def cleanup_separation_files(task_id: str):
-    """
-    분리 작업 임시 파일 정리
-
-    Args:
-        task_id: 작업 ID
-    """
-    output_dir = os.path.join(TEMP_DIR, task_id)
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-        logger.info(f"Cleaned up separation files for task: {task_id}")
+    finally:
+        remove_intermediate(scaled_path)
@@ -0,0 +1,330 @@
+"""
+스펙트럼 프런트엔드 서비스 (드럼 대역별 에너지 추출)
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import librosa
+from scipy.ndimage import median_filter
+
+from services.onset_service import OnsetParams, band_flux, normalize_flux
+from services.analysis_profiles import AnalysisProfile, ANALYSIS_PROFILES
+
+N_FFT = 2048
+HOP_LENGTH = 512
+
+
+@dataclass(frozen=True)
+class DrumBand:
+    """드럼 악기별 주파수 대역 및 온셋 검출 파라미터 정의"""
+    name: str
+    low: float
+    high: float
+    midi: int
+    onset: OnsetParams = OnsetParams()
+
+
+KICK = DrumBand("Kick", 20, 150, 36, OnsetParams(min_interval=0.08))
+SNARE = DrumBand("Snare", 200, 2500, 38, OnsetParams(min_interval=0.06))
+HIHAT = DrumBand("Hi-hat", 5000, 20000, 42, OnsetParams(min_interval=0.04, min_notes=50))
+TOM = DrumBand("Tom", 80, 300, 45, OnsetParams(min_interval=0.06))
+RIDE = DrumBand("Ride", 2500, 5000, 51, OnsetParams(min_interval=0.05))
+CRASH = DrumBand("Crash", 3000, 12000, 49, OnsetParams(min_interval=0.25, min_notes=0))
+
+# 기본 대역 (킥/스네어/하이햇)
+DEFAULT_BANDS: Tuple[DrumBand, ...] = (KICK, SNARE, HIHAT)
+# 탐/라이드/크래시까지 포함한 확장 대역
+EXTENDED_BANDS: Tuple[DrumBand, ...] = DEFAULT_BANDS + (TOM, RIDE, CRASH)
+
+# floor 근사: 조화 성분 바닥값을 구하는 시간 방향 중간값 창 (초)과 계산 시 프레임 솎음 간격
+HARMONIC_FLOOR_SECONDS = 0.4
+HARMONIC_FLOOR_STRIDE = 4
+
+
+@lru_cache(maxsize=32)
+def band_weight_table(
+    sr: int,
+    n_fft: int,
+    bands: Tuple[DrumBand, ...]
+) -> np.ndarray:
+    """
+    (sr, n_fft, bands) 조합별 주파수 bin 가중치 테이블 생성 (캐시됨)
+
+    각 행은 해당 대역에 속하는 bin에 1/bin 수를 가지므로,
+    크기 스펙트로그램과 곱하면 대역 평균 에너지가 된다.
+
+    Args:
+        sr: 샘플링 레이트
+        n_fft: FFT 크기
+        bands: 드럼 대역 목록
+
+    Returns:
+        (대역 수, bin 수) 크기의 읽기 전용 가중치 행렬
+    """
+    fft_freqs = librosa.fft_frequencies(sr=sr, n_fft=n_fft)
+    table = np.zeros((len(bands), len(fft_freqs)), dtype=np.float32)
+
+    for i, band in enumerate(bands):
+        bins = np.where((fft_freqs >= band.low) & (fft_freqs <= band.high))[0]
+        if len(bins) > 0:
+            table[i, bins] = 1.0 / len(bins)
+
+    table.setflags(write=False)
+    return table
+
+
+def magnitude_spectrogram(
+    y: np.ndarray,
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH
+) -> np.ndarray:
+    """
+    크기 스펙트로그램 계산 (모든 대역이 공유)
+
+    Args:
+        y: 모노 오디오 신호
+        n_fft: FFT 크기
+        hop_length: 프레임 간격 (샘플)
+
+    Returns:
+        (bin 수, 프레임 수) 크기 스펙트로그램
+    """
+    return np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length))
+
+
+def reduce_bands(
+    S: np.ndarray,
+    sr: int,
+    bands: Tuple[DrumBand, ...] = DEFAULT_BANDS,
+    n_fft: int = N_FFT
+) -> np.ndarray:
+    """
+    크기 스펙트로그램을 대역별 에너지 곡선으로 한 번에 축약
+
+    Args:
+        S: 크기 스펙트로그램
+        sr: 샘플링 레이트
+        bands: 드럼 대역 목록
+        n_fft: S 계산에 사용한 FFT 크기
+
+    Returns:
+        (대역 수, 프레임 수) 크기의 정규화된 에너지 곡선
+    """
+    table = band_weight_table(sr, n_fft, tuple(bands))
+    envelopes = table @ S.astype(np.float32, copy=False)
+    return librosa.util.normalize(envelopes, axis=1)
+
+
+def onset_envelope(S: np.ndarray, sr: int, n_fft: int = N_FFT, n_mels: int = 128) -> np.ndarray:
+    """
+    크기 스펙트로그램에서 전체 온셋 강도 곡선 계산 (템포/박 추적용, 대역 곡선과 같은 프레임 격자)
+
+    librosa.onset.onset_strength와 같은 멜 스펙트럴 플럭스이지만 STFT를 다시 계산하지 않는다.
+    """
+    mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_fft=n_fft, n_mels=n_mels)
+    return librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=sr).astype(np.float32, copy=False)
+
+
+def compute_band_envelopes(
+    y: np.ndarray,
+    sr: int,
+    bands: Tuple[DrumBand, ...] = DEFAULT_BANDS,
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    STFT를 한 번만 계산하여 모든 드럼 대역의 에너지 곡선과 온셋 강도(스펙트럴 플럭스),
+    템포/박 추적용 전체 온셋 강도 곡선 추출
+
+    Args:
+        y: 모노 오디오 신호
+        sr: 샘플링 레이트
+        bands: 드럼 대역 목록
+        n_fft: FFT 크기
+        hop_length: 프레임 간격 (샘플)
+
+    Returns:
+        (정규화된 대역별 에너지 곡선, 정규화된 대역별 온셋 강도, 전체 온셋 강도 곡선),
+        앞의 둘은 (대역 수, 프레임 수)
+    """
+    S = magnitude_spectrogram(y, n_fft=n_fft, hop_length=hop_length)
+    flux = band_flux(S, band_weight_table(sr, n_fft, tuple(bands)))
+    return reduce_bands(S, sr, bands, n_fft=n_fft), normalize_flux(flux), onset_envelope(S, sr, n_fft)
+
+
+def harmonic_floor(S: np.ndarray, sr: int, hop_length: int) -> np.ndarray:
+    """
+    조화 성분을 뺀 크기 스펙트로그램 (HPSS 근사)
+
+    HPSS의 조화 성분 추정(시간 방향 중간값)만 HARMONIC_FLOOR_STRIDE 프레임마다 솎아 계산하고,
+    그 바닥값을 빼서 지속음을 제거한다. 주파수 방향 중간값과 역STFT/재STFT가 없으므로
+    시간 영역 HPSS보다 훨씬 가볍다.
+    """
+    stride = HARMONIC_FLOOR_STRIDE
+    size = max(3, int(round(HARMONIC_FLOOR_SECONDS * sr / hop_length / stride)) | 1)
+    floor = median_filter(S[:, ::stride], size=(1, size), mode="nearest")
+    floor = np.repeat(floor, stride, axis=1)[:, :S.shape[1]]
+    return np.maximum(S - floor, 0.0)
+
+
+def analyze_bands(
+    y: np.ndarray,
+    sr: int,
+    bands: Tuple[DrumBand, ...] = DEFAULT_BANDS,
+    profile: AnalysisProfile = ANALYSIS_PROFILES["full"],
+    progress: Optional[Callable[[float, Optional[str]], None]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    분석 프로필에 따라 타악기 성분 분리 후 대역별 에너지 곡선/온셋 강도/전체 온셋 강도 계산
+
+    decimation > 1이면 상한이 (sr/decimation)/2의 80% 이하인 대역은 저역 신호에서,
+    나머지 대역은 원 신호의 STFT에서 계산한다. 두 STFT의 프레임 간격은
+    HOP_LENGTH / sr 초로 같으므로 결과는 compute_band_envelopes와 같은 프레임 격자이다.
+
+    Args:
+        y: 모노 오디오 신호 (정규화된 원 신호)
+        sr: 샘플링 레이트
+        bands: 드럼 대역 목록
+        profile: 분석 프로필
+        progress: 단계별 진행률 콜백 (0~1 비율, 설명)
+
+    Returns:
+        (정규화된 대역별 에너지 곡선, 정규화된 대역별 온셋 강도, 전체 온셋 강도 곡선)
+    """
+    bands = tuple(bands)
+
+    def report(fraction, detail):
+        if progress is not None:
+            progress(fraction, detail)
+
+    if profile.hpss == "full":
+        report(0.1, "타악기 성분 분리")
+        _, y = librosa.effects.hpss(y)
+    report(0.75, "대역별 에너지 계산")
+
+    if profile.decimation == 1:
+        S = magnitude_spectrogram(y)
+        if profile.hpss == "floor":
+            S = harmonic_floor(S, sr, HOP_LENGTH)
+        flux = band_flux(S, band_weight_table(sr, N_FFT, bands))
+        return reduce_bands(S, sr, bands), normalize_flux(flux), onset_envelope(S, sr)
+
+    low_sr = sr // profile.decimation
+    low_n_fft = N_FFT // profile.decimation
+    low_hop = HOP_LENGTH // profile.decimation
+    n_frames = 1 + len(y) // HOP_LENGTH
+
+    is_low = [band.high <= 0.4 * low_sr for band in bands]
+    low_bands = tuple(band for band, low in zip(bands, is_low) if low)
+    high_bands = tuple(band for band, low in zip(bands, is_low) if not low)
+
+    # 저역: 리샘플링 후 작은 STFT (사인파 크기가 원 해상도와 같도록 decimation 배)
+    y_low = librosa.resample(y, orig_sr=sr, target_sr=low_sr, res_type="soxr_hq")
+    S_low = profile.decimation * magnitude_spectrogram(y_low, n_fft=low_n_fft, hop_length=low_hop)
+    S_low = librosa.util.fix_length(S_low, size=n_frames, axis=1)
+    if profile.hpss == "floor":
+        S_low = harmonic_floor(S_low, low_sr, low_hop)
+
+    envelopes = np.empty((len(bands), n_frames), dtype=np.float32)
+    flux = np.empty((len(bands), n_frames), dtype=np.float32)
+    low_rows = np.flatnonzero(is_low)
+    high_rows = np.flatnonzero(~np.asarray(is_low))
+    if len(low_rows):
+        envelopes[low_rows] = band_weight_table(low_sr, low_n_fft, low_bands) @ S_low.astype(np.float32, copy=False)
+        flux[low_rows] = band_flux(S_low, band_weight_table(low_sr, low_n_fft, low_bands))
+    if len(high_rows):
+        S_high = magnitude_spectrogram(y)
+        envelopes[high_rows] = band_weight_table(sr, N_FFT, high_bands) @ S_high.astype(np.float32, copy=False)
+        flux[high_rows] = band_flux(S_high, band_weight_table(sr, N_FFT, high_bands))
+
+    onset_env = onset_envelope(S_low, low_sr, low_n_fft, n_mels=64)
+    return librosa.util.normalize(envelopes, axis=1), normalize_flux(flux), onset_env
+
+
+def stream_band_envelopes(
+    audio_path: str,
+    sr: int = 44100,
+    bands: Tuple[DrumBand, ...] = DEFAULT_BANDS,
+    block_seconds: float = 30.0,
+    hpss: str = "full",
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    오디오 파일을 겹치는 블록 단위로 읽어 대역별 에너지 곡선/온셋 강도를 점진적으로 계산
+
+    각 블록은 앞뒤로 문맥(HPSS 중간값 필터와 STFT 창을 덮는 길이)을 붙여 처리하고,
+    문맥을 제외한 중심 프레임만 이어 붙이므로 블록 경계에서도 전체 신호를 한 번에
+    처리한 것과 같은 프레임 격자가 유지된다. 최대 메모리는 곡 길이가 아니라
+    블록 길이에 비례한다 (누적되는 곡선은 hop_length 배 만큼 작다).
+
+    Args:
+        audio_path: 오디오 파일 경로
+        sr: 분석 샘플링 레이트
+        bands: 드럼 대역 목록
+        block_seconds: 블록 길이 (초)
+        hpss: 블록별 타악기 성분 분리 방식 (AnalysisProfile.hpss와 같은 값, 해상도는 항상 원 해상도)
+        n_fft: FFT 크기
+        hop_length: 프레임 간격 (샘플)
+        progress: 블록마다 호출할 진행률 콜백 (처리한 블록 비율, 설명)
+
+    Returns:
+        (정규화된 대역별 에너지 곡선, 정규화된 대역별 온셋 강도, 전체 온셋 강도 곡선, 분석 샘플 수)
+    """
+    import soundfile as sf
+
+    bands = tuple(bands)
+    table = band_weight_table(sr, n_fft, bands)
+
+    block = max(1, int(block_seconds * sr) // hop_length) * hop_length
+    context = 32 * hop_length
+
+    band_chunks = []
+    flux_chunks = []
+    onset_chunks = []
+
+    with sf.SoundFile(audio_path) as f:
+        native_sr = f.samplerate
+        total = int(np.ceil(f.frames * sr / native_sr))
+        n_blocks = max(1, int(np.ceil(total / block)))
+
+        for index, start in enumerate(range(0, max(total, 1), block)):
+            lo = max(0, start - context)
+            hi = min(total, start + block + context)
+            is_last = start + block >= total
+
+            # 원본 샘플링 레이트 기준으로 읽은 뒤 모노 변환/리샘플링
+            f.seek(int(lo * native_sr / sr))
+            data = f.read(int(np.ceil((hi - lo) * native_sr / sr)), dtype="float32", always_2d=True)
+            y = data.mean(axis=1)
+            if native_sr != sr:
+                y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+            y = librosa.util.fix_length(y, size=hi - lo)
+
+            if hpss == "full":
+                _, y = librosa.effects.hpss(y)
+
+            S = magnitude_spectrogram(y, n_fft=n_fft, hop_length=hop_length)
+            if hpss == "floor":
+                S = harmonic_floor(S, sr, hop_length)
+            onset = onset_envelope(S, sr, n_fft)
+
+            first = (start - lo) // hop_length
+            last = S.shape[1] if is_last else first + block // hop_length
+
+            band_chunks.append(table @ S[:, first:last].astype(np.float32, copy=False))
+            # 플럭스는 앞 문맥 프레임과의 차분이므로 문맥을 포함해 계산한 뒤 잘라냄
+            flux_chunks.append(band_flux(S[:, max(0, first - 1):last], table)[:, 1 if first else 0:])
+            onset_chunks.append(onset[first:last])
+
+            if progress is not None:
+                progress((index + 1) / n_blocks, f"블록 {index + 1}/{n_blocks} 분석")
+            if is_last:
+                break
+
+    envelopes = librosa.util.normalize(np.concatenate(band_chunks, axis=1), axis=1)
+    flux = normalize_flux(np.concatenate(flux_chunks, axis=1))
+    return envelopes, flux, np.concatenate(onset_chunks), total
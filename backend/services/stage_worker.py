@@ -0,0 +1,210 @@
+"""
+분산 단계 워커 서비스
+
+작업 큐(job_queue)에서 담당 단계의 작업을 가져와 이 프로세스의 단계별 워커 풀에서 실행한다.
+단계마다 풀 워커 수(get_stage_config)만큼 가져가기 슬롯을 두므로, 한 워커 프로세스의
+단계별 동시 실행 수는 API 서버 단독 실행 때와 같다.
+
+실행 중에는 풀에서 보고된 단계 내부 진행률이 바뀔 때마다(최소 lease의 1/3 간격으로)
+하트비트와 함께 기록한다. API 서버는 작업 레코드를 조회해 구독자에게 전달한다.
+"""
+import time
+import signal
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+from services.job_queue import JobQueue, StageJob, resolve_function, JOB_POLL_INTERVAL, WORKER_TTL_SECONDS
+from services.metrics import measure_call
+from services.progress import ProgressReporter
+from services.separation_service import preload_separator
+from services.task_store import WORKER_ID
+from services.transcription_backends import get_backend, preload_transcriber
+from services.worker_pool import (
+    get_executor, get_progress_channel, get_stage_config, prefer_stage_pool, shutdown_pools, warm_pools,
+    DEFAULT_STAGE_POOLS, STAGE_SEPARATE, STAGE_TRANSCRIBE, WARM_POOLS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StageWorker:
+    """
+    단계 작업 큐 소비자
+
+    Args:
+        queue: 작업 큐
+        stages: 처리할 단계 목록 (기본: 전체)
+        worker_id: 워커 식별자 (기본: task_store.WORKER_ID)
+    """
+
+    def __init__(self, queue: JobQueue, stages: Optional[List[str]] = None, worker_id: str = WORKER_ID):
+        stages = list(stages or DEFAULT_STAGE_POOLS)
+        for stage in stages:
+            if stage not in DEFAULT_STAGE_POOLS:
+                raise ValueError(f"알 수 없는 단계입니다: {stage}")
+
+        self.queue = queue
+        self.stages = stages
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._slots: List[Tuple[str, str]] = []
+
+        # 풀에서 보고된 작업별 최신 진행률 (job_id → (fraction, detail))
+        self._progress: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._progress_lock = threading.Lock()
+
+    def preload(self):
+        """단계 모듈과 상주 모델(Demucs, 공유 트랜스크립션 백엔드)을 풀 워커에 미리 적재"""
+        transcriber = get_backend() if STAGE_TRANSCRIBE in self.stages else None
+        if transcriber is not None and transcriber.shared_model:
+            prefer_stage_pool(STAGE_TRANSCRIBE, "thread", transcriber.concurrency)
+        if WARM_POOLS:
+            warm_pools(self.stages)
+
+        if STAGE_SEPARATE in self.stages:
+            get_executor(STAGE_SEPARATE).submit(preload_separator)
+        if transcriber is not None and transcriber.shared_model:
+            get_executor(STAGE_TRANSCRIBE).submit(preload_transcriber, transcriber.name)
+
+    def _relay_progress(self):
+        """진행률 채널에서 작업별 최신 진행률만 보관 (하트비트 때 기록)"""
+        channel = get_progress_channel()
+        while True:
+            try:
+                item = channel.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            job_id, _, fraction, detail = item
+            with self._progress_lock:
+                self._progress[job_id] = (fraction, detail)
+
+    def _register(self):
+        """가져가기 슬롯 생존 신호를 주기적으로 기록"""
+        while True:
+            for owner, stage in self._slots:
+                try:
+                    self.queue.register_worker(owner, [stage])
+                except Exception as e:
+                    logger.warning(f"Worker registration failed: {str(e)}")
+            if self._stop.wait(WORKER_TTL_SECONDS / 3):
+                break
+
+    def _execute(self, job: StageJob, owner: str):
+        """작업 하나를 단계 풀에서 실행하며 하트비트/진행률 기록, 끝나면 결과/실패 기록"""
+        logger.info(f"[{job.task_id}] Running stage '{job.stage}' (attempt {job.attempts})")
+        try:
+            func = resolve_function(job.func)
+            kwargs = dict(job.kwargs)
+            if job.report_progress:
+                kwargs["progress"] = ProgressReporter(job.job_id, job.stage)
+            future = get_executor(job.stage).submit(measure_call, func, job.args, job.input_audio, kwargs)
+        except Exception as e:
+            self.queue.fail(job.job_id, owner, str(e))
+            return
+
+        leased = True
+        reported = None
+        renewed_at = time.monotonic()
+        while True:
+            try:
+                result, measured = future.result(timeout=JOB_POLL_INTERVAL)
+                break
+            except FutureTimeout:
+                if not leased:
+                    continue
+                with self._progress_lock:
+                    latest = self._progress.get(job.job_id)
+                # 진행률이 바뀌었거나 lease의 1/3이 지나면 기록 (하트비트가 lease도 연장)
+                if latest == reported and time.monotonic() - renewed_at < self.queue.lease_seconds / 3:
+                    continue
+                fraction, detail = latest or (None, None)
+                try:
+                    leased = self.queue.heartbeat(job.job_id, owner, fraction, detail)
+                except Exception as e:
+                    logger.warning(f"[{job.task_id}] Heartbeat failed: {str(e)}")
+                    continue
+                reported, renewed_at = latest, time.monotonic()
+                if not leased:
+                    # 다른 워커가 이어받았으므로 결과를 기록하지 않음 (실행 중인 함수는 중단할 수 없음)
+                    logger.warning(f"[{job.task_id}] Lost lease for job {job.job_id}")
+            except Exception as e:
+                logger.error(f"[{job.task_id}] Stage '{job.stage}' failed: {str(e)}")
+                if leased and self.queue.fail(job.job_id, owner, str(e)):
+                    logger.info(f"[{job.task_id}] Job {job.job_id} requeued for retry")
+                return
+            finally:
+                if future.done():
+                    with self._progress_lock:
+                        self._progress.pop(job.job_id, None)
+
+        if leased and self.queue.complete(job.job_id, owner, result, measured):
+            logger.info(f"[{job.task_id}] Stage '{job.stage}' done ({measured['wall_seconds']:.1f}s)")
+
+    def _consume(self, stage: str, owner: str):
+        """가져가기 슬롯: 대기열이 비어 있으면 JOB_POLL_INTERVAL마다 다시 확인"""
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(stage, owner)
+            except Exception as e:
+                logger.warning(f"Claim failed for stage '{stage}': {str(e)}")
+                job = None
+            if job is None:
+                self._stop.wait(JOB_POLL_INTERVAL)
+                continue
+            self._execute(job, owner)
+
+    def start(self):
+        """진행률 전달, 생존 신호, 단계별 가져가기 스레드 시작"""
+        self.preload()
+
+        for stage in self.stages:
+            _, workers = get_stage_config(stage)
+            for slot in range(workers):
+                self._slots.append((f"{self.worker_id}/{stage}-{slot}", stage))
+
+        threading.Thread(target=self._relay_progress, name="progress-relay", daemon=True).start()
+        self._spawn(self._register, "worker-register")
+        for owner, stage in self._slots:
+            self._spawn(self._consume, f"{stage}-consumer", stage, owner)
+
+        logger.info(f"Stage worker {self.worker_id} consuming {', '.join(self.stages)} ({len(self._slots)} slots)")
+
+    def _spawn(self, target, name: str, *args):
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, wait: bool = True):
+        """
+        새 작업 가져가기 중단 및 종료
+
+        Args:
+            wait: 실행 중인 작업이 끝날 때까지 대기 여부 (False면 lease 만료 후 다른 워커가 이어받음)
+        """
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        for owner, _ in self._slots:
+            try:
+                self.queue.unregister_worker(owner)
+            except Exception as e:
+                logger.warning(f"Worker unregistration failed: {str(e)}")
+        shutdown_pools(wait=wait)
+        get_progress_channel().put(None)
+
+    def run_forever(self):
+        """SIGTERM/SIGINT를 받을 때까지 실행 (실행 중인 작업을 마친 뒤 종료)"""
+        stopping = threading.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stopping.set())
+
+        self.start()
+        stopping.wait()
+        logger.info("Stopping stage worker, waiting for running jobs")
+        self.stop(wait=True)
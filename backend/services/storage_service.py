@@ -0,0 +1,184 @@
+"""
+작업 산출물 저장소 관리 서비스
+
+모든 작업 산출물을 하나의 루트 아래 작업별 디렉토리로 모으고
+(ARTIFACT_ROOT/tasks/<task_id>/<stage>/), 다음 단계에서 더 이상 필요 없는 중간 파일을 지우며,
+보관 기간(TTL)과 용량 상한(LRU)을 넘는 완료된 작업을 백그라운드에서 정리한다.
+"""
+import os
+import time
+import shutil
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 산출물 루트 (기본: backend/temp, 실행 위치와 무관)
+ARTIFACT_ROOT = os.path.abspath(os.getenv(
+    "ARTIFACT_ROOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "temp")
+))
+TASKS_DIR = os.path.join(ARTIFACT_ROOT, "tasks")
+
+# 작업 디렉토리 용량 상한 (기본 50GB, 캐시와 하드링크로 공유하는 파일은 제외)
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(50 * 1024 ** 3)))
+
+# 마지막 사용 후 보관 기간 (기본 7일)
+ARTIFACT_TTL_SECONDS = float(os.getenv("ARTIFACT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# 백그라운드 정리 주기 (초)
+GC_INTERVAL_SECONDS = float(os.getenv("GC_INTERVAL_SECONDS", "600"))
+
+
+def task_dir(task_id: str, stage: Optional[str] = None) -> str:
+    """
+    작업(또는 작업의 단계별) 산출물 디렉토리 (없으면 생성)
+
+    Args:
+        task_id: 작업 ID
+        stage: 단계 이름 (None이면 작업 루트)
+
+    Returns:
+        디렉토리 절대 경로
+    """
+    path = os.path.join(TASKS_DIR, task_id, stage) if stage else os.path.join(TASKS_DIR, task_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def tempo_map_path(events_path: str) -> str:
+    """이벤트 배열 옆에 저장되는 템포 맵 경로 (rhythm_service.TempoMap)"""
+    return os.path.join(os.path.dirname(events_path), "beats.npy")
+
+
+def touch_task(task_id: str):
+    """작업 산출물 사용 시각 갱신 (LRU/TTL 기준)"""
+    try:
+        os.utime(os.path.join(TASKS_DIR, task_id))
+    except OSError:
+        pass
+
+
+def remove_intermediate(path: Optional[str]):
+    """더 이상 필요 없는 중간 파일 삭제 (없으면 무시)"""
+    if path and os.path.exists(path):
+        os.remove(path)
+        logger.info(f"Removed intermediate file: {path}")
+
+
+def _reclaimable_bytes(path: str) -> int:
+    """
+    디렉토리를 지웠을 때 실제로 확보되는 바이트 수
+
+    캐시 객체와 하드링크로 공유하는 파일(링크 수 > 1)은 지워도 공간이 돌아오지 않으므로 제외한다.
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                stat = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if stat.st_nlink == 1:
+                total += stat.st_size
+    return total
+
+
+@dataclass
+class TaskArtifacts:
+    """작업 디렉토리 정보"""
+    task_id: str
+    path: str
+    last_used: float
+    size: int
+
+
+@dataclass
+class GCResult:
+    """정리 결과"""
+    removed: List[str]
+    freed_bytes: int
+    total_bytes: int
+
+
+class ArtifactStorage:
+    """
+    작업 산출물 디렉토리의 보관 기간/용량 관리
+
+    - TTL: 마지막 사용 후 ttl_seconds가 지난 완료 작업 삭제
+    - 용량: 남은 완료 작업의 합이 max_bytes를 넘으면 가장 오래 사용하지 않은 작업부터 삭제
+    - 진행 중인 작업(is_active가 True)은 삭제하지 않는다
+    """
+
+    def __init__(
+        self,
+        root: str = TASKS_DIR,
+        max_bytes: int = ARTIFACT_MAX_BYTES,
+        ttl_seconds: float = ARTIFACT_TTL_SECONDS
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total_bytes = 0
+        os.makedirs(root, exist_ok=True)
+
+    def scan(self) -> Iterable[TaskArtifacts]:
+        """작업 디렉토리 목록 (사용 시각 = 디렉토리 mtime)"""
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    last_used = entry.stat().st_mtime
+                except OSError:
+                    continue
+                yield TaskArtifacts(entry.name, entry.path, last_used, _reclaimable_bytes(entry.path))
+
+    def remove(self, task_id: str):
+        """작업 디렉토리 전체 삭제"""
+        shutil.rmtree(os.path.join(self.root, task_id), ignore_errors=True)
+
+    def collect_garbage(
+        self,
+        is_active: Callable[[str], bool],
+        now: Optional[float] = None
+    ) -> GCResult:
+        """
+        만료/초과 작업 디렉토리 정리 (블로킹, 스레드에서 실행)
+
+        Args:
+            is_active: 작업이 진행 중인지 확인하는 함수 (진행 중이면 삭제하지 않음)
+            now: 기준 시각 (기본값 현재 시각)
+
+        Returns:
+            GCResult
+        """
+        now = time.time() if now is None else now
+        removed, freed = [], 0
+        kept: List[TaskArtifacts] = []
+        active_bytes = 0
+
+        for item in self.scan():
+            if is_active(item.task_id):
+                active_bytes += item.size
+            elif now - item.last_used > self.ttl_seconds:
+                self.remove(item.task_id)
+                removed.append(item.task_id)
+                freed += item.size
+            else:
+                kept.append(item)
+
+        total = active_bytes + sum(item.size for item in kept)
+        for item in sorted(kept, key=lambda i: i.last_used):
+            if total <= self.max_bytes:
+                break
+            self.remove(item.task_id)
+            removed.append(item.task_id)
+            freed += item.size
+            total -= item.size
+
+        self.total_bytes = total
+        if removed:
+            logger.info(f"Artifact GC removed {len(removed)} task dirs ({freed} bytes), {total} bytes in use")
+        return GCResult(removed, freed, total)
@@ -0,0 +1,211 @@
+"""
+작업 상태 저장소 서비스
+
+여러 uvicorn 워커/프로세스가 같은 작업 상태를 공유하고,
+서버 재시작 후에도 마지막으로 완료된 단계부터 작업을 재개할 수 있도록 한다.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from models.task import Task
+from services.storage_service import ARTIFACT_ROOT
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv("TASK_DB_PATH", os.path.join(ARTIFACT_ROOT, "tasks.db"))
+
+# 작업 소유권(lease) 유지 시간 (초)
+LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "60"))
+
+# 현재 프로세스의 소유자 ID
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class TaskStore(ABC):
+    """작업 저장소 인터페이스"""
+
+    @abstractmethod
+    def create(self, task: Task, owner: Optional[str] = None):
+        """새 작업 저장 (owner를 지정하면 바로 소유권 획득)"""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Task]:
+        """작업 조회 (없으면 None)"""
+
+    @abstractmethod
+    def save(self, task: Task):
+        """작업 상태 저장 (단계 완료 시 체크포인트로 사용)"""
+
+    @abstractmethod
+    def claim(self, task_id: str, owner: str) -> bool:
+        """소유자가 없거나 lease가 만료된 미완료 작업의 소유권 획득"""
+
+    @abstractmethod
+    def renew(self, owner: str):
+        """owner가 소유한 모든 작업의 lease 연장"""
+
+    @abstractmethod
+    def release(self, task_id: str, owner: str):
+        """작업 소유권 반환"""
+
+    @abstractmethod
+    def list_resumable(self) -> List[Task]:
+        """재개 가능한 (미완료이고 lease가 만료된) 작업 목록"""
+
+
+class InMemoryTaskStore(TaskStore):
+    """단일 프로세스용 메모리 저장소 (개발/테스트용)"""
+
+    def __init__(self):
+        self._tasks: Dict[str, Task] = {}
+        self._owners: Dict[str, str] = {}
+
+    def create(self, task: Task, owner: Optional[str] = None):
+        self._tasks[task.task_id] = task
+        if owner:
+            self._owners[task.task_id] = owner
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def save(self, task: Task):
+        self._tasks[task.task_id] = task
+
+    def claim(self, task_id: str, owner: str) -> bool:
+        task = self._tasks.get(task_id)
+        if task is None or task.is_finished or task_id in self._owners:
+            return False
+        self._owners[task_id] = owner
+        return True
+
+    def renew(self, owner: str):
+        pass
+
+    def release(self, task_id: str, owner: str):
+        if self._owners.get(task_id) == owner:
+            del self._owners[task_id]
+
+    def list_resumable(self) -> List[Task]:
+        return [
+            task for task_id, task in self._tasks.items()
+            if not task.is_finished and task_id not in self._owners
+        ]
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    SQLite(WAL 모드) 기반 저장소
+
+    WAL 모드와 busy_timeout으로 여러 프로세스가 동시에 읽고 쓸 수 있으며,
+    lease 기반 소유권으로 한 작업을 하나의 워커만 처리하도록 보장한다.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, lease_seconds: float = LEASE_SECONDS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    finished INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_unfinished ON tasks(finished, lease_until)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 반환 (최초 호출 시 WAL 모드로 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def create(self, task: Task, owner: Optional[str] = None):
+        now = time.time()
+        lease_until = now + self.lease_seconds if owner else 0
+        self._connect().execute(
+            "INSERT INTO tasks (task_id, data, finished, owner, lease_until, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (task.task_id, json.dumps(task.to_dict()), int(task.is_finished),
+             owner, lease_until, now)
+        )
+
+    def get(self, task_id: str) -> Optional[Task]:
+        row = self._connect().execute(
+            "SELECT data FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return Task.from_dict(json.loads(row[0])) if row else None
+
+    def save(self, task: Task):
+        self._connect().execute(
+            "INSERT INTO tasks (task_id, data, finished, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(task_id) DO UPDATE SET "
+            "data = excluded.data, finished = excluded.finished, updated_at = excluded.updated_at",
+            (task.task_id, json.dumps(task.to_dict()), int(task.is_finished), time.time())
+        )
+
+    def claim(self, task_id: str, owner: str) -> bool:
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE tasks SET owner = ?, lease_until = ? "
+            "WHERE task_id = ? AND finished = 0 AND (owner IS NULL OR lease_until < ?)",
+            (owner, now + self.lease_seconds, task_id, now)
+        )
+        return cursor.rowcount == 1
+
+    def renew(self, owner: str):
+        self._connect().execute(
+            "UPDATE tasks SET lease_until = ? WHERE owner = ? AND finished = 0",
+            (time.time() + self.lease_seconds, owner)
+        )
+
+    def release(self, task_id: str, owner: str):
+        self._connect().execute(
+            "UPDATE tasks SET owner = NULL, lease_until = 0 WHERE task_id = ? AND owner = ?",
+            (task_id, owner)
+        )
+
+    def list_resumable(self) -> List[Task]:
+        rows = self._connect().execute(
+            "SELECT data FROM tasks WHERE finished = 0 AND (owner IS NULL OR lease_until < ?) "
+            "ORDER BY updated_at",
+            (time.time(),)
+        ).fetchall()
+        return [Task.from_dict(json.loads(row[0])) for row in rows]
+
+
+def create_task_store() -> TaskStore:
+    """
+    환경 변수(TASK_STORE)에 따라 저장소 생성
+
+    Returns:
+        TaskStore 구현체 (sqlite 기본, memory 선택 가능)
+    """
+    kind = os.getenv("TASK_STORE", "sqlite")
+    if kind == "memory":
+        return InMemoryTaskStore()
+    if kind == "sqlite":
+        return SQLiteTaskStore()
+    raise ValueError(f"지원하지 않는 작업 저장소입니다: {kind}")
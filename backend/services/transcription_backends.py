@@ -0,0 +1,213 @@
+"""
+드럼 트랜스크립션 백엔드
+
+- spectral: 대역별 스펙트럴 플럭스 + 적응형 임계값 (transcription_service, 기본값)
+- basic-pitch: Spotify basic-pitch 신경망의 온셋/노트 확률을 드럼 대역별로 모아 온셋 강도로 사용
+
+basic-pitch 모델은 프로세스에 한 번만 로드되어 상주하며 (basic_pitch_engine), 전용 추론 스레드가
+대기 중인 여러 작업의 오디오 창을 모아 한 번의 배치 추론으로 처리한다.
+여러 작업이 같은 모델을 공유해야 하므로 이 백엔드는 transcribe 단계를 스레드 풀에서 실행한다.
+
+API 계층은 백엔드 선택과 캐시 키 계산에만 이 모듈을 쓰므로, 오디오/수치 라이브러리는
+트랜스크립션을 실제로 실행하는 워커에서 처음 호출할 때 가져온다.
+"""
+import os
+import logging
+import importlib.util
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence, Tuple
+
+from services.analysis_profiles import get_analysis_profile
+
+if TYPE_CHECKING:
+    from services.spectral_service import DrumBand
+
+logger = logging.getLogger(__name__)
+
+# 사용할 백엔드 (spectral 또는 basic-pitch)
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "spectral")
+
+# basic-pitch 설정 (배치 추론 설정은 basic_pitch_engine)
+# - CONCURRENCY: 동시에 추론을 기다릴 수 있는 작업 수 (transcribe 스레드 풀 크기)
+# - PRELOAD: 워커 시작 시 모델 미리 로드
+BASIC_PITCH_CONCURRENCY = int(os.getenv("BASIC_PITCH_CONCURRENCY", "4"))
+BASIC_PITCH_PRELOAD = os.getenv("BASIC_PITCH_PRELOAD", "0") == "1"
+
+
+class TranscriptionBackend:
+    """
+    트랜스크립션 백엔드 인터페이스
+
+    - name: 백엔드 이름 (캐시 키와 메타데이터에 기록)
+    - shared_model: 모델을 프로세스에 상주시키고 여러 작업이 공유하는지 여부
+      (True이면 transcribe 단계를 스레드 풀에서 실행해야 작업 간 배치가 가능)
+    - concurrency: shared_model일 때 transcribe 단계 동시 실행 수
+    """
+    name = ""
+    shared_model = False
+    concurrency = 1
+
+    def available(self) -> bool:
+        """필요한 패키지가 설치되어 있는지 여부"""
+        return True
+
+    def preload(self):
+        """워커 시작 시 모델을 미리 로드 (필요한 백엔드만)"""
+
+    def transcribe(
+        self,
+        audio_path: str,
+        output_dir: str,
+        bands: Optional[Sequence["DrumBand"]] = None,
+        grid: int = 4,
+        progress: Optional[Callable[[float, Optional[str]], None]] = None,
+        profile: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str], Optional[dict]]:
+        """
+        드럼 트랙을 MIDI/이벤트 배열로 변환
+
+        bands는 드럼 대역 목록 (None이면 spectral_service.DEFAULT_BANDS),
+        profile은 스펙트럼 분석 프로필 이름 (analysis_profiles.ANALYSIS_PROFILES, 모델 기반 백엔드는 무시)
+
+        Returns:
+            (MIDI 파일 경로, 이벤트 파일 경로, 메타데이터), 실패 시 (None, None, None)
+        """
+        raise NotImplementedError
+
+
+class SpectralBackend(TranscriptionBackend):
+    """대역별 스펙트럴 플럭스 기반 트랜스크립션 (추가 모델 없음)"""
+    name = "spectral"
+
+    def transcribe(self, audio_path, output_dir, bands=None, grid=4, progress=None, profile=None):
+        from services.spectral_service import DEFAULT_BANDS
+        from services.transcription_service import transcribe_drums
+
+        return transcribe_drums(
+            audio_path, output_dir, bands=bands or DEFAULT_BANDS, grid=grid, progress=progress, profile=profile
+        )
+
+
+class BasicPitchBackend(TranscriptionBackend):
+    """
+    basic-pitch 온셋 확률 기반 트랜스크립션
+
+    대역별 온셋 강도 = 대역 주파수 범위에 해당하는 키들의 온셋 확률 최댓값,
+    타격 세기 = 같은 키들의 노트 확률 최댓값. 이후 온셋 검출/퀀타이즈는 spectral과 같다.
+    하이햇처럼 basic-pitch 음역 위의 대역은 최상위 옥타브의 확률을 사용한다.
+    """
+    name = "basic-pitch"
+    shared_model = True
+    concurrency = BASIC_PITCH_CONCURRENCY
+
+    def available(self) -> bool:
+        return (
+            importlib.util.find_spec("basic_pitch") is not None
+            and importlib.util.find_spec("tensorflow") is not None
+        )
+
+    def preload(self):
+        if BASIC_PITCH_PRELOAD:
+            from services.basic_pitch_engine import get_basic_pitch_engine
+            get_basic_pitch_engine().load()
+
+    def transcribe(self, audio_path, output_dir, bands=None, grid=4, progress=None, profile=None):
+        import librosa
+        from services.basic_pitch_engine import BP_FRAME_HOP, BP_SAMPLE_RATE, band_keys, get_basic_pitch_engine
+        from services.spectral_service import DEFAULT_BANDS
+        from services.transcription_service import OnsetFeatures, write_transcription
+
+        bands = bands or DEFAULT_BANDS
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        def report(fraction, detail):
+            if progress is not None:
+                progress(fraction, detail)
+
+        try:
+            y, _ = librosa.load(audio_path, sr=BP_SAMPLE_RATE, mono=True)
+            report(0.1, "신경망 추론 대기")
+            posteriors = get_basic_pitch_engine().infer(librosa.util.normalize(y))
+            report(0.8, "노트 검출")
+
+            onsets, notes = posteriors["onset"], posteriors["note"]
+            features = OnsetFeatures(
+                strengths=[onsets[:, band_keys(band)].max(axis=1) for band in bands],
+                envelopes=[notes[:, band_keys(band)].max(axis=1) for band in bands],
+                onset_env=onsets.sum(axis=1),
+                sr=BP_SAMPLE_RATE,
+                hop_length=BP_FRAME_HOP,
+                n_samples=len(y)
+            )
+            result = write_transcription(
+                features, output_dir, bands, grid, backend=self.name, progress=progress
+            )
+            logger.info(f"basic-pitch transcription complete: {result[0]}")
+            return result
+        except Exception as e:
+            logger.error(f"basic-pitch transcription failed for {audio_path}: {str(e)}")
+            return None, None, None
+
+
+TRANSCRIPTION_BACKENDS: Dict[str, type] = {
+    SpectralBackend.name: SpectralBackend,
+    BasicPitchBackend.name: BasicPitchBackend,
+}
+
+_backends: Dict[str, TranscriptionBackend] = {}
+
+
+def get_backend(name: Optional[str] = None) -> TranscriptionBackend:
+    """
+    이름으로 트랜스크립션 백엔드 조회 (프로세스당 하나)
+
+    요청한 백엔드의 패키지가 설치되어 있지 않으면 spectral로 대체한다.
+
+    Args:
+        name: 백엔드 이름 (None이면 TRANSCRIPTION_BACKEND)
+
+    Returns:
+        TranscriptionBackend
+    """
+    name = name or TRANSCRIPTION_BACKEND
+    if name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"알 수 없는 트랜스크립션 백엔드입니다: {name}")
+
+    backend = _backends.get(name)
+    if backend is None:
+        backend = TRANSCRIPTION_BACKENDS[name]()
+        if not backend.available():
+            logger.warning(f"Transcription backend '{name}' is not installed, using 'spectral'")
+            backend = get_backend(SpectralBackend.name)
+        _backends[name] = backend
+    return backend
+
+
+def transcription_params(name: Optional[str] = None, profile: Optional[str] = None) -> dict:
+    """트랜스크립션 결과에 영향을 주는 파라미터 (캐시 키용, spectral/full은 기존 키 유지)"""
+    backend = get_backend(name)
+    if backend.name != SpectralBackend.name:
+        return {"backend": backend.name}
+    profile = get_analysis_profile(profile).name
+    return {} if profile == "full" else {"analysis": profile}
+
+
+def run_transcription(
+    audio_path: str,
+    output_dir: str,
+    backend: Optional[str] = None,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+    profile: Optional[str] = None
+):
+    """
+    선택된 백엔드로 트랜스크립션 실행 (워커 풀에서 호출, pickle 가능)
+
+    Returns:
+        (MIDI 파일 경로, 이벤트 파일 경로, 메타데이터), 실패 시 (None, None, None)
+    """
+    return get_backend(backend).transcribe(audio_path, output_dir, progress=progress, profile=profile)
+
+
+def preload_transcriber(backend: Optional[str] = None):
+    """워커 시작 시 상주 모델 미리 로드 (상주 모델이 없는 백엔드는 아무것도 하지 않음)"""
+    get_backend(backend).preload()
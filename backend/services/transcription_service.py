@@ -2,124 +2,185 @@ import os
 import numpy as np
 import librosa
 import warnings
-from music21 import stream, note, instrument, clef, meter
-from scipy.signal import find_peaks
+from dataclasses import dataclass
+from typing import Sequence
+
+from services.conversion_service import write_drum_midi
+from services.drum_events import make_hits, merge_hits, quantize_hits
+from services.onset_service import peak_strengths, pick_onsets
+from services.analysis_profiles import get_analysis_profile
+from services.rhythm_service import analyze_rhythm
+from services.spectral_service import (
+    DEFAULT_BANDS, HOP_LENGTH, analyze_bands, stream_band_envelopes
+)
+from services.storage_service import tempo_map_path
 
 warnings.filterwarnings("ignore")
 
-async def transcribe_drums(audio_path, output_dir):
+SAMPLE_RATE = 44100
+
+# 같은 악기의 중복 타격으로 간주할 간격 (초)
+MERGE_WINDOW = 0.05
+
+# 이 길이(초) 이상의 오디오는 블록 단위 스트리밍 모드로 분석
+STREAMING_MIN_SECONDS = float(os.getenv("STREAMING_MIN_SECONDS", "600"))
+STREAMING_BLOCK_SECONDS = float(os.getenv("STREAMING_BLOCK_SECONDS", "30"))
+
+
+@dataclass
+class OnsetFeatures:
+    """
+    트랜스크립션 백엔드가 계산한 대역별 온셋 특징
+
+    - strengths: 대역별 온셋 강도 (피크 검출 대상)
+    - envelopes: 대역별 타격 세기 곡선 (strengths와 같은 프레임 격자)
+    - onset_env: 템포/박 추적용 전체 온셋 강도 (같은 프레임 격자)
+    - sr: 특징을 계산한 샘플링 레이트
+    - hop_length: 프레임 간격 (샘플)
+    - n_samples: 오디오 길이 (샘플)
+    """
+    strengths: Sequence[np.ndarray]
+    envelopes: Sequence[np.ndarray]
+    onset_env: np.ndarray
+    sr: int
+    hop_length: float
+    n_samples: int
+
+
+def write_transcription(features, output_dir, bands=DEFAULT_BANDS, grid=4, backend="spectral", progress=None):
+    """
+    대역별 온셋 특징에서 노트를 검출하여 이벤트 배열과 MIDI로 기록합니다.
+    온셋 검출, 박 추적, 중복 제거, 퀀타이즈, MIDI 기록은 백엔드와 무관하게 같은 방식입니다.
+    템포 맵은 이벤트 배열 옆에 beats.npy로 저장되어 MusicXML 렌더링에서도 사용됩니다.
+
+    Returns:
+        (MIDI 파일 경로, 이벤트 파일 경로,
+         메타데이터 {bpm, bpm_range, lead_in, duration, notes, grid, thresholds, backend})
+    """
+    output_midi_path = os.path.join(output_dir, "transcription.mid")
+    output_events_path = os.path.join(output_dir, "events.npy")
+    sr = features.sr
+
+    # 3. 적응형 온셋 검출 (악기별 파라미터, 간격은 프레임 단위)
+    band_times = []
+    band_strengths = []
+    thresholds = {}
+    for band, env, strength in zip(bands, features.envelopes, features.strengths):
+        peaks, thresholds[band.name] = pick_onsets(strength, band.onset, sr, features.hop_length)
+        if len(peaks) < band.onset.min_notes:
+            print(f"  - {band.name}: Found {len(peaks)} notes (Warning: Low count)")
+        else:
+            print(f"  - {band.name}: Found {len(peaks)} notes (Threshold: {thresholds[band.name]})")
+        band_times.append(librosa.frames_to_time(peaks, sr=sr, hop_length=features.hop_length))
+        band_strengths.append(peak_strengths(env, peaks))
+
+    # 4. 박 추적 (국소 템포 + 킥/스네어 강세로 마디 첫 박 결정)
+    midis = [band.midi for band in bands]
+    accent = None
+    if 36 in midis and 38 in midis:
+        accent = features.strengths[midis.index(36)] - features.strengths[midis.index(38)]
+    tempo_map = analyze_rhythm(
+        features.onset_env, sr, features.hop_length, features.n_samples / sr, accent=accent
+    )
+    tempo_map.save(tempo_map_path(output_events_path))
+
+    bpm = int(round(tempo_map.bpm))
+    bar_bpms = [tempo for _, tempo in tempo_map.bar_tempos()]
+    print(f"  - BPM: {bpm} ({min(bar_bpms):.0f}-{max(bar_bpms):.0f}, {len(tempo_map.times)} beats)")
+
+    # 5. 노트 통합 및 박 격자 퀀타이즈 (악기별 50ms 이내 중복 제거)
+    hits = merge_hits(make_hits(band_times, band_strengths), window=MERGE_WINDOW)
+    events = quantize_hits(hits, midis, tempo_map, subdivisions=grid)
+    np.save(output_events_path, events)
+
+    # 6. MIDI 직접 기록 (music21 미사용, 마디별 템포 변경 포함)
+    if progress is not None:
+        progress(0.95, "MIDI 기록")
+    write_drum_midi(events, bpm, output_midi_path, grid=grid, tempo_map=tempo_map)
+
+    duration_sec = int(features.n_samples / sr)
+    metadata = {
+        'bpm': bpm,
+        'bpm_range': [round(min(bar_bpms), 1), round(max(bar_bpms), 1)],
+        'lead_in': round(tempo_map.lead_in, 3),
+        'duration': f"{duration_sec // 60}:{duration_sec % 60:02d}",
+        'notes': len(events),
+        'grid': grid,
+        'thresholds': thresholds,
+        'backend': backend,
+    }
+    return output_midi_path, output_events_path, metadata
+
+
+def transcribe_drums(audio_path, output_dir, bands=DEFAULT_BANDS, streaming=None, grid=4, progress=None, profile=None):
     """
     [Adaptive Sensitivity Version]
-    감지된 노트 수가 너무 적으면 자동으로 감도를 조절하여 재시도합니다.
+    대역별 스펙트럴 플럭스에서 적응형 임계값으로 온셋을 한 번에 검출하며,
+    감지된 노트 수가 악기별 min_notes보다 적으면 임계값을 낮춰 상위 후보를 채웁니다.
+    bands로 검출할 드럼 대역(탐, 라이드, 크래시 등)을 지정할 수 있습니다.
+    streaming이 None이면 STREAMING_MIN_SECONDS 이상의 긴 녹음만 블록 단위로 분석합니다.
+    grid는 4분음표당 퀀타이즈 격자 수입니다 (2의 거듭제곱, 4 = 16분음표).
+    퀀타이즈된 이벤트 배열은 output_dir/events.npy로 저장되어 MusicXML 렌더링에 그대로 사용됩니다.
+    progress(비율, 설명)가 주어지면 분석 블록/단계마다 진행률을 보고합니다.
+    profile은 분석 프로필 이름입니다 ("full" = 전체 HPSS/원 해상도, "fast" = HPSS 근사/저역 대역 1/4 샘플링,
+    None이면 DEFAULT_ANALYSIS_PROFILE). 스트리밍 모드는 프로필의 HPSS 방식만 따르고 원 해상도로 분석합니다.
+
+    Returns:
+        (MIDI 파일 경로, 이벤트 파일 경로,
+         메타데이터 {bpm, bpm_range, lead_in, duration, notes, grid, thresholds, backend, analysis}),
+        실패 시 (None, None, None)
     """
     os.makedirs(output_dir, exist_ok=True)
-    output_xml_path = os.path.join(output_dir, "transcription.musicxml")
-    output_midi_path = os.path.join(output_dir, "transcription.mid")
 
-    print(f"🥁 Transcribing (Adaptive): {audio_path}")
+    profile = get_analysis_profile(profile)
+    print(f"🥁 Transcribing (Adaptive, {profile.name}): {audio_path}")
+
+    # 전체 단계 중 에너지 곡선 계산이 차지하는 비율 (나머지는 피크 검출/기록)
+    analysis_share = 0.8
+
+    def report(fraction, detail):
+        if progress is not None:
+            progress(fraction, detail)
 
     try:
-        # 1. 오디오 로드
-        y, sr = librosa.load(audio_path, sr=44100)
-        
-        # 정규화 (가장 큰 소리를 1.0으로 맞춤)
-        y = librosa.util.normalize(y)
-        
-        # 타악기 성분 분리
-        _, y_percussive = librosa.effects.hpss(y)
-        
-        # 주파수 대역별 에너지 계산 함수
-        def get_band_energy(y_input, low, high):
-            S = np.abs(librosa.stft(y_input))
-            fft_freqs = librosa.fft_frequencies(sr=sr)
-            bins = np.where((fft_freqs >= low) & (fft_freqs <= high))[0]
-            if len(bins) == 0: return np.zeros(S.shape[1])
-            return librosa.util.normalize(np.mean(S[bins, :], axis=0))
-
-        # 2. 대역별 에너지 추출
-        env_kick = get_band_energy(y_percussive, 20, 150)
-        env_snare = get_band_energy(y_percussive, 200, 2500)
-        env_hh = get_band_energy(y_percussive, 5000, 20000)
-
-        # 3. 적응형 피크 검출 (Adaptive Peak Picking)
-        def adaptive_pick(env, name, min_notes=20):
-            # 처음에는 일반적인 기준(0.15)으로 시도
-            thresholds = [0.15, 0.10, 0.05, 0.02] # 점점 예민해짐
-            
-            for th in thresholds:
-                peaks, _ = find_peaks(env, height=th, distance=sr/16)
-                if len(peaks) >= min_notes:
-                    print(f"  - {name}: Found {len(peaks)} notes (Threshold: {th})")
-                    return peaks
-            
-            # 그래도 없으면 마지막 결과 반환
-            print(f"  - {name}: Found {len(peaks)} notes (Warning: Low count)")
-            return peaks
-
-        peaks_kick = adaptive_pick(env_kick, "Kick")
-        peaks_snare = adaptive_pick(env_snare, "Snare")
-        peaks_hh = adaptive_pick(env_hh, "Hi-hat", min_notes=50) # 하이햇은 더 많아야 함
-
-        times_kick = librosa.frames_to_time(peaks_kick, sr=sr)
-        times_snare = librosa.frames_to_time(peaks_snare, sr=sr)
-        times_hh = librosa.frames_to_time(peaks_hh, sr=sr)
-
-        # 4. 악보 생성
-        s = stream.Score()
-        p = stream.Part()
-        p.id = 'DrumPart'
-        p.insert(0, instrument.Percussion())
-        p.insert(0, clef.PercussionClef())
-        p.insert(0, meter.TimeSignature('4/4'))
-
-        # 5. BPM 추정 및 고정
-        try:
-            tempo = librosa.feature.rhythm.tempo(y=y_percussive, sr=sr)[0]
-        except:
-            tempo = librosa.beat.tempo(y=y_percussive, sr=sr)[0]
-            
-        bpm = int(round(tempo))
-        if bpm < 60 or bpm > 180: bpm = 120
-        print(f"  - BPM: {bpm}")
-        
-        quarter_note_duration = 60.0 / bpm
-
-        # 6. 노트 통합 및 퀀타이즈
-        all_notes = []
-        for t in times_kick: all_notes.append({'time': t, 'type': 'Kick', 'midi': 36})
-        for t in times_snare: all_notes.append({'time': t, 'type': 'Snare', 'midi': 38})
-        for t in times_hh: all_notes.append({'time': t, 'type': 'Hi-hat', 'midi': 42})
-        
-        all_notes.sort(key=lambda x: x['time'])
-
-        # 중복 제거 (너무 가까운 노트 삭제)
-        filtered_notes = []
-        last_time = -1
-        for note_data in all_notes:
-            if note_data['time'] - last_time > 0.05: # 50ms 이내 중복 무시
-                filtered_notes.append(note_data)
-                last_time = note_data['time']
-
-        for note_data in filtered_notes:
-            ql = note_data['time'] / quarter_note_duration
-            quantized_ql = round(ql * 4) / 4.0
-            
-            n = note.Note()
-            n.pitch.midi = note_data['midi']
-            n.quarterLength = 0.25
-            if note_data['type'] == 'Hi-hat': n.notehead = 'x'
-            
-            p.insert(quantized_ql, n)
-
-        p.makeMeasures(inPlace=True)
-        s.append(p)
-        
-        s.write('musicxml', fp=output_xml_path)
-        s.write('midi', fp=output_midi_path)
-
-        print(f"✅ Custom Drum Transcription 완료: {output_xml_path}")
-        return output_midi_path, output_xml_path
+        if streaming is None:
+            streaming = librosa.get_duration(path=audio_path) >= STREAMING_MIN_SECONDS
+
+        if streaming:
+            # 1-2. 블록 단위로 읽으며 HPSS/대역별 에너지/온셋 강도를 점진적으로 계산
+            print(f"  - Streaming mode ({STREAMING_BLOCK_SECONDS:.0f}s blocks)")
+            sr = SAMPLE_RATE
+            envelopes, flux, onset_env, n_samples = stream_band_envelopes(
+                audio_path, sr, tuple(bands), block_seconds=STREAMING_BLOCK_SECONDS, hpss=profile.hpss,
+                progress=lambda fraction, detail: report(analysis_share * fraction, detail)
+            )
+        else:
+            # 1. 오디오 로드
+            y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
+            n_samples = len(y)
+
+            # 정규화 (가장 큰 소리를 1.0으로 맞춤)
+            y = librosa.util.normalize(y)
+
+            # 2. 타악기 성분 분리 후 대역별 에너지/온셋 강도와 박 추적용 온셋 강도 추출 (프로필별 해상도)
+            envelopes, flux, onset_env = analyze_bands(
+                y, sr, tuple(bands), profile,
+                progress=lambda fraction, detail: report(analysis_share * fraction, detail)
+            )
+
+        report(analysis_share, "노트 검출")
+        features = OnsetFeatures(
+            strengths=flux, envelopes=envelopes, onset_env=onset_env,
+            sr=sr, hop_length=HOP_LENGTH, n_samples=n_samples
+        )
+        output_midi_path, output_events_path, metadata = write_transcription(
+            features, output_dir, bands, grid, progress=progress
+        )
+        metadata['analysis'] = profile.name
+
+        print(f"✅ Custom Drum Transcription 완료: {output_midi_path}")
+        return output_midi_path, output_events_path, metadata
 
     except Exception as e:
         print(f"❌ Custom Transcription 오류: {e}")
-        return None, None
\ No newline at end of file
+        return None, None, None
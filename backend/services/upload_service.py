@@ -0,0 +1,313 @@
+"""
+오디오 업로드 수신 서비스
+
+요청 본문(원시 오디오 바이트 또는 multipart/form-data의 파일 필드)을 청크 단위로
+디스크에 기록하면서 sha256을 함께 계산한다. 파일 전체를 메모리에 올리지 않으며,
+앞부분 시그니처로 포맷을 확인해 오디오가 아니면 본문을 끝까지 받기 전에 거절한다.
+디코딩은 YouTube 다운로드와 같이 decode_audio로 한 번만 하고, 이후 단계는 WAV만 읽는다.
+"""
+import os
+import uuid
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, List, Optional
+
+from services.audio_service import decode_audio
+from services.delivery_service import adopt_stream_copy
+from services.storage_service import task_dir, remove_intermediate
+
+logger = logging.getLogger(__name__)
+
+
+# 업로드 최대 크기 (바이트)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 ** 2)))
+
+# 모아서 한 번에 디스크에 기록(및 해시)하는 크기 (이벤트 루프 밖 스레드에서 처리)
+UPLOAD_WRITE_BYTES = 1024 * 1024
+
+# 포맷/코덱 판별에 쓰는 앞부분 크기
+SNIFF_BYTES = 64 * 1024
+
+# 컨테이너 판별에 필요한 최소 바이트 수
+_SIGNATURE_BYTES = 12
+
+
+class UploadRejected(Exception):
+    """업로드 거절 (status_code: 응답할 HTTP 상태 코드)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class UploadedAudio:
+    """수신 완료된 업로드"""
+    path: str
+    sha256: str
+    size: int
+    extension: str
+    # 원본 코덱 (yt-dlp acodec 표기, 알 수 없으면 None → 재생용 사본은 재인코딩)
+    codec: Optional[str] = None
+
+
+def sniff_container(head: bytes) -> Optional[str]:
+    """
+    파일 앞부분 시그니처로 오디오 컨테이너 판별
+
+    Args:
+        head: 파일 앞부분 (최소 _SIGNATURE_BYTES)
+
+    Returns:
+        확장자 (예: ".flac"), 지원하지 않는 포맷이면 None
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return ".wav"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return ".aiff"
+    if head[:4] == b"fLaC":
+        return ".flac"
+    if head[:4] == b"OggS":
+        return ".ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return ".webm"
+    if head[4:8] == b"ftyp":
+        return ".m4a"
+    if head[:3] == b"ID3":
+        return ".mp3"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # MPEG 프레임 동기 (layer 비트가 00이면 ADTS AAC)
+        return ".aac" if head[1] & 0x06 == 0 else ".mp3"
+    return None
+
+
+def sniff_codec(extension: str, head: bytes) -> Optional[str]:
+    """컨테이너 앞부분에서 재생용 사본으로 옮겨 담을 수 있는 코덱 확인 (delivery_service 참고)"""
+    if extension in (".ogg", ".webm") and (b"OpusHead" in head or b"A_OPUS" in head):
+        return "opus"
+    if extension == ".aac" or (extension == ".m4a" and b"mp4a" in head):
+        return "mp4a"
+    return None
+
+
+class UploadReceiver:
+    """
+    업로드 청크를 받아 임시 파일에 기록하고 sha256/크기/포맷 계산
+
+    feed는 이벤트 루프에서 호출되어 버퍼에 쌓기만 하고,
+    해시 계산과 파일 기록은 flush/finish(스레드에서 호출)가 담당한다.
+
+    Args:
+        dest_dir: 저장할 디렉토리
+        max_bytes: 최대 크기 (넘으면 413)
+    """
+
+    def __init__(self, dest_dir: str, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.dest_dir = dest_dir
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.extension: Optional[str] = None
+        self.pending_bytes = 0
+        self._pending: List[bytes] = []
+        self._head = bytearray()
+        self._digest = hashlib.sha256()
+        self._tmp_path = os.path.join(dest_dir, f"upload.{uuid.uuid4().hex[:8]}.part")
+        self._file = None
+
+    def feed(self, data: bytes):
+        """청크 추가 (크기 초과나 오디오가 아닌 시그니처면 UploadRejected)"""
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadRejected(
+                f"파일이 너무 큽니다 (최대 {self.max_bytes // (1024 ** 2)}MB).", status_code=413
+            )
+
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if self.extension is None and len(self._head) >= _SIGNATURE_BYTES:
+                self._check_format()
+
+        self._pending.append(bytes(data))
+        self.pending_bytes += len(data)
+
+    def _check_format(self):
+        self.extension = sniff_container(bytes(self._head))
+        if self.extension is None:
+            raise UploadRejected("지원하지 않는 오디오 형식입니다.", status_code=415)
+
+    def flush(self):
+        """쌓인 청크를 해시에 반영하고 파일에 기록"""
+        if self._file is None:
+            self._file = open(self._tmp_path, "wb")
+        pending, self._pending, self.pending_bytes = self._pending, [], 0
+        for chunk in pending:
+            self._digest.update(chunk)
+            self._file.write(chunk)
+
+    def finish(self) -> UploadedAudio:
+        """남은 청크를 기록하고 source.<확장자>로 옮김"""
+        if self.size == 0:
+            raise UploadRejected("업로드된 파일이 비어 있습니다.")
+        if self.extension is None:
+            self._check_format()
+
+        self.flush()
+        self._file.close()
+        path = os.path.join(self.dest_dir, f"source{self.extension}")
+        os.replace(self._tmp_path, path)
+        return UploadedAudio(
+            path=path,
+            sha256=self._digest.hexdigest(),
+            size=self.size,
+            extension=self.extension,
+            codec=sniff_codec(self.extension, bytes(self._head))
+        )
+
+    def abort(self):
+        """임시 파일 정리 (실패/연결 끊김)"""
+        if self._file is not None:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def _multipart_parser(content_type: str, on_data: Callable[[bytes], None]):
+    """
+    multipart/form-data 스트리밍 파서 (파일명이 있는 첫 파트의 데이터만 on_data로 전달)
+
+    Returns:
+        (파서, 파일 파트를 찾았는지 확인하는 함수)
+    """
+    try:
+        from python_multipart.multipart import MultipartParser, parse_options_header
+    except ImportError:  # python-multipart < 0.0.13
+        from multipart.multipart import MultipartParser, parse_options_header
+
+    _, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise UploadRejected("multipart 경계(boundary)가 없습니다.")
+
+    state = {"field": b"", "value": b"", "is_file": False, "found": False, "done": False}
+
+    def on_part_begin():
+        state["is_file"] = False
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        if state["field"].lower() == b"content-disposition":
+            _, params = parse_options_header(state["value"])
+            state["is_file"] = b"filename" in params and not state["done"]
+        state["field"], state["value"] = b"", b""
+
+    def on_headers_finished():
+        if state["is_file"]:
+            state["found"] = True
+
+    def on_part_data(data, start, end):
+        if state["is_file"]:
+            on_data(data[start:end])
+
+    def on_part_end():
+        if state["is_file"]:
+            state["done"] = True
+            state["is_file"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    return parser, lambda: state["found"]
+
+
+async def receive_upload(
+    chunks: AsyncIterator[bytes],
+    content_type: Optional[str],
+    dest_dir: str,
+    max_bytes: int = UPLOAD_MAX_BYTES
+) -> UploadedAudio:
+    """
+    요청 본문을 스트리밍으로 받아 디스크에 저장
+
+    multipart/form-data면 파일명이 있는 첫 파트를, 아니면 본문 전체를 오디오로 취급한다.
+
+    Args:
+        chunks: 요청 본문 청크 (Request.stream())
+        content_type: 요청 Content-Type
+        dest_dir: 저장할 디렉토리
+        max_bytes: 최대 크기
+
+    Returns:
+        수신된 업로드 (원본 경로, sha256, 크기, 포맷)
+    """
+    receiver = UploadReceiver(dest_dir, max_bytes)
+    parser, found = None, None
+    if content_type and content_type.lower().startswith("multipart/form-data"):
+        parser, found = _multipart_parser(content_type, receiver.feed)
+
+    try:
+        async for chunk in chunks:
+            if parser is not None:
+                parser.write(chunk)
+            else:
+                receiver.feed(chunk)
+            if receiver.pending_bytes >= UPLOAD_WRITE_BYTES:
+                await asyncio.to_thread(receiver.flush)
+
+        if parser is not None:
+            parser.finalize()
+            if not found():
+                raise UploadRejected("업로드할 파일 필드가 없습니다.")
+        upload = await asyncio.to_thread(receiver.finish)
+    except BaseException:
+        await asyncio.to_thread(receiver.abort)
+        raise
+
+    logger.info(f"Received upload {upload.path} ({upload.size} bytes, sha256={upload.sha256[:12]})")
+    return upload
+
+
+def decode_upload(
+    source_path: str,
+    task_id: str,
+    codec: Optional[str] = None,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None
+) -> str:
+    """
+    업로드된 원본을 분리 모델 입력 형식으로 한 번만 디코딩 (download_youtube_audio와 같은 출력)
+
+    Args:
+        source_path: 업로드 원본 경로
+        task_id: 작업 ID
+        codec: 원본 코덱 (재생용 사본으로 옮겨 담을 수 있는지 판단)
+        progress: 진행률 콜백 (0~1, 설명)
+        start_time: 구간 시작 (초)
+        end_time: 구간 끝 (초)
+
+    Returns:
+        디코딩된 오디오 파일 경로
+    """
+    output_path = os.path.join(task_dir(task_id, "download"), "audio.wav")
+    decode_audio(source_path, output_path, start=start_time, end=end_time, progress=progress)
+
+    # 구간을 자르지 않았으면 원본 스트림을 재생용 사본으로 사용
+    if start_time is None and end_time is None:
+        adopt_stream_copy(source_path, codec, output_path)
+    remove_intermediate(source_path)
+    return output_path
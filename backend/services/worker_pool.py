@@ -0,0 +1,246 @@
+"""
+파이프라인 단계별 워커 풀 서비스
+
+블로킹 작업(다운로드, Demucs, librosa, music21)을 이벤트 루프 밖의
+스레드/프로세스 풀에서 실행하여 API 응답성을 유지한다.
+무거운 단계 모듈은 API 프로세스가 가져오지 않고 워커에서 처음 호출할 때(LazyFunction)
+또는 서버 시작 직후 백그라운드 워밍업(warm_pools)으로 한 번 가져온다.
+"""
+import os
+import asyncio
+import logging
+import functools
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.progress import attach_channel
+
+logger = logging.getLogger(__name__)
+
+STAGE_DOWNLOAD = "download"
+STAGE_SEPARATE = "separate"
+STAGE_TRANSCRIBE = "transcribe"
+STAGE_RENDER = "render"
+
+# 단계별 (풀 종류, 워커 수) 기본값
+# - download: I/O 위주이므로 스레드 풀
+# - separate: Demucs가 자체적으로 멀티코어를 사용하므로 1개
+# - transcribe/render: 순수 Python 비중이 커서 프로세스 풀
+DEFAULT_STAGE_POOLS: Dict[str, Tuple[str, int]] = {
+    STAGE_DOWNLOAD: ("thread", 4),
+    STAGE_SEPARATE: ("thread", 1),
+    STAGE_TRANSCRIBE: ("process", 2),
+    STAGE_RENDER: ("process", 1),
+}
+
+# 프로세스 풀 시작 방식 (torch/스레드와 fork 혼용 문제를 피하기 위해 spawn 기본)
+START_METHOD = os.getenv("WORKER_START_METHOD", "spawn")
+
+# 서버 시작 시 단계별 풀을 미리 만들고 단계 모듈을 가져올지 여부 (0이면 첫 작업 때 가져옴)
+WARM_POOLS = os.getenv("WARM_POOLS", "1") == "1"
+
+# 단계별 워밍업 모듈 (가져오는 데 오래 걸리는 오디오/ML 라이브러리와 이를 쓰는 단계 모듈)
+STAGE_MODULES: Dict[str, Tuple[str, ...]] = {
+    STAGE_DOWNLOAD: ("yt_dlp",),
+    STAGE_SEPARATE: ("torch", "demucs.apply", "demucs.pretrained"),
+    STAGE_TRANSCRIBE: ("services.transcription_service",),
+    STAGE_RENDER: ("services.conversion_service", "music21"),
+}
+
+_executors: Dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+_progress_channel = None
+
+
+class LazyFunction:
+    """
+    처음 호출할 때 모듈을 가져오는 함수 참조 (pickle 시 "모듈:이름" 문자열만 전달)
+
+    API 프로세스가 무거운 단계 모듈을 가져오지 않고도 단계 함수를 워커 풀이나 작업 큐에 넘길 수 있다.
+    프로세스 풀에서는 워커 프로세스가, 스레드 풀에서는 풀 스레드가 모듈을 가져온다.
+
+    Args:
+        ref: "모듈:함수 이름" (예: "services.conversion_service:render_musicxml")
+    """
+
+    def __init__(self, ref: str):
+        module_name, _, name = ref.partition(":")
+        if not module_name or not name:
+            raise ValueError(f"잘못된 함수 참조입니다: {ref}")
+        self.ref = ref
+
+    def resolve(self) -> Callable[..., Any]:
+        """실제 함수 반환 (모듈은 처음 한 번만 가져옴)"""
+        module_name, _, name = self.ref.partition(":")
+        return getattr(importlib.import_module(module_name), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyFunction({self.ref!r})"
+
+
+def get_stage_config(stage: str) -> Tuple[str, int]:
+    """
+    단계별 풀 설정 조회 (환경 변수로 재정의 가능)
+
+    예: SEPARATE_POOL=process, SEPARATE_WORKERS=2
+
+    Args:
+        stage: 단계 이름
+
+    Returns:
+        (풀 종류, 워커 수)
+    """
+    if stage not in DEFAULT_STAGE_POOLS:
+        raise ValueError(f"알 수 없는 단계입니다: {stage}")
+
+    kind, workers = DEFAULT_STAGE_POOLS[stage]
+    kind = os.getenv(f"{stage.upper()}_POOL", kind)
+    workers = int(os.getenv(f"{stage.upper()}_WORKERS", workers))
+
+    if kind not in ("thread", "process"):
+        raise ValueError(f"지원하지 않는 풀 종류입니다: {kind}")
+
+    return kind, max(1, workers)
+
+
+def prefer_stage_pool(stage: str, kind: str, workers: int):
+    """
+    단계별 풀 기본값 변경 (환경 변수 설정이 우선, 풀 생성 전에만 효과가 있음)
+
+    예: 상주 모델을 여러 작업이 공유하는 트랜스크립션 백엔드는 transcribe 단계를 스레드 풀로 실행
+
+    Args:
+        stage: 단계 이름
+        kind: 풀 종류 (thread 또는 process)
+        workers: 워커 수
+    """
+    if stage not in DEFAULT_STAGE_POOLS:
+        raise ValueError(f"알 수 없는 단계입니다: {stage}")
+    if stage in _executors:
+        logger.warning(f"Pool for stage '{stage}' already exists, ignoring new default")
+        return
+    DEFAULT_STAGE_POOLS[stage] = (kind, workers)
+
+
+def get_progress_channel():
+    """
+    워커 진행률 채널 조회 (최초 호출 시 생성)
+
+    같은 프로세스의 스레드 풀은 그대로 사용하고, 프로세스 풀 워커에는 initializer로 전달된다.
+
+    Returns:
+        multiprocessing.Queue
+    """
+    global _progress_channel
+    if _progress_channel is None:
+        _progress_channel = multiprocessing.get_context(START_METHOD).Queue()
+        attach_channel(_progress_channel)
+    return _progress_channel
+
+
+def get_executor(stage: str) -> Executor:
+    """
+    단계별 실행기 조회 (최초 호출 시 생성)
+
+    Args:
+        stage: 단계 이름
+
+    Returns:
+        해당 단계의 Executor
+    """
+    with _executors_lock:
+        executor = _executors.get(stage)
+        if executor is None:
+            kind, workers = get_stage_config(stage)
+            if kind == "process":
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context(START_METHOD),
+                    initializer=attach_channel,
+                    initargs=(get_progress_channel(),)
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=f"{stage}-worker"
+                )
+            _executors[stage] = executor
+            logger.info(f"Created {kind} pool for stage '{stage}' ({workers} workers)")
+
+    return executor
+
+
+async def run_in_stage(stage: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    블로킹 함수를 단계별 풀에서 실행하고 결과를 기다림
+
+    프로세스 풀의 경우 func와 인자는 pickle 가능해야 한다.
+
+    Args:
+        stage: 단계 이름
+        func: 실행할 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        함수 실행 결과
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(stage), call)
+
+
+def warm_up(modules: Iterable[str]):
+    """
+    워커에서 모듈을 미리 가져옴 (pickle 가능, 설치되지 않은 모듈은 건너뜀)
+
+    Args:
+        modules: 모듈 이름 목록
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.debug(f"Skipped warm-up import of '{name}': {str(e)}")
+
+
+def warm_pools(stages: Optional[Iterable[str]] = None) -> List[Future]:
+    """
+    단계별 풀을 미리 만들고 워커마다 STAGE_MODULES를 가져옴 (완료를 기다리지 않음)
+
+    프로세스 풀은 워커 수만큼 워밍업 작업을 넣어 워커 프로세스를 모두 미리 띄운다.
+    워밍업 중 들어온 작업은 워밍업이 끝난 워커부터 실행된다.
+
+    Args:
+        stages: 워밍업할 단계 목록 (기본: 전체)
+
+    Returns:
+        워밍업 작업 Future 목록
+    """
+    futures = []
+    for stage in stages or DEFAULT_STAGE_POOLS:
+        _, workers = get_stage_config(stage)
+        executor = get_executor(stage)
+        futures.extend(
+            executor.submit(warm_up, STAGE_MODULES.get(stage, ()))
+            for _ in range(workers if isinstance(executor, ProcessPoolExecutor) else 1)
+        )
+    return futures
+
+
+def shutdown_pools(wait: bool = True):
+    """
+    모든 단계별 풀 종료
+
+    Args:
+        wait: 실행 중인 작업 완료 대기 여부
+    """
+    for stage, executor in list(_executors.items()):
+        executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info(f"Shut down pool for stage '{stage}'")
+    _executors.clear()
@@ -1,60 +1,145 @@
 """
 YouTube 다운로드 서비스 (yt-dlp 사용)
+
+yt-dlp는 가져오는 데 오래 걸리므로 다운로드 워커에서 처음 호출할 때 가져온다.
 """
 import os
 import logging
-from typing import Tuple
-import yt_dlp
+from typing import Callable, Optional
+
+from services.audio_service import decode_audio
+from services.delivery_service import adopt_stream_copy
+from services.storage_service import task_dir, remove_intermediate
 
 logger = logging.getLogger(__name__)
 
-TEMP_DIR = "backend/temp/downloads"
 
+# 전체 단계 중 다운로드가 차지하는 비율 (나머지는 디코딩)
+DOWNLOAD_PROGRESS_SHARE = 0.8
+
+# 원본 압축 스트림 그대로 받기 (opus 우선, 없으면 m4a 등 최고 음질)
+AUDIO_FORMAT = os.getenv("YTDLP_AUDIO_FORMAT", "bestaudio[acodec=opus]/bestaudio/best")
+
+
+def _progress_hook(progress: Callable[[float, Optional[str]], None]):
+    """yt-dlp 다운로드 진행률을 단계 진행률로 변환하는 훅"""
+    def on_download(d):
+        if d.get('status') == 'downloading':
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            if total:
+                fraction = min(d.get('downloaded_bytes', 0) / total, 1.0)
+                progress(DOWNLOAD_PROGRESS_SHARE * fraction, f"다운로드 {fraction * 100:.0f}%")
+        elif d.get('status') == 'finished':
+            progress(DOWNLOAD_PROGRESS_SHARE, "다운로드 완료")
+
+    return on_download
+
+
+def _decode_progress(progress: Callable[[float, Optional[str]], None]):
+    """디코딩 진행률을 다운로드 이후 구간의 단계 진행률로 변환하는 콜백"""
+    def on_decode(fraction, detail):
+        progress(DOWNLOAD_PROGRESS_SHARE + (1 - DOWNLOAD_PROGRESS_SHARE) * fraction, detail)
+
+    return on_decode
+
+
+def _fetch(youtube_url: str, ydl_opts: dict):
+    """yt-dlp로 내려받고 (영상 정보, 받은 파일 경로) 반환"""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(youtube_url, download=True)
+        downloads = info.get('requested_downloads') or [{}]
+        return info, downloads[0].get('filepath') or ydl.prepare_filename(info)
 
-async def download_youtube_audio(youtube_url: str, task_id: str) -> str:
+
+def download_youtube_audio(
+    youtube_url: str,
+    task_id: str,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None
+) -> str:
     """
     YouTube 영상에서 오디오만 다운로드
 
+    WAV 후처리 없이 원본 압축 스트림을 받은 뒤, 분리 모델 입력 형식
+    (44.1kHz 스테레오 float32)으로 한 번만 디코딩한다.
+    start_time/end_time이 주어지면 해당 구간만 받는다.
+
     Args:
         youtube_url: YouTube URL
         task_id: 작업 ID
+        progress: 진행률 콜백 (0~1, 설명)
+        start_time: 구간 시작 (초)
+        end_time: 구간 끝 (초)
 
     Returns:
-        다운로드된 오디오 파일 경로
+        디코딩된 오디오 파일 경로
     """
-    os.makedirs(TEMP_DIR, exist_ok=True)
+    from yt_dlp.utils import DownloadError, download_range_func
 
-    output_path = os.path.join(TEMP_DIR, f"{task_id}.wav")
+    output_dir = task_dir(task_id, "download")
+    output_path = os.path.join(output_dir, "audio.wav")
 
     ydl_opts = {
-        'format': 'bestaudio/best',
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'wav',
-        }],
-        'outtmpl': os.path.join(TEMP_DIR, f"{task_id}.%(ext)s"),
+        'format': AUDIO_FORMAT,
+        'outtmpl': os.path.join(output_dir, "source.%(ext)s"),
         'quiet': True,
         'no_warnings': True,
+        'noprogress': True,
     }
+    if progress is not None:
+        ydl_opts['progress_hooks'] = [_progress_hook(progress)]
 
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            logger.info(f"Downloading audio from: {youtube_url}")
-            info = ydl.extract_info(youtube_url, download=True)
-
-            # 비디오 정보 추출
-            title = info.get('title', 'Unknown')
-            artist = info.get('uploader', 'Unknown')
-            duration = info.get('duration', 0)
-
-            logger.info(f"Downloaded: {title} by {artist}")
+    trim = start_time is not None or end_time is not None
+    decode_range = (start_time, end_time)
 
-            return output_path
+    try:
+        logger.info(f"Downloading audio from: {youtube_url}")
+        info = None
+        if trim:
+            # 구간 다운로드 (ffmpeg가 필요한 부분만 요청)
+            try:
+                info, source_path = _fetch(youtube_url, {
+                    **ydl_opts,
+                    'download_ranges': download_range_func(
+                        None, [(start_time or 0, end_time if end_time is not None else float('inf'))]
+                    ),
+                })
+                decode_range = (None, None)
+            except DownloadError as e:
+                # 구간 다운로드를 지원하지 않는 포맷은 전체를 받아 디코딩 시 자름
+                logger.warning(f"Partial download unavailable, fetching full audio: {str(e)}")
+        if info is None:
+            info, source_path = _fetch(youtube_url, ydl_opts)
+
+        # 비디오 정보 추출
+        title = info.get('title', 'Unknown')
+        artist = info.get('uploader', 'Unknown')
+        duration = info.get('duration', 0)
+
+        logger.info(f"Downloaded: {title} by {artist} ({info.get('acodec')}, {source_path})")
 
     except Exception as e:
         logger.error(f"YouTube download failed: {str(e)}")
         raise Exception(f"YouTube 다운로드 실패: {str(e)}")
 
+    if trim:
+        duration = (end_time if end_time is not None else duration or 0) - (start_time or 0)
+
+    decode_audio(
+        source_path, output_path, start=decode_range[0], end=decode_range[1],
+        progress=_decode_progress(progress) if progress is not None else None, duration_hint=duration
+    )
+
+    # 원본 코덱이 재생용 포맷과 같으면 재인코딩 없이 재생용 사본으로 사용
+    # (디코딩 시 구간을 자른 경우 원본은 전체 길이이므로 제외)
+    if decode_range == (None, None):
+        adopt_stream_copy(source_path, info.get('acodec'), output_path)
+    remove_intermediate(source_path)
+    return output_path
+
 
 def get_video_info(youtube_url: str) -> dict:
     """
@@ -66,6 +151,8 @@ def get_video_info(youtube_url: str) -> dict:
     Returns:
         비디오 메타데이터
     """
+    import yt_dlp
+
     ydl_opts = {
         'quiet': True,
         'no_warnings': True,
@@ -0,0 +1,41 @@
+"""
+GrooveExtract AI - 분산 단계 워커
+API 서버(JOB_QUEUE=sqlite|redis)가 작업 큐에 넣은 단계 작업을 처리한다.
+
+사용 예:
+    JOB_QUEUE=redis python worker.py --stages separate
+    JOB_QUEUE=redis python worker.py --stages transcribe render
+"""
+import argparse
+import logging
+import sys
+from typing import Optional, Sequence
+
+from services.job_queue import create_job_queue
+from services.stage_worker import StageWorker
+from services.worker_pool import DEFAULT_STAGE_POOLS
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="단계 작업 큐 워커")
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(DEFAULT_STAGE_POOLS), default=list(DEFAULT_STAGE_POOLS),
+        help="처리할 단계 (기본: 전체)"
+    )
+    args = parser.parse_args(argv)
+
+    queue = create_job_queue()
+    if queue is None:
+        logger.error("JOB_QUEUE must be 'sqlite' or 'redis' to run stage workers")
+        return 1
+
+    StageWorker(queue, args.stages).run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,17 +10,28 @@ export interface ProcessResponse {
   message: string;
 }
 
+export type SeparationTier = 'auto' | 'none' | 'quick' | 'quality' | 'fine';
+
+export type AnalysisProfile = 'fast' | 'full';
+
 export interface TaskStatus {
   task_id: string;
   status: 'PENDING' | 'DOWNLOADING' | 'SEPARATING' | 'TRANSCRIBING' | 'RENDERING' | 'COMPLETE' | 'ERROR';
   current_step: string;
   progress: number;
+  queue_position?: number | null;
+  separation_tier?: SeparationTier;
+  analysis_profile?: AnalysisProfile;
+  stage?: string;
+  stage_progress?: number;
+  detail?: string | null;
   metadata?: {
     duration: string;
     bpm: number;
     difficulty: string;
   };
   error_message?: string;
+  expired?: boolean;
 }
 
 export interface TranscriptionResult {
@@ -34,6 +45,8 @@ export interface TranscriptionResult {
     youtubeId?: string;
   };
   musicxml: string;
+  score_url: string;
+  midi_url: string;
   drum_audio_url: string;
   original_audio_url: string;
 }
@@ -41,13 +54,24 @@ export interface TranscriptionResult {
 /**
  * YouTube URL로 처리 시작
  */
-export async function startProcessing(youtubeUrl: string): Promise<ProcessResponse> {
+export async function startProcessing(
+  youtubeUrl: string,
+  range?: { startTime?: number; endTime?: number },
+  separationTier?: SeparationTier,
+  analysisProfile?: AnalysisProfile
+): Promise<ProcessResponse> {
   const response = await fetch(`${API_BASE_URL}/api/process`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify({ youtube_url: youtubeUrl }),
+    body: JSON.stringify({
+      youtube_url: youtubeUrl,
+      start_time: range?.startTime,
+      end_time: range?.endTime,
+      separation_tier: separationTier,
+      analysis_profile: analysisProfile,
+    }),
   });
 
   if (!response.ok) {
@@ -57,6 +81,37 @@ export async function startProcessing(youtubeUrl: string): Promise<ProcessRespon
   return response.json();
 }
 
+/**
+ * 로컬 오디오 파일 업로드로 처리 시작 (파일 본문을 그대로 전송)
+ */
+export async function startUploadProcessing(
+  file: File,
+  range?: { startTime?: number; endTime?: number },
+  separationTier?: SeparationTier,
+  analysisProfile?: AnalysisProfile
+): Promise<ProcessResponse> {
+  const params = new URLSearchParams();
+  if (range?.startTime !== undefined) params.set('start_time', String(range.startTime));
+  if (range?.endTime !== undefined) params.set('end_time', String(range.endTime));
+  if (separationTier) params.set('separation_tier', separationTier);
+  if (analysisProfile) params.set('analysis_profile', analysisProfile);
+
+  const response = await fetch(`${API_BASE_URL}/api/process/upload?${params}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': file.type || 'application/octet-stream',
+    },
+    body: file,
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => null);
+    throw new Error(error?.detail || '업로드 실패');
+  }
+
+  return response.json();
+}
+
 /**
  * 작업 상태 조회
  */
@@ -72,6 +127,8 @@ export async function getTaskStatus(taskId: string): Promise<TaskStatus> {
 
 /**
  * 완료된 작업의 결과 조회
+ * 결과 API는 메타데이터와 URL만 반환하므로 악보는 score_url에서 따로 받음
+ * (gzip 전송, ETag로 재조회 시 304)
  */
 export async function getResult(taskId: string): Promise<TranscriptionResult> {
   const response = await fetch(`${API_BASE_URL}/api/result/${taskId}`);
@@ -80,7 +137,14 @@ export async function getResult(taskId: string): Promise<TranscriptionResult> {
     throw new Error('결과 조회 실패');
   }
 
-  return response.json();
+  const result = await response.json();
+  const scoreResponse = await fetch(`${API_BASE_URL}${result.score_url}`, { cache: 'no-cache' });
+
+  if (!scoreResponse.ok) {
+    throw new Error('악보 조회 실패');
+  }
+
+  return { ...result, musicxml: await scoreResponse.text() };
 }
 
 /**
@@ -140,3 +204,43 @@ export async function pollTaskStatus(
     poll();
   });
 }
+
+/**
+ * 작업 상태를 서버 이벤트(SSE)로 구독
+ * EventSource를 쓸 수 없거나 첫 이벤트 전에 연결이 끊기면 폴링으로 대체
+ */
+export async function watchTaskStatus(
+  taskId: string,
+  onUpdate: (status: TaskStatus) => void
+): Promise<TaskStatus> {
+  if (typeof EventSource === 'undefined') {
+    return pollTaskStatus(taskId, onUpdate);
+  }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/events/${taskId}`);
+    let received = false;
+
+    source.onmessage = (event) => {
+      received = true;
+      const status: TaskStatus = JSON.parse(event.data);
+      onUpdate(status);
+
+      if (status.status === 'COMPLETE') {
+        source.close();
+        resolve(status);
+      } else if (status.status === 'ERROR') {
+        source.close();
+        reject(new Error(status.error_message || '처리 중 오류 발생'));
+      }
+    };
+
+    source.onerror = () => {
+      // 연결 이후의 끊김은 EventSource가 자동으로 재연결
+      if (!received) {
+        source.close();
+        pollTaskStatus(taskId, onUpdate).then(resolve, reject);
+      }
+    };
+  });
+}